@@ -32,6 +32,20 @@ echo [2/4] Copying essential files...
 
 REM Core application files (root level)
 copy "main.py" "%TEMP_DIR%\" >nul 2>&1
+copy "instrumentation.py" "%TEMP_DIR%\" >nul 2>&1
+copy "mixer.py" "%TEMP_DIR%\" >nul 2>&1
+copy "calibration.py" "%TEMP_DIR%\" >nul 2>&1
+copy "profiles.py" "%TEMP_DIR%\" >nul 2>&1
+copy "input_plan.py" "%TEMP_DIR%\" >nul 2>&1
+copy "mapping_table.py" "%TEMP_DIR%\" >nul 2>&1
+copy "session_recorder.py" "%TEMP_DIR%\" >nul 2>&1
+copy "session_replay.py" "%TEMP_DIR%\" >nul 2>&1
+copy "telemetry_shm.py" "%TEMP_DIR%\" >nul 2>&1
+copy "connection_supervisor.py" "%TEMP_DIR%\" >nul 2>&1
+copy "port_watcher.py" "%TEMP_DIR%\" >nul 2>&1
+copy "firmware_sim.py" "%TEMP_DIR%\" >nul 2>&1
+copy "clock_sync.py" "%TEMP_DIR%\" >nul 2>&1
+copy "game_telemetry.py" "%TEMP_DIR%\" >nul 2>&1
 copy "requirements.txt" "%TEMP_DIR%\" >nul 2>&1
 copy "LAUNCH.bat" "%TEMP_DIR%\" >nul 2>&1
 copy "SETUP.bat" "%TEMP_DIR%\" >nul 2>&1
@@ -47,6 +61,7 @@ REM Arduino files
 if exist "arduino\arduino_servo_control.ino" copy "arduino\arduino_servo_control.ino" "%TEMP_DIR%\arduino\" >nul 2>&1
 if exist "arduino\arduino_servo_control_esp32s3.ino" copy "arduino\arduino_servo_control_esp32s3.ino" "%TEMP_DIR%\arduino\" >nul 2>&1
 if exist "arduino\arduino_firmata_setup.ino" copy "arduino\arduino_firmata_setup.ino" "%TEMP_DIR%\arduino\" >nul 2>&1
+if exist "arduino\command_parser.h" copy "arduino\command_parser.h" "%TEMP_DIR%\arduino\" >nul 2>&1
 if exist "arduino\ARDUINO_SETUP.md" copy "arduino\ARDUINO_SETUP.md" "%TEMP_DIR%\arduino\" >nul 2>&1
 if exist "arduino\ESP32_S3_SETUP.md" copy "arduino\ESP32_S3_SETUP.md" "%TEMP_DIR%\arduino\" >nul 2>&1
 if exist "arduino\POWER_TROUBLESHOOTING.md" copy "arduino\POWER_TROUBLESHOOTING.md" "%TEMP_DIR%\arduino\" >nul 2>&1
@@ -61,10 +76,22 @@ if exist "docs\AUTO_LAUNCH_SETUP.md" copy "docs\AUTO_LAUNCH_SETUP.md" "%TEMP_DIR
 if exist "docs\FIX_COM_PORT.md" copy "docs\FIX_COM_PORT.md" "%TEMP_DIR%\docs\" >nul 2>&1
 if exist "docs\PYGAME_TROUBLESHOOTING.md" copy "docs\PYGAME_TROUBLESHOOTING.md" "%TEMP_DIR%\docs\" >nul 2>&1
 if exist "docs\TROUBLESHOOTING.md" copy "docs\TROUBLESHOOTING.md" "%TEMP_DIR%\docs\" >nul 2>&1
+if exist "docs\BENCHMARKING.md" copy "docs\BENCHMARKING.md" "%TEMP_DIR%\docs\" >nul 2>&1
+if exist "docs\SESSION_RECORDING.md" copy "docs\SESSION_RECORDING.md" "%TEMP_DIR%\docs\" >nul 2>&1
+if exist "docs\SHARED_TELEMETRY.md" copy "docs\SHARED_TELEMETRY.md" "%TEMP_DIR%\docs\" >nul 2>&1
 
 REM Supporting scripts (optional, but include for advanced users)
 if exist "scripts\run.bat" copy "scripts\run.bat" "%TEMP_DIR%\scripts\" >nul 2>&1
 if exist "scripts\servo_control_firmata.py" copy "scripts\servo_control_firmata.py" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\benchmark_latency.py" copy "scripts\benchmark_latency.py" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\benchmark_hotpath.py" copy "scripts\benchmark_hotpath.py" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\benchmark_hotpath_baseline.json" copy "scripts\benchmark_hotpath_baseline.json" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\replay_session.py" copy "scripts\replay_session.py" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\telemetry_reader_example.py" copy "scripts\telemetry_reader_example.py" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\simulate_failsafe.py" copy "scripts\simulate_failsafe.py" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\check_command_parser.py" copy "scripts\check_command_parser.py" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\measure_link_latency.py" copy "scripts\measure_link_latency.py" "%TEMP_DIR%\scripts\" >nul 2>&1
+if exist "scripts\replay_game_telemetry.py" copy "scripts\replay_game_telemetry.py" "%TEMP_DIR%\scripts\" >nul 2>&1
 
 echo [OK] Files copied
 echo.
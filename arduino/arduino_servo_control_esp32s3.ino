@@ -3,8 +3,40 @@
  * Optimized for ESP32-S3 Development Board
  * 
  * This sketch receives servo commands via Serial and controls servos
- * Command format: "S<servo_id>:<angle>\n"
- * Example: "S0:90\n" sets servo 0 to 90 degrees
+ * Command formats:
+ *   "U<servo_id>:<microseconds>\n" - pulse width in microseconds (500-2500)
+ *     Example: "U0:1500\n" centers servo 0. The Python app sends these,
+ *     with each servo's calibration (endpoints, trim, reverse) already applied.
+ *   "S<servo_id>:<angle>\n" - angle in degrees (0-180), kept for older tools
+ *     Example: "S0:90\n" sets servo 0 to 90 degrees
+ *   "H\n" - heartbeat, answered with "OK:H". The Python app sends one whenever
+ *     it has had nothing else to send for a while.
+ *   "T<milliseconds>\n" - failsafe timeout (0 = off, the default)
+ *   "F<servo_id>:<microseconds>\n" - failsafe pulse width (0 = hold position, the default)
+ *   "R<milliseconds>\n" - telemetry interval (0 = off, the default)
+ *   "P<seq>\n" - clock sync ping, answered with "OK:P<seq>:<micros>": micros()
+ *     when the ping was read. The Python app maps the board's clock onto its
+ *     own with these (see clock_sync.py).
+ *   "N<seq>\n" - end of one polling tick's commands, answered with
+ *     "OK:N<seq>:<micros>" like P, so the app can tell how long its commands
+ *     took to reach the board.
+ * 
+ * FAILSAFE: once a timeout is set, if no valid command (of any type) arrives
+ * for that long - the app hung, crashed or the USB cable came out - every
+ * servo that has a failsafe pulse width moves there, and "FAILSAFE:<ms>" is
+ * printed. The next valid command ends the failsafe.
+ * 
+ * TELEMETRY: once an interval is set, the board prints one line per interval:
+ *   "TEL:<micros>,<loops/s>,<commands>,<rejected>,<rx peak>,<pulses>"
+ * micros() when it was sent, loop() iterations per second since the last
+ * line, commands parsed and lines rejected since startup, the most bytes that
+ * waited in the receive ring since the last line (COMMAND_RING_SIZE = full),
+ * and every servo's current pulse width as 3 hex digits (000 = not attached).
+ * 
+ * Commands are parsed by command_parser.h (keep it next to this sketch) one
+ * byte at a time as they arrive - loop() never waits for a line to finish and
+ * has no delay(), so a command is applied as soon as its '\n' is received.
+ * Lines that are not exactly one of the commands above are ignored.
  * 
  * IMPORTANT NOTES FOR ESP32-S3:
  * - The ESP32Servo library can control up to 16 servos simultaneously
@@ -17,6 +49,7 @@
  */
 
 #include <ESP32Servo.h>
+#include "command_parser.h"
 
 // Maximum number of servos for ESP32-S3
 #define MAX_SERVOS 16
@@ -36,9 +69,61 @@ int servoPins[MAX_SERVOS] = {
 // Track which servos are attached
 bool servoAttached[MAX_SERVOS] = {false};
 
+// Pulse width limits (microseconds) for U commands
+#define MIN_PULSE_US 500
+#define MAX_PULSE_US 2500
+
+// Pulse widths that S commands map 0 and 180 degrees to (same as Servo.write())
+#define ANGLE_0_US 544
+#define ANGLE_180_US 2400
+
+// Failsafe state (see the command list above)
+unsigned long failsafeTimeoutMs = 0;     // 0 = failsafe off
+int failsafePulse[MAX_SERVOS] = {0};     // 0 = hold last position
+unsigned long lastFrameMs = 0;           // millis() of the last valid command
+bool failsafeActive = false;
+
+// Received bytes waiting to be parsed, and the parser's state
+CommandRing rxRing;
+CommandParser parser;
+
+// Telemetry state (see above)
+unsigned long telemetryIntervalMs = 0;   // 0 = telemetry off
+unsigned long lastTelemetryMs = 0;
+unsigned long loopCount = 0;             // loop() iterations since the last telemetry line
+int servoPulse[MAX_SERVOS] = {0};        // Pulse width each servo is at (0 = not attached)
+
+// A valid command arrived: restart the failsafe timer
+void frameReceived() {
+  lastFrameMs = millis();
+  failsafeActive = false;
+}
+
+// Move servos to their failsafe positions if the host has gone quiet
+void checkFailsafe() {
+  if (failsafeTimeoutMs == 0 || failsafeActive) {
+    return;
+  }
+  unsigned long silentMs = millis() - lastFrameMs;  // Correct across millis() overflow
+  if (silentMs < failsafeTimeoutMs) {
+    return;
+  }
+  failsafeActive = true;
+  for (int i = 0; i < MAX_SERVOS; i++) {
+    if (servoAttached[i] && failsafePulse[i] > 0) {
+      servos[i].writeMicroseconds(failsafePulse[i]);
+      servoPulse[i] = failsafePulse[i];
+    }
+  }
+  Serial.print("FAILSAFE:");
+  Serial.println(silentMs);
+}
+
 void setup() {
   // Initialize serial communication at 115200 baud (ESP32-S3 default)
   Serial.begin(115200);
+  ringInit(&rxRing);
+  parserInit(&parser);
   
   // Wait for serial connection (important for USB serial on ESP32-S3)
   // Note: This will wait indefinitely if no Serial Monitor is open
@@ -52,7 +137,9 @@ void setup() {
   
   // Send startup message (Python app will look for this)
   Serial.println("READY:RC Servo Controller - ESP32-S3");
-  Serial.println("READY:Command format: S<servo_id>:<angle>");
+  Serial.println("READY:Command format: U<servo_id>:<microseconds> or S<servo_id>:<angle>");
+  Serial.println("READY:Failsafe: H heartbeat, T<ms> timeout, F<servo_id>:<microseconds>");
+  Serial.println("READY:Telemetry: R<ms> interval, P<seq> ping, N<seq> frame end");
   Serial.println("READY:Max servos: 16");
   Serial.println("READY:Baud rate: 115200");
   
@@ -66,42 +153,127 @@ void setup() {
   }
 }
 
-void loop() {
-  // Check for incoming serial data
-  if (Serial.available() > 0) {
-    String command = Serial.readStringUntil('\n');
-    command.trim();
+// Apply one parsed command and confirm it
+void handleCommand(const ServoCommand &command) {
+  char type = command.type;
+  if (type == 'H') {
+    frameReceived();
+    Serial.println("OK:H");
+    return;
+  }
+  if (type == 'T') {
+    failsafeTimeoutMs = command.value;
+    frameReceived();
+    Serial.print("OK:T");
+    Serial.println(command.value);
+    return;
+  }
+  if (type == 'P' || type == 'N') {
+    unsigned long receivedUs = micros();
+    frameReceived();
+    Serial.print("OK:");
+    Serial.print(type);
+    Serial.print(command.value);
+    Serial.print(":");
+    Serial.println(receivedUs);
+    return;
+  }
+  if (type == 'R') {
+    telemetryIntervalMs = command.value;
+    loopCount = 0;
+    lastTelemetryMs = millis();
+    frameReceived();
+    Serial.print("OK:R");
+    Serial.println(command.value);
+    return;
+  }
+  
+  // U, S or F
+  if (command.servo >= MAX_SERVOS) {
+    return;
+  }
+  int servoId = command.servo;
+  if (type == 'F') {
+    // Failsafe pulse width (0 = hold position)
+    if (command.value != 0 && (command.value < MIN_PULSE_US || command.value > MAX_PULSE_US)) {
+      return;
+    }
+    failsafePulse[servoId] = command.value;
+  } else {
+    // Convert angles to a pulse width so both commands share one path
+    int pulse;
+    if (type == 'U' && command.value >= MIN_PULSE_US && command.value <= MAX_PULSE_US) {
+      pulse = command.value;
+    } else if (type == 'S' && command.value <= 180) {
+      pulse = map(command.value, 0, 180, ANGLE_0_US, ANGLE_180_US);
+    } else {
+      return;
+    }
     
-    // Parse command: "S<servo_id>:<angle>"
-    if (command.startsWith("S")) {
-      int colonIndex = command.indexOf(':');
-      if (colonIndex > 0) {
-        int servoId = command.substring(1, colonIndex).toInt();
-        int angle = command.substring(colonIndex + 1).toInt();
-        
-        // Validate servo ID and angle
-        if (servoId >= 0 && servoId < MAX_SERVOS && angle >= 0 && angle <= 180) {
-          // Attach servo if not already attached
-          if (!servoAttached[servoId]) {
-            servos[servoId].attach(servoPins[servoId]);
-            servoAttached[servoId] = true;
-          }
-          
-          // Set servo angle
-          servos[servoId].write(angle);
-          
-          // Echo back confirmation (for debugging)
-          Serial.print("OK:S");
-          Serial.print(servoId);
-          Serial.print(":");
-          Serial.println(angle);
-        }
-      }
+    // Attach servo if not already attached (with the full U command range)
+    if (!servoAttached[servoId]) {
+      servos[servoId].attach(servoPins[servoId], MIN_PULSE_US, MAX_PULSE_US);
+      servoAttached[servoId] = true;
     }
+    
+    // Set servo pulse width (1 us resolution instead of 1 degree)
+    servos[servoId].writeMicroseconds(pulse);
+    servoPulse[servoId] = pulse;
   }
   
-  // Small delay to prevent overwhelming the serial buffer
-  delay(10);
+  frameReceived();
+  // Echo back confirmation with the value as received (for debugging)
+  Serial.print("OK:");
+  Serial.print(type);
+  Serial.print(servoId);
+  Serial.print(":");
+  Serial.println(command.value);
+}
+
+// Print a telemetry line if one is due (see above)
+void sendTelemetry() {
+  static const char hexDigits[] = "0123456789ABCDEF";
+  unsigned long nowMs = millis();
+  unsigned long elapsedMs = nowMs - lastTelemetryMs;
+  if (telemetryIntervalMs == 0 || elapsedMs < telemetryIntervalMs) {
+    return;
+  }
+  Serial.print("TEL:");
+  Serial.print(micros());
+  Serial.print(",");
+  Serial.print((unsigned long)(loopCount * 1000.0 / elapsedMs));
+  Serial.print(",");
+  Serial.print(parser.accepted);
+  Serial.print(",");
+  Serial.print(parser.rejected);
+  Serial.print(",");
+  Serial.print(rxRing.highWater);
+  Serial.print(",");
+  for (int i = 0; i < MAX_SERVOS; i++) {
+    Serial.print(hexDigits[(servoPulse[i] >> 8) & 0xF]);
+    Serial.print(hexDigits[(servoPulse[i] >> 4) & 0xF]);
+    Serial.print(hexDigits[servoPulse[i] & 0xF]);
+  }
+  Serial.println();
+  lastTelemetryMs = nowMs;
+  loopCount = 0;
+  rxRing.highWater = 0;
 }
 
+void loop() {
+  // Move everything Serial has received into the ring, then handle every complete command
+  while (Serial.available() > 0 && !ringFull(&rxRing)) {
+    ringPush(&rxRing, (uint8_t)Serial.read());
+  }
+  ServoCommand command;
+  while (parserNext(&parser, &rxRing, &command)) {
+    handleCommand(command);
+  }
+  
+  // Move to the failsafe positions if the host has gone quiet
+  checkFailsafe();
+  
+  loopCount++;
+  sendTelemetry();
+}
 
@@ -0,0 +1,200 @@
+/*
+ * RC Servo Racing Sim Controller - serial command parser
+ *
+ * Shared by arduino_servo_control.ino and arduino_servo_control_esp32s3.ino,
+ * and built on the host by host_test/command_parser_test.c. Plain C, no heap
+ * and no waiting: loop() moves whatever bytes Serial has into a ring buffer,
+ * and the parser turns them into commands one byte at a time, so a command
+ * is handled the moment its '\n' arrives instead of after a readStringUntil()
+ * timeout.
+ *
+ *   CommandRing ring;  CommandParser parser;  ServoCommand command;
+ *   ringInit(&ring);  parserInit(&parser);
+ *   while (Serial.available() > 0 && !ringFull(&ring)) ringPush(&ring, Serial.read());
+ *   while (parserNext(&parser, &ring, &command)) { ...handle command... }
+ *
+ * Grammar (one command per line, spaces / tabs / '\r' allowed before and after):
+ *   H                       heartbeat
+ *   T<digits>               failsafe timeout (ms)
+ *   R<digits>               telemetry interval (ms)
+ *   P<digits>               clock sync ping (sequence number)
+ *   N<digits>               end of a frame of commands (sequence number)
+ *   U|S|F<digits>:<digits>  servo id and value
+ * Anything else - a bad character, a missing number, a number too long - makes
+ * the parser skip to the end of the line and count it in `rejected`. Ranges
+ * (servo count, pulse widths, angles) are left to the sketch.
+ */
+
+#ifndef COMMAND_PARSER_H
+#define COMMAND_PARSER_H
+
+#include <stdint.h>
+
+// Ring buffer size (a power of two, at most 256 so the indices fit a byte)
+#define COMMAND_RING_SIZE 64
+
+// Longest numbers accepted (digits)
+#define COMMAND_MAX_ID_DIGITS 3
+#define COMMAND_MAX_VALUE_DIGITS 9
+
+typedef struct {
+  uint8_t data[COMMAND_RING_SIZE];
+  uint8_t head;  // Next byte to read
+  uint8_t count; // Bytes waiting
+  uint8_t highWater; // Most bytes waiting at once (the sketch resets it for each telemetry frame)
+} CommandRing;
+
+typedef struct {
+  char type;      // 'H', 'T', 'R', 'P', 'N', 'U', 'S' or 'F'
+  uint16_t servo; // Servo id (U, S, F)
+  uint32_t value; // Pulse width, angle, interval or sequence number
+} ServoCommand;
+
+enum {
+  PARSE_START,    // Before the command letter
+  PARSE_ID,       // Digits of the servo id
+  PARSE_VALUE,    // Digits of the value
+  PARSE_TRAILING, // After the last number: only blanks until '\n'
+  PARSE_DISCARD   // Bad line: skip until '\n'
+};
+
+typedef struct {
+  uint8_t state;
+  uint8_t digits; // Digits read of the current number
+  ServoCommand command; // Command being read
+  uint32_t accepted; // Commands parsed
+  uint32_t rejected; // Lines that were not commands (empty lines don't count)
+} CommandParser;
+
+static inline void ringInit(CommandRing *ring) {
+  ring->head = 0;
+  ring->count = 0;
+  ring->highWater = 0;
+}
+
+static inline uint8_t ringFull(const CommandRing *ring) {
+  return ring->count == COMMAND_RING_SIZE;
+}
+
+// Append a byte; returns 0 (and drops the byte) if the ring is full
+static inline uint8_t ringPush(CommandRing *ring, uint8_t byte) {
+  if (ring->count == COMMAND_RING_SIZE) {
+    return 0;
+  }
+  ring->data[(uint8_t)(ring->head + ring->count) & (COMMAND_RING_SIZE - 1)] = byte;
+  ring->count++;
+  if (ring->count > ring->highWater) {
+    ring->highWater = ring->count;
+  }
+  return 1;
+}
+
+// Take the oldest byte; returns 0 if the ring is empty
+static inline uint8_t ringPop(CommandRing *ring, uint8_t *byte) {
+  if (ring->count == 0) {
+    return 0;
+  }
+  *byte = ring->data[ring->head];
+  ring->head = (uint8_t)(ring->head + 1) & (COMMAND_RING_SIZE - 1);
+  ring->count--;
+  return 1;
+}
+
+static inline void parserInit(CommandParser *parser) {
+  parser->state = PARSE_START;
+  parser->digits = 0;
+  parser->command.type = 0;
+  parser->command.servo = 0;
+  parser->command.value = 0;
+  parser->accepted = 0;
+  parser->rejected = 0;
+}
+
+static inline uint8_t parserIsBlank(uint8_t byte) {
+  return byte == ' ' || byte == '\t' || byte == '\r';
+}
+
+// Feed one byte; returns 1 when it completes a command (copied to *command)
+static inline uint8_t parserFeed(CommandParser *parser, uint8_t byte, ServoCommand *command) {
+  uint8_t state = parser->state;
+  uint8_t isDigit = byte >= '0' && byte <= '9';
+
+  if (byte == '\n') {
+    parser->state = PARSE_START;
+    if (state == PARSE_TRAILING || (state == PARSE_VALUE && parser->digits > 0)) {
+      *command = parser->command;
+      parser->accepted++;
+      return 1;
+    }
+    if (state != PARSE_START) {
+      parser->rejected++;
+    }
+    return 0;
+  }
+
+  switch (state) {
+    case PARSE_START:
+      if (parserIsBlank(byte)) {
+        return 0;
+      }
+      parser->command.type = (char)byte;
+      parser->command.servo = 0;
+      parser->command.value = 0;
+      parser->digits = 0;
+      if (byte == 'H') {
+        parser->state = PARSE_TRAILING;
+      } else if (byte == 'T' || byte == 'R' || byte == 'P' || byte == 'N') {
+        parser->state = PARSE_VALUE;
+      } else if (byte == 'U' || byte == 'S' || byte == 'F') {
+        parser->state = PARSE_ID;
+      } else {
+        parser->state = PARSE_DISCARD;
+      }
+      return 0;
+
+    case PARSE_ID:
+      if (isDigit && parser->digits < COMMAND_MAX_ID_DIGITS) {
+        parser->command.servo = parser->command.servo * 10 + (byte - '0');
+        parser->digits++;
+      } else if (byte == ':' && parser->digits > 0) {
+        parser->state = PARSE_VALUE;
+        parser->digits = 0;
+      } else {
+        parser->state = PARSE_DISCARD;
+      }
+      return 0;
+
+    case PARSE_VALUE:
+      if (isDigit && parser->digits < COMMAND_MAX_VALUE_DIGITS) {
+        parser->command.value = parser->command.value * 10 + (byte - '0');
+        parser->digits++;
+      } else if (parserIsBlank(byte) && parser->digits > 0) {
+        parser->state = PARSE_TRAILING;
+      } else {
+        parser->state = PARSE_DISCARD;
+      }
+      return 0;
+
+    case PARSE_TRAILING:
+      if (!parserIsBlank(byte)) {
+        parser->state = PARSE_DISCARD;
+      }
+      return 0;
+
+    default:  // PARSE_DISCARD
+      return 0;
+  }
+}
+
+// Parse bytes from the ring until a command is complete (returns 1) or the ring is empty (returns 0)
+static inline uint8_t parserNext(CommandParser *parser, CommandRing *ring, ServoCommand *command) {
+  uint8_t byte;
+  while (ringPop(ring, &byte)) {
+    if (parserFeed(parser, byte, command)) {
+      return 1;
+    }
+  }
+  return 0;
+}
+
+#endif
@@ -0,0 +1,245 @@
+/*
+ * Host test and benchmark for command_parser.h (no Arduino needed)
+ *
+ * Build and run from the project folder (scripts/check_command_parser.py
+ * does all of this, and also compares the parser with firmware_sim.py):
+ *
+ *   gcc -O2 -Wall -Wextra -std=c99 -I arduino -o command_parser_test arduino/host_test/command_parser_test.c
+ *   ./command_parser_test               correctness tests
+ *   ./command_parser_test --bench [N]   parse N 16-servo frames (default 200000) and report throughput
+ *   ./command_parser_test --stdin       parse standard input, print one line per command
+ *                                       ("U3:1500", "H", ...) and "rejected <n>" at the end
+ *
+ * Exits with code 1 if a test fails.
+ */
+
+#define _POSIX_C_SOURCE 199309L
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+#include "command_parser.h"
+
+#define MAX_COMMANDS 64
+#define BENCH_SERVOS 16
+
+static int failures = 0;
+
+// Feed `text` through a ring in chunks of `chunk` bytes (like loop() draining Serial); returns the command count
+static int parseText(const char *text, size_t chunk, ServoCommand *commands, CommandParser *parser) {
+  CommandRing ring;
+  ServoCommand command;
+  size_t length = strlen(text);
+  size_t offset = 0;
+  int count = 0;
+  ringInit(&ring);
+  parserInit(parser);
+  while (offset < length) {
+    size_t i;
+    for (i = 0; i < chunk && offset < length && !ringFull(&ring); i++) {
+      ringPush(&ring, (uint8_t)text[offset++]);
+    }
+    while (parserNext(parser, &ring, &command)) {
+      if (count < MAX_COMMANDS) {
+        commands[count] = command;
+      }
+      count++;
+    }
+  }
+  return count;
+}
+
+// Format a command the way --stdin prints it
+static void formatCommand(const ServoCommand *command, char *out, size_t size) {
+  if (command->type == 'H') {
+    snprintf(out, size, "H");
+  } else if (command->type == 'T' || command->type == 'R' || command->type == 'P' || command->type == 'N') {
+    snprintf(out, size, "%c%lu", command->type, (unsigned long)command->value);
+  } else {
+    snprintf(out, size, "%c%u:%lu", command->type, (unsigned)command->servo, (unsigned long)command->value);
+  }
+}
+
+// Check that `text` parses to the commands in `expected` (space-separated, "" for none) with `rejected` bad lines
+static void expectParse(const char *text, const char *expected, uint32_t rejected) {
+  static const size_t chunks[] = {1, 3, 7, COMMAND_RING_SIZE};
+  size_t c;
+  for (c = 0; c < sizeof(chunks) / sizeof(chunks[0]); c++) {
+    ServoCommand commands[MAX_COMMANDS];
+    CommandParser parser;
+    char got[512] = "";
+    int count = parseText(text, chunks[c], commands, &parser);
+    int i;
+    for (i = 0; i < count && i < MAX_COMMANDS; i++) {
+      char one[32];
+      formatCommand(&commands[i], one, sizeof(one));
+      if (i > 0) {
+        strcat(got, " ");
+      }
+      strcat(got, one);
+    }
+    if (strcmp(got, expected) != 0 || parser.rejected != rejected || parser.accepted != (uint32_t)count) {
+      printf("FAIL: \"%s\" (chunks of %u): got [%s] rejected %lu, want [%s] rejected %lu\n", text, (unsigned)chunks[c],
+             got, (unsigned long)parser.rejected, expected, (unsigned long)rejected);
+      failures++;
+      return;
+    }
+  }
+}
+
+static void testRing(void) {
+  CommandRing ring;
+  uint8_t byte = 0;
+  int i;
+  ringInit(&ring);
+  for (i = 0; i < COMMAND_RING_SIZE; i++) {
+    if (!ringPush(&ring, (uint8_t)i)) {
+      printf("FAIL: ring full after %d bytes\n", i);
+      failures++;
+    }
+  }
+  if (ringPush(&ring, 0xFF) || !ringFull(&ring)) {
+    printf("FAIL: full ring accepted a byte\n");
+    failures++;
+  }
+  if (ring.highWater != COMMAND_RING_SIZE) {
+    printf("FAIL: ring high-water mark %u, want %d\n", ring.highWater, COMMAND_RING_SIZE);
+    failures++;
+  }
+  // Wrap around: take half, add half, everything comes out in order
+  for (i = 0; i < COMMAND_RING_SIZE / 2; i++) {
+    ringPop(&ring, &byte);
+  }
+  for (i = 0; i < COMMAND_RING_SIZE / 2; i++) {
+    ringPush(&ring, (uint8_t)(COMMAND_RING_SIZE + i));
+  }
+  for (i = COMMAND_RING_SIZE / 2; i < COMMAND_RING_SIZE * 3 / 2; i++) {
+    if (!ringPop(&ring, &byte) || byte != (uint8_t)i) {
+      printf("FAIL: ring returned %u, want %d\n", byte, i);
+      failures++;
+      return;
+    }
+  }
+  if (ringPop(&ring, &byte)) {
+    printf("FAIL: empty ring returned a byte\n");
+    failures++;
+  }
+}
+
+static void runTests(void) {
+  testRing();
+
+  // What the app sends
+  expectParse("U0:1500\n", "U0:1500", 0);
+  expectParse("S3:90\nU15:2500\n", "S3:90 U15:2500", 0);
+  expectParse("T250\nF0:1500\nF1:0\nR200\nH\n", "T250 F0:1500 F1:0 R200 H", 0);
+  expectParse("U0:1500\nU1:1000\nN65535\nP7\n", "U0:1500 U1:1000 N65535 P7", 0);
+  expectParse("U0:1500\r\n", "U0:1500", 0);  // Serial Monitor line endings
+  expectParse("  U1:1000 \t\r\n", "U1:1000", 0);
+
+  // Ranges are the sketch's job
+  expectParse("U99:9999\nT0\n", "U99:9999 T0", 0);
+  expectParse("U0:123456789\n", "U0:123456789", 0);
+
+  // Not commands
+  expectParse("\n\r\n  \n", "", 0);
+  expectParse("X1:1500\n", "", 1);
+  expectParse("U:1500\nU1:\nU1\nT\nR\nP\nN1:2\nU1:-5\n", "", 8);
+  expectParse("U 1:1500\nU1: 1500\nU1:15 00\nHello\nH1\n", "", 5);
+  expectParse("U1234:1500\nU1:1234567890\n", "", 2);  // Numbers too long
+  expectParse("U1:15\x01" "00\n", "", 1);
+
+  // A bad line doesn't affect the next one
+  expectParse("U1:abc\nU2:1500\n", "U2:1500", 1);
+  expectParse("garbage with: colons\nH\n", "H", 1);
+
+  // An unterminated line waits for its '\n'
+  expectParse("U1:1500", "", 0);
+}
+
+static double now(void) {
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+static void runBenchmark(long frames) {
+  // One frame: a pulse for each of 16 servos, as poll_loop sends them
+  char frame[BENCH_SERVOS * 12 + 1];
+  size_t frameLength = 0;
+  CommandRing ring;
+  CommandParser parser;
+  ServoCommand command;
+  unsigned long checksum = 0;
+  long f;
+  size_t offset;
+  double start, elapsed;
+  int s;
+
+  for (s = 0; s < BENCH_SERVOS; s++) {
+    frameLength += (size_t)sprintf(frame + frameLength, "U%d:%d\n", s, 1000 + s * 61);
+  }
+  ringInit(&ring);
+  parserInit(&parser);
+
+  start = now();
+  for (f = 0; f < frames; f++) {
+    offset = 0;
+    while (offset < frameLength) {
+      while (offset < frameLength && !ringFull(&ring)) {
+        ringPush(&ring, (uint8_t)frame[offset++]);
+      }
+      while (parserNext(&parser, &ring, &command)) {
+        checksum += command.servo + command.value;
+      }
+    }
+  }
+  elapsed = now() - start;
+
+  printf("Parsed %lu commands (%ld frames of %d servos, %lu bytes) in %.3f s\n", (unsigned long)parser.accepted,
+         frames, BENCH_SERVOS, (unsigned long)(frameLength * frames), elapsed);
+  printf("  %.1f M commands/s, %.2f ns/byte, %.0f ns per 16-servo frame (checksum %lu)\n",
+         parser.accepted / elapsed / 1e6, elapsed * 1e9 / (double)(frameLength * frames), elapsed * 1e9 / frames,
+         checksum);
+  if (parser.accepted != (uint32_t)(frames * BENCH_SERVOS) || parser.rejected != 0) {
+    printf("FAIL: benchmark parsed %lu commands, rejected %lu\n", (unsigned long)parser.accepted,
+           (unsigned long)parser.rejected);
+    failures++;
+  }
+}
+
+static void parseStdin(void) {
+  CommandRing ring;
+  CommandParser parser;
+  ServoCommand command;
+  char line[32];
+  int c;
+  ringInit(&ring);
+  parserInit(&parser);
+  while ((c = getchar()) != EOF) {
+    ringPush(&ring, (uint8_t)c);
+    while (parserNext(&parser, &ring, &command)) {
+      formatCommand(&command, line, sizeof(line));
+      puts(line);
+    }
+  }
+  printf("rejected %lu\n", (unsigned long)parser.rejected);
+}
+
+int main(int argc, char **argv) {
+  if (argc > 1 && strcmp(argv[1], "--stdin") == 0) {
+    parseStdin();
+    return 0;
+  }
+  if (argc > 1 && strcmp(argv[1], "--bench") == 0) {
+    runBenchmark(argc > 2 ? atol(argv[2]) : 200000);
+  } else {
+    runTests();
+    if (!failures) {
+      printf("Command parser tests passed\n");
+    }
+  }
+  return failures ? 1 : 0;
+}
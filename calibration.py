@@ -0,0 +1,111 @@
+"""
+Per-servo calibration for the RC Servo Racing Sim Controller
+
+Each servo gets its own endpoints (min / center / max pulse width in
+microseconds), a trim and a reverse switch. Those are baked into a lookup
+table that maps a normalized position (-1.0 to 1.0) straight to the pulse
+width to send, so the polling loop does a single table lookup per servo:
+
+    pulse = calibration.table[int((position + 1.0) * LUT_HALF)]
+
+The table has LUT_SIZE entries (steps of 0.001), finer than the 1 µs
+resolution of writeMicroseconds() over a normal servo range - about 5-10x
+the 181 steps of Servo.write(angle).
+
+The defaults (544 / 1472 / 2400 µs) match what Servo.write(0..180) produces,
+so an uncalibrated servo moves exactly as before.
+
+The failsafe pulse width is where the firmware puts the servo if the host
+stops talking to it (see the firmware sketches). It defaults to the trimmed
+center - neutral for an ESC, straight ahead for steering.
+"""
+
+from array import array
+
+LUT_SIZE = 2001  # Positions -1.0 ... 1.0 in steps of 0.001
+LUT_HALF = (LUT_SIZE - 1) // 2
+
+# Pulse widths the Arduino Servo / ESP32Servo libraries use for write(0) and write(180)
+SERVO_MIN_US = 544
+SERVO_MAX_US = 2400
+
+# Range the firmware accepts for U<id>:<us> commands
+PULSE_LIMIT_MIN_US = 500
+PULSE_LIMIT_MAX_US = 2500
+
+
+def pulse_to_angle(pulse):
+    """Angle (0-180) that Servo.write() would use for this pulse width - for display"""
+    return (pulse - SERVO_MIN_US) * 180.0 / (SERVO_MAX_US - SERVO_MIN_US)
+
+
+class ServoCalibration:
+    """Endpoints, trim, direction and failsafe position of one servo, plus its lookup table"""
+    def __init__(self, min_us=SERVO_MIN_US, center_us=(SERVO_MIN_US + SERVO_MAX_US) // 2,
+                 max_us=SERVO_MAX_US, trim_us=0, reverse=False, failsafe_us=None):
+        self.min_us = min_us
+        self.center_us = center_us
+        self.max_us = max_us
+        self.trim_us = trim_us
+        self.reverse = reverse
+        self.failsafe_us = failsafe_us  # None = trimmed center
+        self.table = array('H')
+        self.validate()
+        self.build_table()
+
+    def validate(self):
+        """Raise ValueError if the endpoints don't make sense"""
+        if not PULSE_LIMIT_MIN_US <= self.min_us < self.center_us < self.max_us <= PULSE_LIMIT_MAX_US:
+            raise ValueError(f"Need {PULSE_LIMIT_MIN_US} <= min < center < max <= {PULSE_LIMIT_MAX_US} µs "
+                             f"(got {self.min_us} / {self.center_us} / {self.max_us})")
+        if self.failsafe_us is not None and not self.min_us <= self.failsafe_us <= self.max_us:
+            raise ValueError(f"Failsafe must be between min and max (got {self.failsafe_us} µs)")
+
+    def build_table(self):
+        """Precompute the pulse width for every table position"""
+        table = array('H', bytes(2 * LUT_SIZE))
+        center = self.center_us + self.trim_us
+        for index in range(LUT_SIZE):
+            position = index / LUT_HALF - 1.0
+            if self.reverse:
+                position = -position
+            if position >= 0:
+                pulse = center + position * (self.max_us - self.center_us)
+            else:
+                pulse = center + position * (self.center_us - self.min_us)
+            # Trim shifts the whole travel but never past the endpoints
+            table[index] = int(round(max(self.min_us, min(self.max_us, pulse))))
+        self.table = table  # Single reference swap - the polling thread may be reading the old one
+
+    def pulse(self, position):
+        """Pulse width for a normalized position (-1.0 to 1.0)"""
+        position = max(-1.0, min(1.0, position))
+        return self.table[int((position + 1.0) * LUT_HALF)]
+
+    def failsafe_pulse(self):
+        """Pulse width the firmware falls back to when the host goes quiet"""
+        if self.failsafe_us is not None:
+            return self.failsafe_us
+        return self.table[LUT_HALF]
+
+    def to_dict(self):
+        """Plain data for JSON"""
+        return {
+            'min_us': self.min_us,
+            'center_us': self.center_us,
+            'max_us': self.max_us,
+            'trim_us': self.trim_us,
+            'reverse': self.reverse,
+            'failsafe_us': self.failsafe_us
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict() (raises ValueError for invalid data)"""
+        try:
+            failsafe_us = data.get('failsafe_us')
+            return cls(int(data['min_us']), int(data['center_us']), int(data['max_us']),
+                       int(data.get('trim_us', 0)), bool(data.get('reverse', False)),
+                       None if failsafe_us is None else int(failsafe_us))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid calibration: {e}")
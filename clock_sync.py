@@ -0,0 +1,116 @@
+"""
+Host / board clock synchronization for the RC Servo Racing Sim Controller
+
+The board timestamps with micros(): 32 bits (it wraps every ~71.6 minutes),
+and the UNO's ceramic resonator can run up to ~0.5 % fast or slow. The host
+uses time.perf_counter_ns(). ClockSync maps one onto the other from ping /
+pong exchanges:
+
+    host sends "P<seq>"            at host time t0
+    board reads it                 at board time b   (replies "OK:P<seq>:<b>")
+    host reads the reply           at host time t3
+
+The round trip t3 - t0 is the time to send the ping's bytes, the reply's
+bytes (known from the baud rate) and twice the rest of the path (USB, drivers,
+the board's loop), assumed the same both ways. So the board read the ping at
+host time t0 + ping bytes + half the rest, which gives one (host, board)
+sample. Samples with the shortest round trip waited in the fewest queues, so
+the model is a least-squares line through the fastest of every GROUP
+consecutive samples in the last WINDOW (spread over the whole window, so the
+slope sees the full span): its slope is the drift between the two clocks,
+and half the longest round trip among them bounds the error.
+
+The reply has to be timestamped as soon as it arrives - one that sat in the
+buffer until the next tick would look like a slow round trip - so
+ArduinoManager's serial reader thread stamps every line as it reads it, and
+the polling thread, which never waits for a reply, handles it on its next
+tick. Samples are added and timestamps converted on the polling thread; the
+fitted model is published as one tuple, so the UI can read drift_ppm and
+error_bound_ns at any time.
+"""
+
+from collections import deque
+
+WINDOW = 64  # Samples kept (at one ping per PING_INTERVAL, about half a minute)
+GROUP = 4  # The model is fitted to the fastest sample of every GROUP in a row
+MIN_DRIFT_SAMPLES = 8  # Assume both clocks tick at the same rate until there are this many
+MIN_DRIFT_SPAN_NS = 2_000_000_000  # ... spread over at least this long
+NOMINAL_RATE = 1e-3  # Board microseconds per host nanosecond
+
+PING_INTERVAL = 0.5  # Seconds between pings once synced
+PING_INTERVAL_FAST = 0.05  # ... until there are MIN_DRIFT_SAMPLES samples
+
+
+def serial_time_ns(byte_count, baudrate):
+    """Nanoseconds to send byte_count bytes on a UART (8N1: 10 bits per byte)"""
+    return byte_count * 10 * 1_000_000_000 // baudrate if baudrate else 0
+
+
+class ClockSync:
+    """Estimates the offset and drift between the board's micros() and perf_counter_ns()"""
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)  # (host ns, unwrapped board us, round trip ns)
+        self.model = None  # (host ref ns, board ref us, board us per host ns, error bound ns)
+        self.last_board_us = None
+        self.wraps = 0
+
+    def reset(self):
+        """Forget the board's clock (new connection or the board reset)"""
+        self.samples = deque(maxlen=self.samples.maxlen)
+        self.model = None
+        self.last_board_us = None
+        self.wraps = 0
+
+    def unwrap(self, board_us):
+        """micros() value -> a count that keeps going across the 32-bit wrap (feed timestamps in order)"""
+        last = self.last_board_us
+        if last is not None and board_us < last and last - board_us > 0x80000000:
+            self.wraps += 1
+        self.last_board_us = board_us
+        return board_us + (self.wraps << 32)
+
+    def add_sample(self, sent_ns, board_us, received_ns, out_ns=0, back_ns=0):
+        """One ping: sent / received on the host clock, board_us from the reply, and the time the ping's
+        (out_ns) and the reply's (back_ns) bytes take on the wire"""
+        round_trip = received_ns - sent_ns
+        path_ns = max(0, round_trip - out_ns - back_ns) // 2
+        self.samples.append((sent_ns + out_ns + path_ns, self.unwrap(board_us), round_trip))
+        self.fit()
+
+    def fit(self):
+        samples = list(self.samples)
+        fast = [min(samples[start:start + GROUP], key=lambda sample: sample[2])
+                for start in range(0, len(samples), GROUP)]
+        host_ref = sum(sample[0] for sample in fast) / len(fast)
+        board_ref = sum(sample[1] for sample in fast) / len(fast)
+        rate = NOMINAL_RATE
+        if len(samples) >= MIN_DRIFT_SAMPLES and len(fast) >= 2:
+            spread = sum((sample[0] - host_ref) ** 2 for sample in fast)
+            span = max(sample[0] for sample in fast) - min(sample[0] for sample in fast)
+            if span >= MIN_DRIFT_SPAN_NS and spread > 0:
+                rate = sum((sample[0] - host_ref) * (sample[1] - board_ref) for sample in fast) / spread
+        self.model = (host_ref, board_ref, rate, max(sample[2] for sample in fast) / 2)
+
+    def board_to_host_ns(self, board_us):
+        """perf_counter_ns() time of a board micros() timestamp (None until the first sample)"""
+        model = self.model
+        if model is None:
+            return None
+        host_ref, board_ref, rate, _ = model
+        return host_ref + (self.unwrap(board_us) - board_ref) / rate
+
+    @property
+    def synced(self):
+        return self.model is not None
+
+    @property
+    def drift_ppm(self):
+        """How much faster the board's clock runs than the host's (parts per million)"""
+        model = self.model
+        return (model[2] / NOMINAL_RATE - 1.0) * 1e6 if model else 0.0
+
+    @property
+    def error_bound_ns(self):
+        """Worst-case error of board_to_host_ns() (half the longest round trip the model is fitted to)"""
+        model = self.model
+        return model[3] if model else None
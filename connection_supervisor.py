@@ -0,0 +1,173 @@
+"""
+Background serial connection supervisor for the RC Servo Racing Sim Controller
+
+Opening the port and waiting for the board's READY message takes seconds, so
+it must never happen on the Tk thread. ConnectionSupervisor owns that work on
+its own thread:
+
+- connect() / disconnect() only record what the user wants and wake the
+  thread; they return immediately.
+- The thread opens the port (ArduinoManager.connect), and while connected
+  watches for the link going bad: a failed write or read (the board reset or
+  the cable came out), the device node disappearing, or a board that has
+  stopped answering heartbeats for a while.
+- The first attempt uses the baud rate that last worked on the port (from
+  PortWatcher.known_baudrates) and only auto-detects if the board does not
+  answer READY at it.
+- A lost link is reopened with exponential backoff (0.5 s, 1 s, 2 s ... up to
+  15 s), reusing the baud rate that worked instead of auto-detecting again.
+  When a PortWatcher reports the port back (the board was plugged in again)
+  the next attempt starts at once instead of waiting out the backoff.
+  ArduinoManager then hands every servo's current position to the board on
+  the next polling tick (see ArduinoManager.resend_state).
+
+Progress is published as `status`, a (seq, state, message) tuple replaced in
+one assignment, which the UI polls - the supervisor never touches Tk.
+"""
+
+import os
+import threading
+import time
+
+DISCONNECTED = 'disconnected'
+CONNECTING = 'connecting'
+CONNECTED = 'connected'
+RECONNECTING = 'reconnecting'
+
+BACKOFF_START = 0.5  # Seconds before the first reconnect attempt
+BACKOFF_MAX = 15.0
+CHECK_INTERVAL = 0.25  # Seconds between link checks while connected
+SILENT_RECONNECT_AFTER = 3.0  # Reopen the port if the board has not answered for this long
+
+
+class ConnectionSupervisor:
+    """Connects, watches and reconnects an ArduinoManager on a background thread"""
+    def __init__(self, arduino):
+        self.arduino = arduino
+        self.target = None  # (port, baudrate) the user wants, None = disconnected
+        self.known_baudrate = None  # Baud rate that worked for the target (reconnects skip detection)
+        self.known_verified = False  # known_baudrate worked this time, not just on an earlier connect
+        self.wake = threading.Event()
+        self.thread = None
+        self.running = False
+        self.status = (0, DISCONNECTED, "Disconnected")
+        self.attempts = 0  # Failed attempts since the last successful connect
+        self.reconnects = 0  # Successful reconnects after a lost link
+
+    def connect(self, port, baudrate, known_baudrate=None):
+        """Start connecting to a port (returns immediately; watch `status`)
+
+        known_baudrate: the rate that last worked on this port, tried instead of
+        auto-detecting (detection still runs if the board doesn't answer at it).
+        """
+        self.known_baudrate = known_baudrate
+        self.known_verified = False
+        self.target = (port, baudrate)
+        self.attempts = 0
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        self.wake.set()
+
+    def disconnect(self):
+        """Close the port and stop reconnecting (returns immediately)"""
+        self.target = None
+        self.wake.set()
+
+    def stop(self):
+        """Disconnect and end the thread (on exit)"""
+        self.running = False
+        self.disconnect()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+        if self.arduino.connected:
+            self.arduino.disconnect()
+
+    @property
+    def wanted(self):
+        """True while the user wants a connection (connected or trying to be)"""
+        return self.target is not None
+
+    def ports_changed(self, ports):
+        """PortWatcher listener: retry right away when the port we are waiting for comes back"""
+        target = self.target
+        if target is not None and self.arduino.serial_connection is None and \
+                any(port['device'] == target[0] for port in ports):
+            self.wake.set()
+    
+    def publish(self, state, message):
+        """Replace the status (supervisor thread only)"""
+        self.status = (self.status[0] + 1, state, message)
+
+    def sleep(self, seconds):
+        """Wait, but wake up early for connect() / disconnect()"""
+        self.wake.wait(seconds)
+        self.wake.clear()
+
+    def run(self):
+        arduino = self.arduino
+        while self.running:
+            target = self.target
+            if target is None:
+                if arduino.connected or arduino.serial_connection:
+                    arduino.disconnect()
+                if self.status[1] != DISCONNECTED:
+                    self.publish(DISCONNECTED, "Disconnected")
+                self.sleep(None)
+                continue
+
+            port, baudrate = target
+            if arduino.serial_connection is not None:
+                # Port is open: check on it
+                problem = self.check_link(port)
+                if problem is None:
+                    self.sleep(CHECK_INTERVAL)
+                    continue
+                print(f"[WARNING] Connection to {port} lost: {problem}")
+                arduino.disconnect()
+                self.attempts = 1
+                self.publish(RECONNECTING, f"Connection lost ({problem}) - reconnecting...")
+                self.sleep(BACKOFF_START)
+                continue
+
+            if self.attempts:
+                self.publish(RECONNECTING, f"Reconnecting to {port} (attempt {self.attempts + 1})...")
+            else:
+                self.publish(CONNECTING, f"Connecting to {port}...")
+            known = self.known_baudrate
+            ok = arduino.connect(port, known or baudrate, detect_baudrate=known is None)
+            if self.target is not target:
+                continue  # The user changed their mind while we were connecting
+            if ok and known is not None and not self.known_verified and not arduino.ready_seen:
+                # No READY at the remembered rate (reflashed board?) - detect it after all
+                print(f"[INFO] No answer from {port} at {known} baud - detecting the baud rate")
+                arduino.disconnect()
+                self.known_baudrate = None
+                continue
+            if ok:
+                if self.attempts:
+                    self.reconnects += 1
+                self.attempts = 0
+                self.known_baudrate = arduino.baudrate
+                self.known_verified = True
+                self.publish(CONNECTED, f"Connected: {port}")
+                continue
+            arduino.disconnect()
+            delay = min(BACKOFF_MAX, BACKOFF_START * 2 ** self.attempts)
+            self.attempts += 1
+            self.publish(RECONNECTING, f"Can't open {port} - retrying in {delay:.1f} s")
+            self.sleep(delay)
+
+    def check_link(self, port):
+        """None while the link looks healthy, otherwise what is wrong with it"""
+        arduino = self.arduino
+        if not arduino.connected:
+            return arduino.link_error or "port closed"
+        if port.startswith('/dev/') and not os.path.exists(port):
+            return "device removed"
+        last = arduino.last_receive_time
+        if arduino.board_silent and last is not None and time.perf_counter() - last > SILENT_RECONNECT_AFTER:
+            return f"no response for {SILENT_RECONNECT_AFTER:g} s"
+        return None
@@ -0,0 +1,306 @@
+"""
+Python reference implementation of the servo firmware for the RC Servo Racing Sim Controller
+
+FirmwareSim follows arduino/arduino_servo_control.ino (and the ESP32-S3
+sketch, which only differs in pins and baud rate) command for command: the
+same grammar as arduino/command_parser.h (parse_command), the same replies,
+the same failsafe timer and the same telemetry lines. Time is passed in
+explicitly (milliseconds, like millis()), so timeouts can be checked exactly
+and without hardware:
+
+    board = FirmwareSim()
+    board.receive(b"T100\\nF0:1500\\nU0:2000\\n", now_ms=0)
+    board.update(now_ms=99)    # [] - still inside the timeout
+    board.update(now_ms=100)   # ['FAILSAFE:100'] - servo 0 is back at 1500 µs
+
+micros() is now_ms * 1000 unless a separate now_us is passed.
+
+SimulatedBoard wraps a FirmwareSim in the parts of the serial.Serial
+interface ArduinoManager uses, running on the real clock, so the app's own
+heartbeat and silent-board detection can be exercised end to end (see
+scripts/simulate_failsafe.py), and with a link delay and a board clock that
+drifts, the clock sync (scripts/measure_link_latency.py). Keep this file in
+step with the sketches.
+"""
+
+import re
+import threading
+import time
+
+MAX_SERVOS = 12  # Arduino UNO R3 sketch (the ESP32-S3 sketch has 16)
+
+# Pulse width limits (microseconds) for U and F commands
+MIN_PULSE_US = 500
+MAX_PULSE_US = 2500
+
+# Pulse widths that S commands map 0 and 180 degrees to (same as Servo.write())
+ANGLE_0_US = 544
+ANGLE_180_US = 2400
+
+LOOP_PERIOD_MS = 1  # How often SimulatedBoard runs loop() (the sketch's loop has no delay)
+COMMAND_RING_SIZE = 64  # Receive ring in command_parser.h
+
+# command_parser.h's grammar (blanks around the command, numbers limited to 3 and 9 digits)
+COMMAND_PATTERN = re.compile(rb"[ \t\r]*(?:(H)|([TRPN])([0-9]{1,9})|([USF])([0-9]{1,3}):([0-9]{1,9}))[ \t\r]*")
+BLANKS = b" \t\r"
+
+
+def parse_command(line):
+    """One line (bytes, without the '\n') as (type, servo_id, value), or None if it is not a command"""
+    match = COMMAND_PATTERN.fullmatch(line)
+    if match is None:
+        return None
+    if match.group(1):
+        return 'H', 0, 0
+    if match.group(2):
+        return match.group(2).decode(), 0, int(match.group(3))
+    return match.group(4).decode(), int(match.group(5)), int(match.group(6))
+
+
+def arduino_map(value, from_low, from_high, to_low, to_high):
+    """map() from the Arduino core (integer arithmetic, truncating)"""
+    return int((value - from_low) * (to_high - to_low) / (from_high - from_low)) + to_low
+
+
+class FirmwareSim:
+    """Firmware state and command handling, driven by an explicit millisecond clock"""
+    def __init__(self, max_servos=MAX_SERVOS):
+        self.max_servos = max_servos
+        self.attached = [False] * max_servos
+        self.pulses = [0] * max_servos  # Last pulse width written to each servo
+        self.failsafe_timeout_ms = 0  # 0 = failsafe off
+        self.failsafe_pulses = [0] * max_servos  # 0 = hold last position
+        self.last_frame_ms = 0
+        self.failsafe_active = False
+        self.pending = bytearray()  # Bytes of a line that has not been terminated yet
+        self.accepted = 0  # Commands parsed (CommandParser.accepted)
+        self.rejected = 0  # Lines that were not commands (CommandParser.rejected)
+        self.telemetry_interval_ms = 0  # 0 = telemetry off
+        self.last_telemetry_ms = 0
+        self.loop_count = 0  # update() calls since the last telemetry line
+        self.rx_high_water = 0  # Largest receive() since the last telemetry line, capped at the ring size
+        self.micros = 0  # micros() at the current receive() / update()
+
+    def set_time(self, now_ms, now_us):
+        self.micros = (now_ms * 1000 if now_us is None else now_us) & 0xFFFFFFFF
+
+    def receive(self, data, now_ms, now_us=None):
+        """Handle bytes from the host; returns the reply lines (without newlines)"""
+        self.set_time(now_ms, now_us)
+        self.pending += data
+        self.rx_high_water = max(self.rx_high_water, min(len(data), COMMAND_RING_SIZE))
+        replies = []
+        while True:
+            end = self.pending.find(b"\n")
+            if end < 0:
+                break
+            line = bytes(self.pending[:end])
+            del self.pending[:end + 1]
+            command = parse_command(line)
+            if command is None:
+                if line.strip(BLANKS):
+                    self.rejected += 1
+                continue
+            self.accepted += 1
+            reply = self.handle_command(*command, now_ms)
+            if reply is not None:
+                replies.append(reply)
+        return replies
+
+    def handle_command(self, kind, servo_id, value, now_ms):
+        """One parsed command, as handleCommand() applies it; returns the reply or None"""
+        if kind == 'H':
+            self.frame_received(now_ms)
+            return "OK:H"
+        if kind == 'T':
+            self.failsafe_timeout_ms = value
+            self.frame_received(now_ms)
+            return f"OK:T{value}"
+        if kind == 'R':
+            self.telemetry_interval_ms = value
+            self.loop_count = 0
+            self.last_telemetry_ms = now_ms
+            self.frame_received(now_ms)
+            return f"OK:R{value}"
+        if kind == 'P' or kind == 'N':
+            # Clock sync ping / end of frame: when it was read
+            self.frame_received(now_ms)
+            return f"OK:{kind}{value}:{self.micros}"
+        if servo_id >= self.max_servos:
+            return None
+        if kind == 'F':
+            # Failsafe pulse width (0 = hold position)
+            if value != 0 and not MIN_PULSE_US <= value <= MAX_PULSE_US:
+                return None
+            self.failsafe_pulses[servo_id] = value
+        else:
+            if kind == 'U' and MIN_PULSE_US <= value <= MAX_PULSE_US:
+                pulse = value
+            elif kind == 'S' and value <= 180:
+                pulse = arduino_map(value, 0, 180, ANGLE_0_US, ANGLE_180_US)
+            else:
+                return None
+            self.attached[servo_id] = True
+            self.pulses[servo_id] = pulse
+        self.frame_received(now_ms)
+        return f"OK:{kind}{servo_id}:{value}"
+
+    def frame_received(self, now_ms):
+        """A valid command arrived: restart the failsafe timer"""
+        self.last_frame_ms = now_ms
+        self.failsafe_active = False
+
+    def update(self, now_ms, now_us=None):
+        """The end of one loop(): checkFailsafe() then sendTelemetry(); returns the lines printed"""
+        self.set_time(now_ms, now_us)
+        lines = self.check_failsafe(now_ms)
+        self.loop_count += 1
+        return lines + self.send_telemetry(now_ms)
+
+    def check_failsafe(self, now_ms):
+        """checkFailsafe(): returns ["FAILSAFE:<ms>"] the moment the failsafe trips, else []"""
+        if self.failsafe_timeout_ms == 0 or self.failsafe_active:
+            return []
+        silent_ms = now_ms - self.last_frame_ms
+        if silent_ms < self.failsafe_timeout_ms:
+            return []
+        self.failsafe_active = True
+        for servo_id, pulse in enumerate(self.failsafe_pulses):
+            if self.attached[servo_id] and pulse > 0:
+                self.pulses[servo_id] = pulse
+        return [f"FAILSAFE:{silent_ms}"]
+
+    def send_telemetry(self, now_ms):
+        """sendTelemetry(): returns ["TEL:..."] when a telemetry line is due, else []"""
+        elapsed_ms = now_ms - self.last_telemetry_ms
+        if self.telemetry_interval_ms == 0 or elapsed_ms < self.telemetry_interval_ms:
+            return []
+        loop_rate = self.loop_count * 1000 // elapsed_ms
+        pulses = "".join(f"{pulse:03X}" for pulse in self.pulses)
+        line = f"TEL:{self.micros},{loop_rate},{self.accepted},{self.rejected},{self.rx_high_water},{pulses}"
+        self.last_telemetry_ms = now_ms
+        self.loop_count = 0
+        self.rx_high_water = 0
+        return [line]
+
+
+class SimulatedBoard:
+    """A FirmwareSim behind a serial.Serial-like interface, on the real clock
+
+    A background thread plays loop(): it checks the failsafe every
+    LOOP_PERIOD_MS. Set `silent` to stop the board from replying (a board that
+    hung, or a cable that only lost its receive direction); set `unplugged`
+    to make it drop everything it is sent as well.
+
+    latency_ms delays every write and every reply by that long (bytes sent
+    are then read by the next loop() after they arrive, as on a real board),
+    and a baudrate makes each direction a UART wire that sends one byte per
+    10 bits. The board's clock runs clock_rate times as fast as the host's, and its
+    micros() starts at start_us (near 2**32 to test the wrap).
+    """
+    def __init__(self, max_servos=MAX_SERVOS, latency_ms=0.0, clock_rate=1.0, start_us=0, baudrate=0):
+        self.firmware = FirmwareSim(max_servos)
+        self.lock = threading.Lock()
+        self.replies = bytearray()
+        self.latency = latency_ms / 1000.0
+        self.byte_time = 10.0 / baudrate if baudrate else 0.0
+        self.delayed = bool(self.latency or self.byte_time)
+        self.wire_free = [0.0, 0.0]  # When the host -> board / board -> host wire is done sending
+        self.clock_rate = clock_rate
+        self.start_us = start_us
+        self.inbox = []  # (perf_counter time it arrives, bytes) written by the host, still on the way
+        self.outbox = []  # (perf_counter time it arrives, bytes) replies still on the way
+        self.silent = False
+        self.unplugged = False
+        self.failsafe_times = []  # perf_counter times the failsafe tripped
+        self.timeout = 2.0  # read() waits this long for a byte, like serial.Serial
+        self.origin = time.perf_counter()
+        self.running = True
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def now_ms(self):
+        return int((time.perf_counter() - self.origin) * self.clock_rate * 1000)
+
+    def now_us(self):
+        """micros(): the board's clock, which SimulatedBoard knows exactly (for checking clock_sync.py)"""
+        return int((time.perf_counter() - self.origin) * self.clock_rate * 1e6) + self.start_us
+
+    def loop(self):
+        while self.running:
+            with self.lock:
+                now = time.perf_counter()
+                while self.inbox and self.inbox[0][0] <= now:
+                    self.reply(self.firmware.receive(self.inbox.pop(0)[1], self.now_ms(), self.now_us()))
+                lines = self.firmware.update(self.now_ms(), self.now_us())
+                if lines:
+                    if lines[0].startswith("FAILSAFE:"):
+                        self.failsafe_times.append(time.perf_counter())
+                    self.reply(lines)
+            time.sleep(LOOP_PERIOD_MS / 1000.0)
+
+    def reply(self, lines):
+        if not self.silent:
+            for line in lines:
+                data = line.encode() + b"\r\n"  # Serial.println() ends lines with CR LF
+                if self.delayed:
+                    self.send(self.outbox, 1, data)
+                else:
+                    self.replies += data
+
+    def send(self, box, direction, data):
+        """Queue data in box for when its last byte is through the wire and the latency (lock held)"""
+        start = max(time.perf_counter(), self.wire_free[direction])
+        self.wire_free[direction] = start + len(data) * self.byte_time
+        box.append((self.wire_free[direction] + self.latency, data))
+
+    def deliver(self):
+        """Move replies that have arrived to the receive buffer (lock held)"""
+        now = time.perf_counter()
+        while self.outbox and self.outbox[0][0] <= now:
+            self.replies += self.outbox.pop(0)[1]
+
+    def write(self, data):
+        with self.lock:
+            if self.unplugged:
+                pass
+            elif self.delayed:
+                self.send(self.inbox, 0, bytes(data))
+            else:
+                self.reply(self.firmware.receive(bytes(data), self.now_ms(), self.now_us()))
+        return len(data)
+
+    @property
+    def in_waiting(self):
+        with self.lock:
+            self.deliver()
+            return len(self.replies)
+
+    def readline(self):
+        with self.lock:
+            self.deliver()
+            end = self.replies.find(b"\n")
+            if end < 0:
+                line, self.replies = bytes(self.replies), bytearray()
+            else:
+                line, self.replies = bytes(self.replies[:end + 1]), self.replies[end + 1:]
+        return line
+
+    def read(self, size=1):
+        """Up to size bytes, waiting up to `timeout` for the first one"""
+        deadline = time.perf_counter() + (self.timeout or 0.0)
+        while True:
+            with self.lock:
+                self.deliver()
+                if self.replies or not self.running or time.perf_counter() >= deadline:
+                    data, self.replies = bytes(self.replies[:size]), self.replies[size:]
+                    return data
+            time.sleep(0.0002)
+
+    def reset_input_buffer(self):
+        with self.lock:
+            self.replies = bytearray()
+            self.outbox = []
+
+    def close(self):
+        self.running = False
@@ -0,0 +1,284 @@
+"""
+Racing game UDP telemetry input for the RC Servo Racing Sim Controller
+
+Many racing games broadcast their physics state as UDP packets: Forza
+("Data Out"), and Codemasters titles such as DiRT Rally and the older F1
+games ("extradata" 3). GameTelemetry listens for them and appears as one
+more controller, GAME_TELEMETRY_CONTROLLER ("G:" in the controller list),
+whose axes are telemetry channels. Mappings and the mixer drive gauge
+needles and motion-seat servos from them exactly like from a wheel axis.
+
+    axis  channel          -1 ............ 1
+    0     speed            standstill ..... SPEED_FULL_SCALE
+    1     RPM              0 .............. the car's max RPM
+    2     lateral g        -G_FULL_SCALE .. +G_FULL_SCALE (the game's sign)
+    3     longitudinal g   -G_FULL_SCALE .. +G_FULL_SCALE
+    4     vertical g       -G_FULL_SCALE .. +G_FULL_SCALE
+    5     steering         full left ...... full right
+    6     throttle         released ....... floored
+    7     brake            released ....... floored
+    8-11  suspension FL, FR, RL, RR: Forza's normalized travel (fully
+          extended .. fully compressed), Codemasters' position in mm
+          (-SUSPENSION_FULL_SCALE_MM .. +SUSPENSION_FULL_SCALE_MM)
+    button 0: packets are arriving, button 1: the game says a race is on
+
+Channels a format doesn't carry (Forza's "Sled" has no speed or pedals) sit
+at rest: -1 for the 0-based ones (speed, RPM, pedals), 0 for the others. If
+no packet arrives for STALE_AFTER seconds (game paused or closed) every
+channel goes to rest, so needles drop and a motion seat levels out.
+
+Games send 60 to 360 packets a second, far more than the 20 Hz polling
+loop reads, so the receiving thread does as little as possible per packet:
+
+    sock.recv_into(buffer)             one bytearray, allocated at start()
+    format = FORMATS_BY_SIZE[size]     the packet size identifies the format
+    format.struct.unpack_from(buffer)  precompiled, reads only the fields the
+                                       channels use (pad bytes skip the rest)
+    self.latest = (format, values, t)  published in one assignment
+
+The unpacked values and the tuple that publishes them are the only objects
+made per packet. get_state() on the polling thread scales the newest packet
+into a preallocated ControllerState once per tick, skipping packets no tick
+would have seen.
+"""
+
+import socket
+import struct
+import threading
+import time
+from array import array
+
+GAME_TELEMETRY_CONTROLLER = -2  # Controller index in mappings and the mixer (-1 is the virtual wheel)
+
+DEFAULT_ADDRESS = ("127.0.0.1", 20777)  # Codemasters' default port; set Forza's "Data Out" to the same
+RECEIVE_BUFFER = 2048  # Larger than any supported packet
+SOCKET_BUFFER = 256 * 1024  # Kernel receive buffer: absorbs bursts while the thread waits for the GIL
+RECEIVE_TIMEOUT = 0.25  # Seconds; how quickly stop() is noticed
+STALE_AFTER = 0.5  # Seconds without a packet before every channel goes to rest
+
+SPEED_FULL_SCALE = 90.0  # m/s (324 km/h, 201 mph)
+G_FULL_SCALE = 3.0  # g
+SUSPENSION_FULL_SCALE_MM = 100.0
+STANDARD_GRAVITY = 9.80665  # m/s² per g
+
+CHANNEL_NAMES = ("Speed", "RPM", "Lateral g", "Longitudinal g", "Vertical g", "Steering", "Throttle", "Brake",
+                 "Suspension FL", "Suspension FR", "Suspension RL", "Suspension RR")
+UNIPOLAR = (True, True, False, False, False, False, True, True, False, False, False, False)  # 0-based channels
+REST = array('d', (-1.0 if unipolar else 0.0 for unipolar in UNIPOLAR))
+SPEED, RPM, LATERAL_G, LONGITUDINAL_G, VERTICAL_G, STEERING, THROTTLE, BRAKE = range(8)
+SUSPENSION = (8, 9, 10, 11)
+SUSPENSION_FIELDS = ('susp_fl', 'susp_fr', 'susp_rl', 'susp_rr')
+BUTTON_RECEIVING = 0
+BUTTON_RACE_ON = 1
+
+
+class PacketFormat:
+    """One game's packet layout, compiled to a struct that unpacks just the fields the channels use
+
+    fields: (name, byte offset, struct code) per field to read. channels:
+    (axis, field, low, high, divisor field) - the field's value (divided by
+    the divisor field's, for RPM / max RPM) from low..high onto -1..1.
+    """
+    __slots__ = ('name', 'size', 'struct', 'fields', 'channels', 'race_on')
+
+    def __init__(self, name, size, fields, channels, race_on=None):
+        self.name = name
+        self.size = size
+        fields = sorted(fields, key=lambda field: field[1])
+        code = '<'
+        position = 0
+        index = {}
+        for field_name, offset, field_code in fields:
+            if offset > position:
+                code += f"{offset - position}x"
+            code += field_code
+            position = offset + struct.calcsize('<' + field_code)
+            index[field_name] = len(index)
+        self.struct = struct.Struct(code)
+        self.fields = tuple(index)  # Field names in unpacked order
+        assert self.struct.size <= size
+        # (axis, value index, scale, offset, divisor index or -1): axis = value [/ divisor] * scale + offset
+        compiled = []
+        for axis, field, low, high, divisor in channels:
+            scale = 2.0 / (high - low)
+            compiled.append((axis, index[field], scale, -1.0 - low * scale, index[divisor] if divisor else -1))
+        self.channels = tuple(compiled)
+        self.race_on = index[race_on] if race_on else -1
+
+
+def forza_format(name, size, dash_offset):
+    """Forza "Data Out": the 232-byte "Sled" block, then (dash_offset) the "Dash" block"""
+    fields = [('race_on', 0, 'i'), ('max_rpm', 8, 'f'), ('rpm', 16, 'f'),
+              ('accel_x', 20, 'f'), ('accel_y', 24, 'f'), ('accel_z', 28, 'f'),
+              ('susp_fl', 68, 'f'), ('susp_fr', 72, 'f'), ('susp_rl', 76, 'f'), ('susp_rr', 80, 'f')]
+    g = G_FULL_SCALE * STANDARD_GRAVITY  # Accelerations are in m/s²
+    channels = [(RPM, 'rpm', 0.0, 1.0, 'max_rpm'), (LATERAL_G, 'accel_x', -g, g, None),
+                (VERTICAL_G, 'accel_y', -g, g, None), (LONGITUDINAL_G, 'accel_z', -g, g, None)]
+    # Normalized suspension travel: 0 = fully extended, 1 = fully compressed
+    channels += [(axis, field, 0.0, 1.0, None) for axis, field in zip(SUSPENSION, SUSPENSION_FIELDS)]
+    if dash_offset is not None:
+        fields += [('speed', dash_offset + 12, 'f'), ('accel', dash_offset + 71, 'B'),
+                   ('brake', dash_offset + 72, 'B'), ('steer', dash_offset + 76, 'b')]
+        channels += [(SPEED, 'speed', 0.0, SPEED_FULL_SCALE, None), (THROTTLE, 'accel', 0.0, 255.0, None),
+                     (BRAKE, 'brake', 0.0, 255.0, None), (STEERING, 'steer', -127.0, 127.0, None)]
+    return PacketFormat(name, size, fields, channels, race_on='race_on')
+
+
+def codemasters_format():
+    """Codemasters "extradata" 3: 66 little-endian floats (264 bytes)"""
+    fields = [('speed', 7 * 4, 'f'),
+              ('susp_rl', 17 * 4, 'f'), ('susp_rr', 18 * 4, 'f'), ('susp_fl', 19 * 4, 'f'), ('susp_fr', 20 * 4, 'f'),
+              ('throttle', 29 * 4, 'f'), ('steer', 30 * 4, 'f'), ('brake', 31 * 4, 'f'),
+              ('g_lat', 34 * 4, 'f'), ('g_lon', 35 * 4, 'f'), ('rpm', 37 * 4, 'f'), ('max_rpm', 63 * 4, 'f')]
+    mm = SUSPENSION_FULL_SCALE_MM
+    channels = [(SPEED, 'speed', 0.0, SPEED_FULL_SCALE, None), (RPM, 'rpm', 0.0, 1.0, 'max_rpm'),
+                (LATERAL_G, 'g_lat', -G_FULL_SCALE, G_FULL_SCALE, None),
+                (LONGITUDINAL_G, 'g_lon', -G_FULL_SCALE, G_FULL_SCALE, None),
+                (STEERING, 'steer', -1.0, 1.0, None), (THROTTLE, 'throttle', 0.0, 1.0, None),
+                (BRAKE, 'brake', 0.0, 1.0, None)]
+    # Suspension position in mm (around the car's ride height)
+    channels += [(axis, field, -mm, mm, None) for axis, field in zip(SUSPENSION, SUSPENSION_FIELDS)]
+    return PacketFormat("Codemasters", 264, fields, channels)
+
+
+FORMATS = (
+    forza_format("Forza Sled", 232, None),
+    forza_format("Forza Dash", 311, 232),  # Forza Motorsport 7
+    forza_format("Forza Horizon", 324, 244),  # Horizon 4 / 5: 12 more bytes before the dash block
+    forza_format("Forza Motorsport", 331, 232),  # Forza Motorsport (2023): tire wear and track id after it
+    codemasters_format(),
+)
+FORMATS_BY_SIZE = {packet_format.size: packet_format for packet_format in FORMATS}
+FORMATS_BY_NAME = {packet_format.name: packet_format for packet_format in FORMATS}
+
+
+def parse_address(text, default=DEFAULT_ADDRESS):
+    """"port" or "host:port" -> (host, port); raises ValueError"""
+    host, _, port = text.strip().rpartition(':')
+    return (host or default[0], int(port))
+
+
+class GameTelemetry:
+    """Receives game telemetry on its own thread; the polling thread reads it with get_state()"""
+    def __init__(self, state):
+        """state: the ControllerState to fill (len(CHANNEL_NAMES) axes, 2 buttons)"""
+        self.state = state
+        self.info = {'name': "Game Telemetry (UDP)", 'axes': len(CHANNEL_NAMES), 'buttons': 2, 'hats': 0,
+                     'channels': CHANNEL_NAMES}
+        self.address = None  # (host, port) bound by start()
+        self.sock = None
+        self.thread = None
+        self.running = False
+        self.buffer = bytearray(RECEIVE_BUFFER)
+        self.latest = None  # (PacketFormat, unpacked values, perf_counter time) of the newest packet
+        self.applied = None  # `latest` the state was last filled from
+        self.applied_format = None
+        self.packets = 0
+        self.unknown_packets = 0  # Sizes no format matches (other games, other Forza modes)
+        self.bytes_received = 0
+        self.decode_histogram = None  # Optional Histogram of the per-packet work (set by the app)
+        self.set_rest()
+
+    def start(self, address=DEFAULT_ADDRESS):
+        """Bind the UDP socket and start receiving; returns False (and prints why) if the port is taken"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER)
+            sock.bind(address)
+        except OSError as e:
+            sock.close()
+            print(f"[WARNING] Could not listen for game telemetry on {address[0]}:{address[1]}: {e}")
+            return False
+        sock.settimeout(RECEIVE_TIMEOUT)
+        self.sock = sock
+        self.address = sock.getsockname()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def run(self):
+        sock = self.sock
+        buffer = self.buffer
+        formats = FORMATS_BY_SIZE
+        clock = time.perf_counter
+        while self.running:
+            try:
+                size = sock.recv_into(buffer)
+            except socket.timeout:
+                continue
+            except OSError:
+                # Oversized datagram (Windows), or the socket closed under us by stop()
+                self.unknown_packets += 1
+                continue
+            received = clock()
+            self.bytes_received += size
+            packet_format = formats.get(size)
+            if packet_format is None:
+                self.unknown_packets += 1
+                continue
+            self.latest = (packet_format, packet_format.struct.unpack_from(buffer), received)
+            self.packets += 1
+            histogram = self.decode_histogram
+            if histogram is not None:
+                histogram.observe(clock() - received)
+
+    def set_rest(self):
+        """Every channel to rest, buttons released"""
+        state = self.state
+        state.axes[:len(REST)] = REST
+        state.buttons[BUTTON_RECEIVING] = 0
+        state.buttons[BUTTON_RACE_ON] = 0
+        self.applied_format = None
+
+    def get_state(self):
+        """Fill the state from the newest packet (polling thread); the same ControllerState every call"""
+        latest = self.latest
+        if latest is self.applied:
+            if latest is not None and time.perf_counter() - latest[2] > STALE_AFTER and self.state.buttons[0]:
+                self.set_rest()
+            return self.state
+        self.applied = latest
+        packet_format, values, received = latest
+        if time.perf_counter() - received > STALE_AFTER:
+            self.set_rest()
+            return self.state
+        state = self.state
+        axes = state.axes
+        if packet_format is not self.applied_format:
+            axes[:len(REST)] = REST  # Channels this format doesn't carry
+            self.applied_format = packet_format
+        for axis, index, scale, offset, divisor in packet_format.channels:
+            value = values[index]
+            if divisor >= 0:
+                full = values[divisor]
+                value = value / full if full > 0 else 0.0
+            value = value * scale + offset
+            axes[axis] = -1.0 if value < -1.0 else (1.0 if value > 1.0 else value)
+        state.buttons[BUTTON_RECEIVING] = 1
+        race_on = packet_format.race_on
+        state.buttons[BUTTON_RACE_ON] = 1 if race_on < 0 or values[race_on] else 0
+        return state
+
+    def get_info(self):
+        return self.info
+
+    def describe(self):
+        """One line for the UI: where it listens and what it hears"""
+        if self.address is None:
+            return "Game telemetry: not listening"
+        text = f"Game telemetry on UDP {self.address[0]}:{self.address[1]}"
+        latest = self.latest
+        if latest is None or time.perf_counter() - latest[2] > STALE_AFTER:
+            return text + " - waiting for packets"
+        return text + f" - {latest[0].name}, {self.packets} packets"
+
@@ -0,0 +1,98 @@
+"""
+Batched input stage for the RC Servo Racing Sim Controller
+
+Mappings and mixer inputs each name a source: (controller, input type,
+input id). A rig with a wheel, a pedal box and a shifter has sources on three
+controllers. InputPlan is compiled from the sources whenever the configuration
+changes (as part of a MappingTable, see mapping_table.py): it lists every referenced controller once, together with the sources
+read from it, and gives every distinct source a fixed slot in one flat input
+vector. Axis settings (gain / invert) are compiled in as well, so a tick
+never reads the editable settings dict.
+
+Each tick, read() reads every referenced controller exactly once (timing each
+read), and writes the value of each source (axis settings applied) into its
+slot. Mappings and the mixer then only index the vector, so a multi-device rig
+costs one read per device and one value per distinct source, no matter how
+many servos use them.
+"""
+
+import time
+
+AXIS = 0
+BUTTON = 1
+HAT = 2
+INPUT_KINDS = {'axis': AXIS, 'button': BUTTON, 'hat': HAT}
+
+
+def axis_scale(key, axis_settings):
+    """Gain (negated if inverted) for an axis source, or None if the axis has no settings"""
+    _, kind, input_id = key
+    settings = axis_settings.get(input_id) if kind == AXIS else None
+    if settings is None:
+        return None
+    return -settings['gain'] if settings['invert'] else settings['gain']
+
+
+class InputPlan:
+    """Compiled input stage: which controllers to read and where each source goes"""
+    __slots__ = ('controllers', 'slots', 'values', 'slot_count')
+
+    def __init__(self, sources, axis_settings, read_histogram):
+        """sources: source dicts ({'controller', 'input_type', 'input_id'}), duplicates allowed;
+        axis_settings: {axis_id: {'gain', 'invert'}} (copied in - later edits need a new plan);
+        read_histogram(controller) -> Histogram for that controller's read time"""
+        slots = {}  # {(controller, kind, input_id): slot}
+        by_controller = {}  # {controller: [(slot, kind, input_id, scale)]} in first-use order
+        source_slots = []
+        for source in sources:
+            controller = source['controller']
+            key = (controller, INPUT_KINDS.get(source['input_type'], -1), source['input_id'])
+            slot = slots.get(key)
+            if slot is None:
+                slot = slots[key] = len(slots)
+                by_controller.setdefault(controller, []).append((slot,) + key[1:] + (axis_scale(key, axis_settings),))
+            source_slots.append(slot)
+
+        self.slots = tuple(source_slots)  # Vector slot of each source, in the order given
+        # (controller, read histogram, ((slot, kind, input_id, scale), ...)) per referenced controller
+        self.controllers = tuple((controller, read_histogram(controller), tuple(reads))
+                                 for controller, reads in by_controller.items())
+        self.slot_count = len(slots)
+        self.values = [0] * self.slot_count  # The input vector, overwritten every tick
+
+    def read(self, manager, states):
+        """Read every referenced controller once and fill the input vector
+
+        states ({controller: state}) receives each controller's state for the
+        rest of the tick (recording, UI). Returns the input vector.
+        Values match ServoControlApp.get_mapping_value().
+        """
+        values = self.values
+        clock = time.perf_counter
+        get_state = manager.get_controller_state
+        for controller, histogram, reads in self.controllers:
+            start = clock()
+            state = states[controller] = get_state(controller)
+            histogram.observe(clock() - start)
+            if state is None:
+                for slot, _, _, _ in reads:
+                    values[slot] = 0
+                continue
+            axes = state.axes
+            for slot, kind, input_id, scale in reads:
+                if kind == AXIS:
+                    if input_id < state.axis_count:
+                        value = axes[input_id]
+                        if scale is not None:
+                            value = value * scale
+                            value = -1.0 if value < -1.0 else (1.0 if value > 1.0 else value)
+                        values[slot] = value
+                    else:
+                        values[slot] = 0
+                elif kind == BUTTON:
+                    values[slot] = (1 if state.buttons[input_id] else 0) if input_id < state.button_count else 0
+                elif kind == HAT:
+                    values[slot] = state.hats[input_id][0] if input_id < state.hat_count else 0
+                else:
+                    values[slot] = 0
+        return values
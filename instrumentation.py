@@ -0,0 +1,260 @@
+"""
+Low-overhead performance counters for the RC Servo Racing Sim Controller
+
+These stay enabled all the time. Recording a sample is a couple of array
+writes with no allocation, so they can sit in the polling loop without
+costing anything noticeable. Percentiles are only computed when something
+(like the performance HUD) asks for them.
+
+- RollingStats / RateCounter: recent-window numbers for the performance HUD
+- Histogram / MetricsRegistry: cumulative per-stage latency histograms that
+  can be exported as JSON lines (MetricsExporter) or Prometheus text
+  (start_metrics_server)
+"""
+
+import json
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class RollingStats:
+    """The last N samples of a measurement (e.g. a duration in seconds)"""
+    def __init__(self, size=512):
+        self.size = size
+        self.samples = array('d', [0.0] * size)
+        self.index = 0  # Next slot to write
+        self.count = 0  # Valid samples in the window
+        self.total = 0  # Samples recorded since start
+
+    def add(self, value):
+        """Record one sample"""
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        self.total += 1
+
+    def percentiles(self, *percents):
+        """Get percentiles (0-100) of the current window, or None if empty"""
+        count = self.count
+        if count == 0:
+            return None
+        data = sorted(self.samples[:count])
+        return [data[min(count - 1, int(p / 100.0 * count))] for p in percents]
+
+    def reset(self):
+        """Forget all samples"""
+        self.index = 0
+        self.count = 0
+
+
+class RateCounter:
+    """Turns an ever-increasing total (bytes, commands) into a per-second rate"""
+    def __init__(self):
+        self.last_total = 0
+        self.last_time = None
+        self.rate = 0.0
+
+    def update(self, total, now):
+        """Update the rate from the current total; returns the rate per second"""
+        if self.last_time is not None and now > self.last_time:
+            self.rate = (total - self.last_total) / (now - self.last_time)
+        self.last_total = total
+        self.last_time = now
+        return self.rate
+
+
+# Histogram bucket upper bounds in seconds: 1us, 2us, 4us ... ~1s (powers of two)
+DEFAULT_BUCKETS = tuple(1e-6 * 2 ** i for i in range(21))
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds
+
+    Meant to have a single writer (the thread that owns the stage). observe()
+    is a bisect plus two array writes - no locks and no allocation. Readers
+    call snapshot(), which copies the counts.
+    """
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = array('Q', [0] * (len(self.bounds) + 1))  # Last bucket = overflow (+Inf)
+        self.sum = array('d', [0.0])
+
+    def observe(self, value):
+        """Record one duration (seconds)"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum[0] += value
+
+    def snapshot(self):
+        """Copy of the histogram state: {'bounds', 'counts', 'sum', 'count'}"""
+        counts = list(self.counts)
+        return {
+            'bounds': self.bounds,
+            'counts': counts,
+            'sum': self.sum[0],
+            'count': sum(counts)
+        }
+
+    def reset(self):
+        """Zero all buckets"""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.sum[0] = 0.0
+
+
+def histogram_percentile(snapshot, percent):
+    """Estimate a percentile (0-100) from a histogram snapshot (bucket upper bound)"""
+    total = snapshot['count']
+    if total == 0:
+        return None
+    rank = percent / 100.0 * total
+    seen = 0
+    for i, count in enumerate(snapshot['counts']):
+        seen += count
+        if seen >= rank and count > 0:
+            return snapshot['bounds'][i] if i < len(snapshot['bounds']) else math.inf
+    return math.inf
+
+
+class MetricsRegistry:
+    """Named stage histograms plus export helpers (JSON and Prometheus text)"""
+    def __init__(self):
+        self.histograms = {}  # {stage name: Histogram}
+        self.start_time = time.time()
+        self.observe_cost = self.measure_observe_cost()
+
+    def histogram(self, name, histogram=None):
+        """Get (creating or registering if needed) the histogram for a stage"""
+        if name not in self.histograms:
+            self.histograms[name] = histogram if histogram is not None else Histogram()
+        return self.histograms[name]
+
+    @staticmethod
+    def measure_observe_cost(iterations=20000):
+        """Measure the cost of one timed observation (two perf_counter calls + observe)"""
+        histogram = Histogram()
+        clock = time.perf_counter
+        start = clock()
+        for _ in range(iterations):
+            t0 = clock()
+            histogram.observe(clock() - t0)
+        return (clock() - start) / iterations
+
+    def snapshot(self):
+        """Snapshot every stage (safe to call from any thread)"""
+        stages = {}
+        for name, histogram in list(self.histograms.items()):
+            snap = histogram.snapshot()
+            snap['bounds'] = list(snap['bounds'])
+            for key, percent in (('p50', 50), ('p99', 99)):
+                value = histogram_percentile(snap, percent)
+                snap[key] = "+Inf" if value == math.inf else value  # Keep it valid JSON
+            stages[name] = snap
+        return {
+            'time': time.time(),
+            'uptime': time.time() - self.start_time,
+            'observe_cost': self.observe_cost,
+            'stages': stages
+        }
+
+    def overhead_ratio(self, observations_per_tick, tick_seconds):
+        """Estimated fraction of a tick spent on instrumentation"""
+        if tick_seconds <= 0:
+            return 0.0
+        return observations_per_tick * self.observe_cost / tick_seconds
+
+    def to_json_line(self):
+        """One JSON line with a snapshot of every stage"""
+        return json.dumps(self.snapshot()) + "\n"
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (cumulative buckets)"""
+        lines = [
+            "# HELP rcservo_stage_seconds Time spent per pipeline stage",
+            "# TYPE rcservo_stage_seconds histogram"
+        ]
+        for name, histogram in list(self.histograms.items()):
+            snap = histogram.snapshot()
+            cumulative = 0
+            for bound, count in zip(snap['bounds'], snap['counts']):
+                cumulative += count
+                lines.append(f'rcservo_stage_seconds_bucket{{stage="{name}",le="{bound:.9g}"}} {cumulative}')
+            cumulative += snap['counts'][-1]
+            lines.append(f'rcservo_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {cumulative}')
+            lines.append(f'rcservo_stage_seconds_sum{{stage="{name}"}} {snap["sum"]:.9g}')
+            lines.append(f'rcservo_stage_seconds_count{{stage="{name}"}} {cumulative}')
+        lines.append("# HELP rcservo_instrumentation_observe_seconds Measured cost of one timed observation")
+        lines.append("# TYPE rcservo_instrumentation_observe_seconds gauge")
+        lines.append(f"rcservo_instrumentation_observe_seconds {self.observe_cost:.9g}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Appends a JSON-lines snapshot to a file every interval seconds (background thread)"""
+    def __init__(self, registry, path, interval=10.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Start the exporter thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the exporter and write one final snapshot"""
+        self.running = False
+        self.export()
+
+    def run(self):
+        """Exporter loop"""
+        while self.running:
+            time.sleep(self.interval)
+            if self.running:
+                self.export()
+
+    def export(self):
+        """Append one snapshot now"""
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(self.registry.to_json_line())
+        except OSError as e:
+            print(f"[WARNING] Could not write metrics to {self.path}: {e}")
+
+
+def start_metrics_server(registry, port, host="127.0.0.1"):
+    """Serve registry.to_prometheus() at http://host:port/metrics (background thread)
+
+    Returns the server (call shutdown() to stop it), or None if it could not start.
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep the console quiet
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        print(f"[WARNING] Could not start metrics server on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[INFO] Metrics available at http://{host}:{port}/metrics")
+    return server
@@ -13,16 +13,76 @@ import serial.tools.list_ports
 import threading
 import time
 import math
+import os
+from array import array
+from collections import deque
 from tkinter import *
 from tkinter import ttk
+from tkinter import filedialog, simpledialog
+from instrumentation import RollingStats, RateCounter, Histogram, MetricsRegistry, MetricsExporter, start_metrics_server, histogram_percentile
+from session_recorder import SessionRecorder
+from calibration import ServoCalibration, LUT_HALF, pulse_to_angle
+from profiles import Profile, ProfileStore, DEFAULT_PROFILE
+from input_plan import AXIS, BUTTON, HAT
+from mapping_table import MappingTable
+from connection_supervisor import ConnectionSupervisor, CONNECTED, DISCONNECTED
+from port_watcher import PortWatcher
+from clock_sync import ClockSync, serial_time_ns, PING_INTERVAL, PING_INTERVAL_FAST, MIN_DRIFT_SAMPLES
+from telemetry_shm import SharedTelemetryWriter, DEFAULT_NAME as SHARED_TELEMETRY_NAME
+from game_telemetry import GameTelemetry, GAME_TELEMETRY_CONTROLLER, CHANNEL_NAMES, DEFAULT_ADDRESS, parse_address
+
+# How often the board sends a telemetry line (the sketches' R command). A line is about 75 bytes,
+# so slow links get one per second: at 9600 baud that is under 8 % of the link.
+BOARD_TELEMETRY_INTERVAL_MS = 200
+BOARD_TELEMETRY_INTERVAL_SLOW_MS = 1000  # Below 57600 baud
+
+READER_TIMEOUT = 0.1  # Longest the serial reader thread waits for a byte before checking it should go on
+
+class ControllerState:
+    """Input state of one controller, preallocated and filled in place every tick
+    
+    Reading a controller only overwrites these buffers, so the polling loop
+    doesn't create new lists or dicts per read. Device capabilities (the
+    counts) are fixed when the state is created.
+    """
+    __slots__ = ('axes', 'buttons', 'hats', 'axis_count', 'button_count', 'hat_count')
+    
+    def __init__(self, axis_count, button_count, hat_count):
+        self.axis_count = axis_count
+        self.button_count = button_count
+        self.hat_count = hat_count
+        self.axes = array('d', bytes(8 * axis_count))
+        self.buttons = array('B', bytes(button_count))
+        self.hats = [(0, 0)] * hat_count  # (x, y) tuples
+    
+    def copy(self):
+        """A separate state with the current values (for another thread; this one keeps being overwritten)"""
+        state = ControllerState.__new__(ControllerState)
+        state.axis_count = self.axis_count
+        state.button_count = self.button_count
+        state.hat_count = self.hat_count
+        state.axes = array('d', self.axes)
+        state.buttons = array('B', self.buttons)
+        state.hats = list(self.hats)
+        return state
+
+def controller_name(index):
+    """Display name of a controller index in the mapping and mixer lists"""
+    if index == -1:
+        return "Virtual Controller"
+    if index == GAME_TELEMETRY_CONTROLLER:
+        return "Game Telemetry"
+    return f"Controller {index}"
 
 class VirtualController:
     """Virtual controller for testing with on-screen wheel"""
     def __init__(self):
         self.name = "Virtual Controller (On-Screen Wheel)"
-        self.axes = [0.0] * 4  # 4 axes: wheel, throttle, brake, etc.
-        self.buttons = [False] * 16
-        self.hats = [(0, 0)]
+        self.state = ControllerState(4, 16, 1)  # 4 axes: wheel, throttle, brake, etc.
+        self.axes = self.state.axes
+        self.buttons = self.state.buttons
+        self.hats = self.state.hats
+        self.info = {'name': self.name, 'axes': 4, 'buttons': 16, 'hats': 1}
         self.wheel_angle = 0.0  # Continuous rotation, no limits
         self.throttle_angle = 0.0  # Continuous throttle angle (like steering)
         self.arrow_keys = {'left': False, 'right': False, 'up': False, 'down': False}
@@ -32,14 +92,10 @@ class VirtualController:
         self.max_throttle_angle = 180.0  # Maximum throttle angle limit in degrees (0 = unlimited)
         
     def get_info(self):
-        return {
-            'name': self.name,
-            'axes': 4,
-            'buttons': 16,
-            'hats': 1
-        }
+        return self.info
     
     def get_state(self):
+        """Update and return the controller state (the same ControllerState every call)"""
         # Map continuous angle to -1.0 to 1.0 for axis output
         # Use modulo to get current rotation within one full turn
         normalized = math.sin(math.radians(self.wheel_angle))
@@ -49,11 +105,7 @@ class VirtualController:
         self.axes[1] = throttle_normalized
         # Brake is the inverse of throttle (like steering rotation mapping)
         self.axes[2] = -throttle_normalized
-        return {
-            'axes': self.axes.copy(),
-            'buttons': self.buttons.copy(),
-            'hats': self.hats.copy()
-        }
+        return self.state
     
     def set_wheel_angle(self, angle):
         """Set wheel angle (with max angle limit if set)"""
@@ -148,26 +200,30 @@ class WheelWidget(Canvas):
         self.dragging = False
         self.last_angle = 0.0
         
+        # Retained-mode rendering: only redraw when the angle moves this much
+        self.redraw_threshold = 0.1  # Degrees (matches the text resolution)
+        self.drawn_angle = None  # Angle the spokes/text currently show
+        self.drawn_text = None
+        
+        # Drag events are merged into one redraw per frame
+        self.drag_frame_ms = 16  # ~60Hz
+        self.pending_drag = None  # Latest (x, y) not yet applied
+        self.drag_after_id = None
+        
         self.bind("<Button-1>", self.on_click)
         self.bind("<B1-Motion>", self.on_drag)
         self.bind("<ButtonRelease-1>", self.on_release)
         
+        self.create_wheel_items()
         self.draw_wheel()
         
         # Auto-return to center
         self.auto_return_speed = 0.5
         self.auto_return_active = False
         
-    def draw_wheel(self):
-        """Draw the wheel"""
-        self.delete("all")
-        
-        # Use angle modulo 360 for visual display (continuous rotation)
-        display_angle = self.angle % 360
-        if display_angle < 0:
-            display_angle += 360
-        
-        # Draw outer circle
+    def create_wheel_items(self):
+        """Create all canvas items once (static parts never get redrawn)"""
+        # Outer circle
         self.create_oval(
             self.center_x - self.radius,
             self.center_y - self.radius,
@@ -178,7 +234,7 @@ class WheelWidget(Canvas):
             fill='#1a1a1a'
         )
         
-        # Draw center circle
+        # Center circle
         self.create_oval(
             self.center_x - 15,
             self.center_y - 15,
@@ -189,17 +245,10 @@ class WheelWidget(Canvas):
             fill='#333333'
         )
         
-        # Draw spokes (rotating with wheel)
-        spoke_length = self.radius - 20
-        for i in range(4):
-            angle_rad = math.radians(display_angle + i * 90)
-            x1 = self.center_x + math.cos(angle_rad) * 20
-            y1 = self.center_y + math.sin(angle_rad) * 20
-            x2 = self.center_x + math.cos(angle_rad) * spoke_length
-            y2 = self.center_y + math.sin(angle_rad) * spoke_length
-            self.create_line(x1, y1, x2, y2, fill='#ffffff', width=2)
+        # Spokes (rotating with wheel - positioned in draw_wheel)
+        self.spoke_items = [self.create_line(0, 0, 0, 0, fill='#ffffff', width=2) for _ in range(4)]
         
-        # Draw top indicator (fixed at top of wheel, red)
+        # Top indicator (fixed at top of wheel, red)
         indicator_angle = math.radians(-90)  # -90 degrees = top of wheel (fixed position)
         indicator_x = self.center_x + math.cos(indicator_angle) * (self.radius - 5)
         indicator_y = self.center_y + math.sin(indicator_angle) * (self.radius - 5)
@@ -213,7 +262,41 @@ class WheelWidget(Canvas):
             width=2
         )
         
-        # Draw angle text (show full rotations)
+        # Angle text
+        self.text_item = self.create_text(
+            self.center_x,
+            self.center_y + self.radius + 20,
+            text="",
+            fill='#ffffff',
+            font=("Arial", 11, "bold")
+        )
+    
+    def draw_wheel(self, force=False):
+        """Move the spokes and update the angle text (skipped if the angle barely changed)"""
+        if not force and self.drawn_angle is not None:
+            if self.angle == self.drawn_angle:
+                return
+            # Always land exactly on center, otherwise wait for a visible change
+            if self.angle != 0.0 and abs(self.angle - self.drawn_angle) < self.redraw_threshold:
+                return
+        self.drawn_angle = self.angle
+        
+        # Use angle modulo 360 for visual display (continuous rotation)
+        display_angle = self.angle % 360
+        if display_angle < 0:
+            display_angle += 360
+        
+        # Spokes (rotating with wheel)
+        spoke_length = self.radius - 20
+        for i, item in enumerate(self.spoke_items):
+            angle_rad = math.radians(display_angle + i * 90)
+            cos_a = math.cos(angle_rad)
+            sin_a = math.sin(angle_rad)
+            self.coords(item,
+                        self.center_x + cos_a * 20, self.center_y + sin_a * 20,
+                        self.center_x + cos_a * spoke_length, self.center_y + sin_a * spoke_length)
+        
+        # Angle text (show full rotations)
         rotations = int(self.angle / 360)
         remainder = self.angle % 360
         if remainder > 180:
@@ -222,13 +305,9 @@ class WheelWidget(Canvas):
             angle_text = f"{remainder:.1f}° ({rotations:+d} rot)"
         else:
             angle_text = f"{remainder:.1f}°"
-        self.create_text(
-            self.center_x,
-            self.center_y + self.radius + 20,
-            text=angle_text,
-            fill='#ffffff',
-            font=("Arial", 11, "bold")
-        )
+        if angle_text != self.drawn_text:
+            self.itemconfig(self.text_item, text=angle_text)
+            self.drawn_text = angle_text
     
     def on_click(self, event):
         """Handle mouse click"""
@@ -238,12 +317,25 @@ class WheelWidget(Canvas):
         self.calculate_angle(event.x, event.y)
     
     def on_drag(self, event):
-        """Handle mouse drag"""
+        """Handle mouse drag (coalesced to one update per frame)"""
         if self.dragging:
-            self.calculate_angle(event.x, event.y)
+            self.pending_drag = (event.x, event.y)
+            if self.drag_after_id is None:
+                self.drag_after_id = self.after(self.drag_frame_ms, self.flush_drag)
+    
+    def flush_drag(self):
+        """Apply the most recent drag position"""
+        self.drag_after_id = None
+        if self.pending_drag is not None:
+            x, y = self.pending_drag
+            self.pending_drag = None
+            self.calculate_angle(x, y)
     
     def on_release(self, event):
         """Handle mouse release"""
+        if self.drag_after_id is not None:
+            self.after_cancel(self.drag_after_id)
+            self.flush_drag()
         self.dragging = False
         self.auto_return_active = True
     
@@ -311,11 +403,136 @@ class WheelWidget(Canvas):
                 self.angle = 0.0
                 self.draw_wheel()
 
+class TelemetryHistory:
+    """Fixed-size ring buffers for a time column plus several value traces
+    
+    Everything is preallocated, so appending a sample never allocates. One
+    thread appends and another reads; a reader may see the newest sample
+    half-written, which is fine for plotting.
+    """
+    def __init__(self, trace_count, capacity=2048):
+        self.capacity = capacity
+        self.times = array('d', [0.0] * capacity)
+        self.traces = [array('d', [math.nan] * capacity) for _ in range(trace_count)]
+        self.index = 0  # Next slot to write
+        self.count = 0  # Number of valid samples
+    
+    def append(self, timestamp, *values):
+        """Add one sample (one value per trace)"""
+        i = self.index
+        self.times[i] = timestamp
+        for trace, value in zip(self.traces, values):
+            trace[i] = value
+        self.index = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+    
+    def clear(self):
+        """Forget all samples"""
+        self.index = 0
+        self.count = 0
+
+class TelemetryPlot(Canvas):
+    """Scrolling multi-trace plot of a TelemetryHistory (values in 0-180 degrees)"""
+    def __init__(self, parent, history, trace_styles, span=5.0, **kwargs):
+        Canvas.__init__(self, parent, **kwargs)
+        self.config(bg='#1a1a1a', highlightthickness=1, highlightbackground="#555555")
+        self.history = history
+        self.span = span  # Seconds of history shown
+        self.y_min = 0.0
+        self.y_max = 180.0
+        self.margin = 5
+        self.width = int(kwargs.get('width', 400))
+        self.height = int(kwargs.get('height', 200))
+        
+        # Grid lines (every 45 degrees) and one line item per trace, created once
+        self.grid_items = [self.create_line(0, 0, 0, 0, fill="#333333", dash=(2, 4)) for _ in range(5)]
+        self.trace_items = [self.create_line(0, 0, 0, 0, fill=color, width=1, state='hidden')
+                            for name, color in trace_styles]
+        self.bind("<Configure>", self.on_configure)
+        self.layout()
+    
+    def on_configure(self, event):
+        """Cache canvas size on resize"""
+        if event.width < 10 or event.height < 10:
+            return
+        self.width = event.width
+        self.height = event.height
+        self.layout()
+    
+    def layout(self):
+        """Position the static grid lines"""
+        for i, item in enumerate(self.grid_items):
+            y = self.value_to_y(self.y_min + (self.y_max - self.y_min) * i / (len(self.grid_items) - 1))
+            self.coords(item, 0, y, self.width, y)
+    
+    def value_to_y(self, value):
+        """Convert a value to a canvas y coordinate"""
+        plot_height = self.height - 2 * self.margin
+        return self.margin + (self.y_max - value) / (self.y_max - self.y_min) * plot_height
+    
+    def redraw(self):
+        """Decimate the visible window to one min/max pair per pixel column and update the lines"""
+        history = self.history
+        count = history.count
+        if count == 0:
+            for item in self.trace_items:
+                self.itemconfig(item, state='hidden')
+            return
+        
+        capacity = history.capacity
+        times = history.times
+        newest = (history.index - 1) % capacity
+        t_end = times[newest]
+        t_start = t_end - self.span
+        columns = max(1, self.width - 2 * self.margin)
+        scale = columns / self.span
+        
+        # Per trace: {column: [min, max]}, walking samples from newest to oldest
+        trace_columns = [{} for _ in history.traces]
+        for n in range(count):
+            i = (newest - n) % capacity
+            t = times[i]
+            if t < t_start:
+                break
+            column = int((t - t_start) * scale)
+            for trace, cols in zip(history.traces, trace_columns):
+                value = trace[i]
+                if value != value:  # NaN - no data for this trace yet
+                    continue
+                bounds = cols.get(column)
+                if bounds is None:
+                    cols[column] = [value, value]
+                elif value < bounds[0]:
+                    bounds[0] = value
+                elif value > bounds[1]:
+                    bounds[1] = value
+        
+        for item, cols in zip(self.trace_items, trace_columns):
+            if not cols:
+                self.itemconfig(item, state='hidden')
+                continue
+            points = []
+            for column in sorted(cols):
+                low, high = cols[column]
+                x = self.margin + column
+                points.append(x)
+                points.append(self.value_to_y(low))
+                points.append(x)
+                points.append(self.value_to_y(high))
+            self.coords(item, *points)
+            self.itemconfig(item, state='normal')
+
 class ControllerManager:
     def __init__(self):
         self.pygame_available = PYGAME_AVAILABLE
         self.joysticks = []
+        # Per joystick, cached when the joystick list changes: capabilities and state buffers
+        self.joystick_info = []  # [{'name', 'axes', 'buttons', 'hats'}]
+        self.joystick_states = []  # [ControllerState]
         self.virtual_controller = VirtualController()
+        # Racing game UDP telemetry as one more controller (listening starts with the window)
+        self.game_telemetry = GameTelemetry(ControllerState(len(CHANNEL_NAMES), 2, 0))
         
         if self.pygame_available:
             try:
@@ -326,53 +543,81 @@ class ControllerManager:
                 print(f"[WARNING] Failed to initialize pygame: {e}")
                 print("[INFO] Continuing with virtual controller only")
                 self.pygame_available = False
-                self.joysticks = []
+                self.set_joysticks([])
         else:
-            self.joysticks = []
+            self.set_joysticks([])
         
     def refresh_controllers(self):
         """Refresh the list of connected controllers"""
-        self.joysticks = []
         if not self.pygame_available:
+            self.set_joysticks([])
             return 0
         
+        joysticks = []
         try:
             for i in range(pygame.joystick.get_count()):
                 joystick = pygame.joystick.Joystick(i)
                 joystick.init()
-                self.joysticks.append(joystick)
+                joysticks.append(joystick)
         except Exception as e:
             print(f"[WARNING] Error refreshing controllers: {e}")
+        self.set_joysticks(joysticks)
         return len(self.joysticks)
     
+    def set_joysticks(self, joysticks):
+        """Use these (initialized) joysticks; caches their capabilities and allocates their state buffers"""
+        info = []
+        states = []
+        for joystick in joysticks:
+            axes = joystick.get_numaxes()
+            buttons = joystick.get_numbuttons()
+            hats = joystick.get_numhats()
+            info.append({'name': joystick.get_name(), 'axes': axes, 'buttons': buttons, 'hats': hats})
+            states.append(ControllerState(axes, buttons, hats))
+        # Caches first so a reader on another thread never sees a joystick without them
+        self.joystick_info = info
+        self.joystick_states = states
+        self.joysticks = list(joysticks)
+    
     def get_controller_info(self, index):
         """Get information about a controller"""
+        if index == GAME_TELEMETRY_CONTROLLER:
+            return self.game_telemetry.get_info()
         # Check if it's the virtual controller (index = -1 or after all real controllers)
         if index == -1 or index == len(self.joysticks):
             return self.virtual_controller.get_info()
         
         if 0 <= index < len(self.joysticks):
-            return {
-                'name': self.joysticks[index].get_name(),
-                'axes': self.joysticks[index].get_numaxes(),
-                'buttons': self.joysticks[index].get_numbuttons(),
-                'hats': self.joysticks[index].get_numhats()
-            }
+            return self.joystick_info[index]
         return None
     
     def get_controller_state(self, index):
-        """Get current state of a controller"""
+        """Get current state of a controller
+        
+        Returns the controller's ControllerState, updated in place - the same
+        object on every call.
+        """
+        if index == GAME_TELEMETRY_CONTROLLER:
+            return self.game_telemetry.get_state()
         # Check if it's the virtual controller
-        if index == -1 or index == len(self.joysticks):
+        joysticks = self.joysticks
+        if index == -1 or index == len(joysticks):
             return self.virtual_controller.get_state()
         
-        if 0 <= index < len(self.joysticks):
-            joystick = self.joysticks[index]
-            state = {
-                'axes': [joystick.get_axis(i) for i in range(joystick.get_numaxes())],
-                'buttons': [joystick.get_button(i) for i in range(joystick.get_numbuttons())],
-                'hats': [joystick.get_hat(i) for i in range(joystick.get_numhats())]
-            }
+        if 0 <= index < len(joysticks):
+            joystick = joysticks[index]
+            state = self.joystick_states[index]
+            axes = state.axes
+            get_axis = joystick.get_axis
+            for i in range(state.axis_count):
+                axes[i] = get_axis(i)
+            buttons = state.buttons
+            get_button = joystick.get_button
+            for i in range(state.button_count):
+                buttons[i] = get_button(i)
+            hats = state.hats
+            for i in range(state.hat_count):
+                hats[i] = joystick.get_hat(i)
             return state
         return None
 
@@ -385,9 +630,65 @@ class ArduinoManager:
         self.last_response = ""
         self.commands_sent = 0
         self.commands_confirmed = 0
+        self.acked_angles = {}  # {servo_id: angle} from the latest OK:S<id>:<angle> echo
+        self.acked_pulses = {}  # {servo_id: microseconds} from the latest OK:U<id>:<us> echo
+        
+        # Performance counters (always on, cheap to record)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.write_stats = RollingStats()  # Seconds per serial write
+        self.read_stats = RollingStats()  # Seconds per read_responses call
+        
+        # Per-stage latency histograms (exported through the app's MetricsRegistry)
+        self.encode_histogram = Histogram()  # Building the command bytes
+        self.write_histogram = Histogram()  # serial write() call
+        self.ack_histogram = Histogram()  # Command written -> OK echo received
+        self.send_times = {}  # {servo_id: perf_counter time of the last write}
+        
+        # Heartbeat and failsafe (see the firmware sketches). The board moves servos to their failsafe
+        # pulse widths when it hears nothing for the failsafe timeout; keep_alive() makes sure it always
+        # hears something, and notices the other way round - a board that stopped answering.
+        self.failsafe_config = None  # (timeout_ms, ((servo_id, pulse), ...)) from set_failsafe()
+        self.failsafe_sent = None  # The config the board has been sent since connecting
+        self.last_write_time = 0.0  # perf_counter time of the last write
+        self.last_receive_time = None  # perf_counter time of the last line received
+        self.heartbeat_acked = False  # The board answered a heartbeat, so it has the failsafe firmware
+        self.board_silent = False
+        self.silence_detect_time = None  # Seconds from the board's last line until the host noticed it went quiet
+        self.failsafe_events = 0  # FAILSAFE reports from the board
+        
+        # Link health, watched by ConnectionSupervisor (see connection_supervisor.py)
+        self.link_error = None  # Why the last write / read failed; the supervisor then reconnects
+        self.resync_needed = False  # Board is new or has reset: resend every servo's position next tick
+        self.board_resets = 0  # READY messages seen while connected
+        self.ready_seen = False  # connect() got READY, so the baud rate is right
+        
+        # Board telemetry ("TEL:" lines, see the sketches): what the firmware itself is doing
+        self.board_telemetry = None  # Latest frame (see parse_board_telemetry), replaced - never edited
+        self.telemetry_frames = 0
+        self.telemetry_errors = 0  # TEL lines that could not be parsed
+        self.board_rx_peak = 0  # Highest receive ring fill the board reported since connecting (bytes)
+        
+        # Clock sync and one-way latency (see clock_sync.py). Pings map the board's micros() onto
+        # perf_counter_ns(); a numbered end-of-frame marker (N) after each tick's commands comes back
+        # with the board time it was read, which gives the host -> board time of that tick's commands.
+        self.clock_sync = ClockSync()
+        self.ping_seq = 0
+        self.pings_pending = {}  # {seq: perf_counter_ns when sent}
+        self.last_ping_time = 0.0
+        self.frame_seq = 0
+        self.frames_pending = {}  # {seq: perf_counter_ns when sent}
+        self.frame_commands = 0  # commands_sent when the last frame marker went out
+        self.one_way_histogram = Histogram()  # Frame marker written -> read by the board (seconds)
+        self.one_way_stats = RollingStats()
+        
+        # Lines read by the reader thread, timestamped as they arrive: (perf_counter_ns, raw line).
+        # The polling thread processes them in read_responses, but a reply's timestamp doesn't
+        # depend on when the next tick gets to it.
+        self.received_lines = deque()
         
     def get_available_ports(self):
-        """Get list of available serial ports"""
+        """Get list of available serial ports (slow - the UI uses PortWatcher's cached list)"""
         ports = serial.tools.list_ports.comports()
         return [port.device for port in ports]
     
@@ -414,8 +715,13 @@ class ArduinoManager:
         
         return None  # Could not detect, use default
     
-    def connect(self, port, baudrate=9600):
-        """Connect to Arduino/ESP32-S3 and verify it's responding"""
+    def connect(self, port, baudrate=9600, detect_baudrate=True):
+        """Connect to Arduino/ESP32-S3 and verify it's responding
+        
+        Blocks for several seconds - call it from ConnectionSupervisor's thread,
+        not the Tk thread. detect_baudrate=False skips the auto-detection
+        (reconnecting with a rate that already worked).
+        """
         try:
             if self.serial_connection:
                 self.disconnect()
@@ -423,7 +729,7 @@ class ArduinoManager:
             print(f"Connecting to {port}...")
             
             # Try to auto-detect baud rate (ESP32-S3 uses 115200, Arduino Uno uses 9600)
-            detected_baudrate = self.auto_detect_baudrate(port)
+            detected_baudrate = self.auto_detect_baudrate(port) if detect_baudrate else None
             if detected_baudrate:
                 baudrate = detected_baudrate
                 print(f"Auto-detected baud rate: {baudrate}")
@@ -448,58 +754,286 @@ class ArduinoManager:
                 time.sleep(0.1)
             
             # Check if we got a READY message
-            if any("READY" in msg for msg in startup_messages):
+            self.ready_seen = any("READY" in msg for msg in startup_messages)
+            if self.ready_seen:
                 print("✓ Arduino is responding!")
-                self.connected = True
-                self.port = port
-                self.baudrate = baudrate
                 self.commands_sent = 0
                 self.commands_confirmed = 0
-                return True
             else:
                 print("⚠ Warning: Arduino didn't send READY message, but connection opened")
                 print("  This might mean servos are drawing too much power")
                 print("  Try disconnecting servos and reconnecting")
-                self.connected = True  # Still mark as connected, but warn user
-                self.port = port
-                self.baudrate = baudrate
-                return True
+            self.attach(self.serial_connection, port, baudrate)  # Connected either way, but warn user
+            return True
                 
         except Exception as e:
             print(f"Connection error: {e}")
             self.connected = False
             return False
     
+    def attach(self, connection, port, baudrate):
+        """Start using an open port: mark it connected and start its reader thread
+        
+        connect() ends with this; tools that drive a simulated board attach it the same way.
+        """
+        self.serial_connection = connection
+        self.port = port
+        self.baudrate = baudrate
+        self.reset_link()
+        self.link_error = None
+        self.received_lines = deque()
+        self.connected = True
+        connection.timeout = READER_TIMEOUT  # So the reader notices a disconnect soon
+        threading.Thread(target=self.reader_loop, args=(connection, self.received_lines), daemon=True).start()
+    
+    def reader_loop(self, connection, lines):
+        """Reader thread: move complete lines from the port to `lines`, stamped with when they arrived
+        
+        Ends when the port is closed or replaced. Nothing else reads the port while it runs.
+        """
+        buffer = bytearray()
+        try:
+            while self.serial_connection is connection:
+                data = connection.read(connection.in_waiting or 1)  # Waits up to READER_TIMEOUT for a byte
+                if not data:
+                    continue
+                received = time.perf_counter_ns()
+                buffer += data
+                end = buffer.find(b"\n")
+                while end >= 0:
+                    lines.append((received, bytes(buffer[:end + 1])))
+                    del buffer[:end + 1]
+                    end = buffer.find(b"\n")
+        except Exception as e:
+            if self.serial_connection is connection:
+                self.link_failed(e)
+    
     def disconnect(self):
         """Disconnect from Arduino"""
+        self.connected = False  # First, so the polling thread stops writing
         if self.serial_connection:
-            self.serial_connection.close()
+            try:
+                self.serial_connection.close()
+            except Exception:
+                pass
             self.serial_connection = None
+    
+    def reset_link(self):
+        """Forget everything learned about the board (it may have reset): resend the failsafe config"""
+        self.failsafe_sent = None
+        self.last_receive_time = None
+        self.heartbeat_acked = False
+        self.board_silent = False
+        self.resync_needed = True
+        self.board_telemetry = None
+        self.board_rx_peak = 0
+        self.clock_sync.reset()
+        self.pings_pending = {}
+        self.frames_pending = {}
+    
+    def link_failed(self, error):
+        """A write or read failed: stop using the port and let the supervisor reconnect"""
+        if self.link_error is None:
+            print(f"Serial error: {error}")
+            self.link_error = str(error) or type(error).__name__
         self.connected = False
     
     def read_responses(self):
-        """Read any responses from Arduino (non-blocking)"""
+        """Handle the lines the reader thread has received since the last call (non-blocking)"""
         responses = []
         if self.connected and self.serial_connection:
+            start = time.perf_counter()
+            received = None  # perf_counter_ns the last line arrived
+            lines = self.received_lines
             try:
-                while self.serial_connection.in_waiting > 0:
-                    line = self.serial_connection.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
+                while lines:
+                    received_ns, raw = lines.popleft()
+                    self.bytes_received += len(raw)
+                    line = raw.decode('utf-8', errors='ignore').strip()
+                    if line.startswith("TEL:"):
+                        # Telemetry is not a reply: keep it out of the responses / last_response
+                        received = received_ns
+                        self.parse_board_telemetry(line)
+                    elif line:
+                        received = received_ns
                         responses.append(line)
-                        if line.startswith("OK:"):
+                        kind = line[3:4]
+                        if line.startswith("OK:") and (kind == 'U' or kind == 'S'):
                             self.commands_confirmed += 1
-            except:
-                pass
+                            # Remember what the firmware actually applied: "OK:U<id>:<us>" or "OK:S<id>:<angle>"
+                            try:
+                                servo_part, value_part = line[4:].split(':', 1)
+                                servo_id = int(servo_part)
+                                if kind == 'U':
+                                    self.acked_pulses[servo_id] = int(value_part)
+                                else:
+                                    self.acked_angles[servo_id] = int(value_part)
+                                sent_at = self.send_times.pop(servo_id, None)
+                                if sent_at is not None:
+                                    self.ack_histogram.observe(received_ns / 1e9 - sent_at)
+                            except ValueError:
+                                pass
+                        elif kind == 'P' or kind == 'N':
+                            self.handle_timestamp_reply(kind, line, len(raw), received_ns)
+                        elif line == "OK:H":
+                            self.heartbeat_acked = True
+                        elif line.startswith("FAILSAFE:"):
+                            self.failsafe_events += 1
+                            print(f"[WARNING] Board went to failsafe after {line[9:]} ms without a command")
+                        elif line.startswith("READY:") and not self.resync_needed:
+                            # The board restarted under us: it lost its failsafe config and servo positions
+                            self.board_resets += 1
+                            print("[WARNING] Board reset - resending failsafe config and servo positions")
+                            self.reset_link()
+            except Exception as e:
+                self.link_failed(e)
+            now = time.perf_counter()
+            if responses:
+                self.last_response = responses[-1]
+            if received is not None:
+                self.last_receive_time = received / 1e9  # When it arrived, not when this tick got to it
+                if self.board_silent:
+                    self.board_silent = False
+                    print("[INFO] Board is responding again")
+            self.read_stats.add(now - start)
         return responses
     
+    def parse_board_telemetry(self, line):
+        """Store a "TEL:<micros>,<loops/s>,<commands>,<rejected>,<rx peak>,<pulses>" line as board_telemetry
+        
+        The frame is a dict: micros (board clock when sent), loop_rate (loop() iterations per
+        second), accepted / rejected (commands parsed / bad lines since the board started),
+        rx_peak (most bytes waiting to be parsed since the last frame), pulses (a pulse width per
+        servo, 0 = not attached) and received (host perf_counter time). Returns the frame or None.
+        """
+        try:
+            micros, loop_rate, accepted, rejected, rx_peak, hex_pulses = line[4:].split(',')
+            if len(hex_pulses) % 3:
+                raise ValueError("pulse field length")
+            frame = {
+                'micros': int(micros),
+                'loop_rate': int(loop_rate),
+                'accepted': int(accepted),
+                'rejected': int(rejected),
+                'rx_peak': int(rx_peak),
+                'pulses': tuple(int(hex_pulses[i:i + 3], 16) for i in range(0, len(hex_pulses), 3)),
+                'received': time.perf_counter()
+            }
+        except ValueError:
+            self.telemetry_errors += 1
+            return None
+        self.board_telemetry = frame
+        self.telemetry_frames += 1
+        if frame['rx_peak'] > self.board_rx_peak:
+            self.board_rx_peak = frame['rx_peak']
+        return frame
+    
+    def handle_timestamp_reply(self, kind, line, size, received):
+        """"OK:P<seq>:<micros>" adds a clock sync sample, "OK:N<seq>:<micros>" a one-way latency
+        
+        size: bytes read; received: perf_counter_ns when the reader thread got the line
+        """
+        try:
+            seq_part, micros_part = line[4:].split(':', 1)
+            seq = int(seq_part)
+            board_us = int(micros_part)
+        except ValueError:
+            return
+        if kind == 'P':
+            sent = self.pings_pending.pop(seq, None)
+            if sent is not None:
+                self.clock_sync.add_sample(sent, board_us, received,
+                                           serial_time_ns(len(f"P{seq}\n"), self.baudrate),
+                                           serial_time_ns(size, self.baudrate))
+            return
+        sent = self.frames_pending.pop(seq, None)
+        arrived = self.clock_sync.board_to_host_ns(board_us)
+        if sent is not None and arrived is not None:
+            one_way = max(0.0, (arrived - sent) / 1e9)
+            self.one_way_histogram.observe(one_way)
+            self.one_way_stats.add(one_way)
+    
+    def sync_clock(self):
+        """Send a clock sync ping when one is due (polling thread, every tick)"""
+        if not (self.connected and self.serial_connection):
+            return
+        now = time.perf_counter()
+        interval = PING_INTERVAL if len(self.clock_sync.samples) >= MIN_DRIFT_SAMPLES else PING_INTERVAL_FAST
+        if now - self.last_ping_time < interval:
+            return
+        self.last_ping_time = now
+        self.ping_seq = (self.ping_seq + 1) & 0xFFFF
+        # Never waits for the reply: the reader thread timestamps it when it arrives
+        self.send_numbered(self.pings_pending, 'P', self.ping_seq)
+    
+    def end_frame(self):
+        """Mark the end of this tick's commands with a numbered N line, if any were sent (polling thread)"""
+        if self.commands_sent == self.frame_commands or not (self.connected and self.serial_connection):
+            return
+        self.frame_commands = self.commands_sent
+        self.frame_seq = (self.frame_seq + 1) & 0xFFFF
+        self.send_numbered(self.frames_pending, 'N', self.frame_seq)
+    
+    def send_numbered(self, pending, kind, seq):
+        """Write "<kind><seq>" and remember when in pending (the oldest entries go once it holds 64)"""
+        if len(pending) >= 64:
+            del pending[next(iter(pending))]  # Lost reply, or firmware without this command
+        pending[seq] = time.perf_counter_ns()
+        self.write_raw(f"{kind}{seq}\n".encode())
+    
+    def latency_summary(self):
+        """One line about the clock sync and host -> board latency ("" until there is a sample)"""
+        sync = self.clock_sync
+        if not sync.synced:
+            return ""
+        text = f"Clock sync ±{sync.error_bound_ns / 1e6:.1f} ms, drift {sync.drift_ppm:+.0f} ppm"
+        values = self.one_way_stats.percentiles(50, 99)
+        if values is not None:
+            text += f" | host → board p50 {values[0] * 1000:.1f} ms, p99 {values[1] * 1000:.1f} ms"
+        return text
+    
+    def telemetry_interval_ms(self):
+        """Telemetry interval to ask the board for at the current baud rate"""
+        return BOARD_TELEMETRY_INTERVAL_SLOW_MS if self.baudrate < 57600 else BOARD_TELEMETRY_INTERVAL_MS
+    
+    def board_summary(self):
+        """One line about the board from its latest telemetry ("" without telemetry)"""
+        frame = self.board_telemetry
+        if frame is None:
+            return ""
+        text = (f"Board: {frame['loop_rate']:,} loops/s | {frame['accepted']} commands, {frame['rejected']} rejected"
+                f" | RX peak {self.board_rx_peak} B")
+        age = time.perf_counter() - frame['received']
+        if age > 3 * self.telemetry_interval_ms() / 1000.0:
+            text += f" | telemetry {age:.0f} s old"
+        return text
+    
     def send_servo_command(self, servo_id, angle):
         """Send servo command to Arduino (servo_id: 0-15, angle: 0-180)"""
+        # Format: "S<servo_id>:<angle>\n"
+        return self.send_command(servo_id, f"S{servo_id}:{angle}\n")
+    
+    def send_servo_pulse(self, servo_id, pulse):
+        """Send servo pulse width to Arduino (servo_id: 0-15, pulse: 500-2500 microseconds)"""
+        # Format: "U<servo_id>:<microseconds>\n"
+        return self.send_command(servo_id, f"U{servo_id}:{pulse}\n")
+    
+    def send_command(self, servo_id, text):
+        """Write one servo command line and pick up any responses"""
         if self.connected and self.serial_connection:
             try:
-                # Format: "S<servo_id>:<angle>\n"
-                command = f"S{servo_id}:{angle}\n"
-                bytes_written = self.serial_connection.write(command.encode())
+                start = time.perf_counter()
+                command = text.encode()
+                encoded = time.perf_counter()
+                bytes_written = self.serial_connection.write(command)
+                written = time.perf_counter()
+                self.encode_histogram.observe(encoded - start)
+                self.write_histogram.observe(written - encoded)
+                self.write_stats.add(written - encoded)
+                self.send_times[servo_id] = written
+                self.last_write_time = written
                 self.commands_sent += 1
+                self.bytes_sent += bytes_written
                 
                 # Try to read response (non-blocking)
                 responses = self.read_responses()
@@ -508,16 +1042,71 @@ class ArduinoManager:
                 
                 return bytes_written > 0
             except Exception as e:
-                print(f"Send error: {e}")
+                self.link_failed(e)
                 return False
         return False
     
+    def set_failsafe(self, timeout_ms, pulses):
+        """Failsafe timeout (0 = off) and (servo_id, pulse) pairs for the board
+        
+        Only stores the config (single reference swap); keep_alive() sends it
+        from the polling thread, and again after every (re)connect, together
+        with the telemetry interval.
+        """
+        self.failsafe_config = (int(timeout_ms), tuple(pulses))
+    
+    def keep_alive(self):
+        """Send the failsafe config and telemetry interval if needed, a heartbeat if nothing was written
+        for a quarter of the timeout, and check the board is still answering (polling thread, every tick)"""
+        config = self.failsafe_config
+        if not (self.connected and self.serial_connection) or config is None:
+            return
+        if config is not self.failsafe_sent:
+            timeout_ms, pulses = config
+            # Ends with a heartbeat: its OK:H tells us the firmware supports all this
+            lines = ([f"T{timeout_ms}\n"] + [f"F{servo_id}:{pulse}\n" for servo_id, pulse in pulses] +
+                     [f"R{self.telemetry_interval_ms()}\n", "H\n"])
+            if self.write_raw("".join(lines).encode()):
+                self.failsafe_sent = config
+        if config[0] <= 0:
+            return  # Failsafe off: no heartbeats needed
+        timeout = config[0] / 1000.0
+        now = time.perf_counter()
+        if now - self.last_write_time >= timeout / 4:
+            self.write_raw(b"H\n")
+        
+        # Silent board: nothing received for a whole timeout although heartbeats went out
+        last = self.last_receive_time
+        if self.heartbeat_acked and last is not None and not self.board_silent and now - last >= timeout:
+            self.board_silent = True
+            self.silence_detect_time = now - last
+            print(f"[WARNING] No response from the board - noticed after {self.silence_detect_time * 1000:.0f} ms")
+    
+    def resend_state(self, pulses):
+        """Send every servo's current pulse width in one write ({servo_id: microseconds})"""
+        self.resync_needed = False
+        if pulses:
+            self.write_raw("".join(f"U{servo_id}:{pulse}\n" for servo_id, pulse in pulses.items()).encode())
+    
+    def write_raw(self, data):
+        """Write bytes outside the per-servo command path (heartbeat, failsafe config, state resend)"""
+        try:
+            bytes_written = self.serial_connection.write(data)
+        except Exception as e:
+            self.link_failed(e)
+            return False
+        self.last_write_time = time.perf_counter()
+        self.bytes_sent += bytes_written
+        return bytes_written > 0
+    
     def get_status(self):
         """Get connection status info"""
         if not self.connected:
             return "Disconnected"
         
         status = f"Connected: {self.port}"
+        if self.board_silent:
+            status += f" | NO RESPONSE (noticed after {self.silence_detect_time * 1000:.0f} ms)"
         if self.commands_sent > 0:
             success_rate = (self.commands_confirmed / self.commands_sent) * 100
             status += f" | Commands: {self.commands_sent} sent, {self.commands_confirmed} confirmed ({success_rate:.0f}%)"
@@ -536,11 +1125,61 @@ class ServoControlApp:
         self.root.after_idle(self.root.attributes, '-topmost', False)
         self.root.focus_force()
         
+        self.init_pipeline()
+        self.load_profiles()
+        self.start_port_watcher()
+        self.start_shared_telemetry()
+        self.start_game_telemetry()
+        self.setup_ui()
+        self.start_polling()
+        self.start_ui_refresh()
+        self.update_arduino_status()
+        
+        # Ensure window is visible and on top initially
+        self.bring_to_front()
+    
+    @classmethod
+    def create_headless(cls):
+        """Create the app without a window - just the controller -> servo pipeline
+        
+        Used by benchmarks and tools. Call start_polling()/stop_polling() to run poll_loop.
+        """
+        app = cls.__new__(cls)
+        app.root = None
+        app.init_pipeline()
+        return app
+    
+    def init_pipeline(self):
+        """Set up everything except the window (controllers, Arduino, mappings, counters)"""
         self.controller_manager = ControllerManager()
         self.arduino_manager = ArduinoManager()
-        
-        # Input to servo mappings: {servo_id: {'controller': index, 'input_type': 'axis/button/hat', 'input_id': id}}
-        self.mappings = {}
+        # Opens, watches and reopens the serial port on its own thread (started by the first connect)
+        self.connection = ConnectionSupervisor(self.arduino_manager)
+        self.ui_connection_seq = -1  # connection.status seq the UI shows
+        # Cached serial port list, kept current on its own thread (started with the window)
+        self.port_watcher = PortWatcher()
+        self.port_watcher.listeners.append(self.connection.ports_changed)
+        self.ui_ports_seq = -1  # port_watcher.seq the port list shows
+        
+        # Rig profiles (see profiles.py). The active profile supplies the mappings, axis settings,
+        # servo calibration, mixer, on-screen wheel settings and serial port. Saved profiles are
+        # loaded by load_profiles(); until then (and in headless tools) an empty default is active
+        # (applied at the end of this method, once everything its mapping table needs exists).
+        self.profile_store = ProfileStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+        self.profiles = {}  # {name: Profile}, replaced (never edited) so the polling thread can read it
+        self.pending_profile = None  # Profile the next-profile button asked for (the Tk thread switches to it)
+        self.profile_seq = 0  # Bumped on every switch so the UI knows to refresh
+        self.profile_switch_button = None  # (controller index, button id) that switches to the next profile
+        self.profile_button_down = False
+        self.active_profile = None
+        
+        # Mapping tree row index (lets the tree be updated by diffing instead of rebuilding)
+        self.mapping_rows = {}  # {servo_id: tree item id}
+        self.mapping_row_config = {}  # {servo_id: (controller name, input type, input id)} as displayed
+        self.mapping_row_values = {}  # {servo_id: value string} as displayed
+        self.mapping_row_order = []  # Servo IDs in display order
+        self.mapping_value_budget = 64  # Max value cells refreshed per UI frame
+        self.mapping_refresh_cursor = 0  # Round-robin position for off-screen rows
         
         # Polling thread
         self.running = False
@@ -549,26 +1188,160 @@ class ServoControlApp:
         # Cache for stats to prevent unnecessary updates
         self.last_stats_text = ""
         
-        # Throttle UI updates to prevent freezing
-        self.ui_update_counter = 0
-        self.ui_update_interval = 2  # Update UI every 2 polling cycles (~10Hz instead of 20Hz)
-        self.pending_ui_updates = {
-            'wheel_angle': None,
-            'axis_charts': False,
-            'mapping_values': False,
-            'wheel_widget': None
-        }
-        
-        # Axis settings: gain and invert for each axis
-        self.axis_settings = {}  # {axis_id: {'gain': float, 'invert': bool}}
-        for i in range(16):  # Support up to 16 axes
-            self.axis_settings[i] = {'gain': 1.0, 'invert': False}
-        
-        self.setup_ui()
-        self.start_polling()
-        
-        # Ensure window is visible and on top initially
-        self.bring_to_front()
+        # Calibration for servos the active profile has none for (endpoints, trim, reverse)
+        self.default_calibration = ServoCalibration()
+        
+        # Last pulse width sent to each servo by process_mappings
+        self.commanded_pulses = {}  # {servo_id: microseconds}
+        
+        # Controller states read by process_mappings this tick (each controller is read once)
+        self.tick_states = {}  # {controller index: state}
+        
+        # Compiled mappings, mixer and calibration the polling thread evaluates (see mapping_table.py).
+        # Never modified: every configuration change publishes a new one with publish_mappings().
+        self.mapping_table = None
+        
+        # Session recording (inputs + servo commands to a binary file)
+        self.session_recorder = None
+        self.sessions_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
+        
+        # Telemetry history for the plot tab: input, commanded and acknowledged position (all on the 0-180 angle scale)
+        self.telemetry_servo = 0  # Servo shown in the telemetry plot
+        self.telemetry_history = TelemetryHistory(3)
+        
+        # Selected controller index (-1 = virtual, None = nothing selected)
+        # Kept as a plain attribute so the polling thread never touches Tk variables
+        self.selected_controller = None
+        
+        # Latest state published by the polling thread for the UI refresh loop.
+        # The poll thread swaps in a new dict each tick; the UI thread only reads it.
+        self.published_state = None
+        self.publish_seq = 0
+        
+        # UI refresh loop (runs on the Tk thread via after())
+        self.ui_target_fps = 60
+        self.ui_last_seq = -1
+        self.ui_profile_seq = -1  # profile_seq the UI widgets currently show
+        self.ui_next_frame = 0.0
+        self.ui_frame_count = 0
+        self.ui_frames_skipped = 0
+        self.ui_fps_window_start = 0.0
+        self.ui_fps = 0.0  # Achieved refresh rate
+        self.ui_frame_time = 0.0  # Time spent in the last UI batch (seconds)
+        
+        # Performance counters (always on) and the HUD that shows them
+        self.poll_interval = 0.05  # Target polling period (seconds)
+        self.poll_period_stats = RollingStats()  # Actual time between poll_loop ticks
+        self.poll_jitter_stats = RollingStats()  # How late each tick started against its deadline
+        self.mapping_stats = RollingStats()  # Time spent in process_mappings
+        self.ui_batch_stats = RollingStats()  # Time spent in _batch_ui_updates
+        self.serial_tx_rate = RateCounter()
+        self.serial_rx_rate = RateCounter()
+        self.perf_hud_visible = False
+        self.perf_hud_interval = 0.25  # Seconds between HUD refreshes
+        self.perf_hud_last_update = 0.0
+        
+        # Per-stage latency histograms, exportable as JSON lines and/or Prometheus text
+        self.metrics = MetricsRegistry()
+        self.input_histogram = self.metrics.histogram('input_read')
+        self.mapping_histogram = self.metrics.histogram('mapping_eval')
+        self.metrics.histogram('encode', self.arduino_manager.encode_histogram)
+        self.metrics.histogram('serial_write', self.arduino_manager.write_histogram)
+        self.metrics.histogram('ack', self.arduino_manager.ack_histogram)
+        self.metrics.histogram('host_to_board', self.arduino_manager.one_way_histogram)
+        self.controller_manager.game_telemetry.decode_histogram = self.metrics.histogram('game_packet')
+        self.game_packet_rate = RateCounter()
+        self.ui_batch_histogram = self.metrics.histogram('ui_batch')
+        self.metrics_exporter = None
+        self.metrics_server = None
+        self.start_metrics_export()
+        
+        # Shared-memory telemetry ring for external tools (started by the GUI app, see start_shared_telemetry)
+        self.shared_telemetry = None
+        
+        self.apply_profile(Profile(DEFAULT_PROFILE))
+    
+    def apply_profile(self, profile):
+        """Make a profile the live configuration
+        
+        Only called on the Tk thread (or before polling starts) - the thread that
+        edits the configuration - so an edit always lands in the profile that is
+        active when it is made. The profile is already loaded and compiled; the
+        polling thread picks up its mapping table at the start of its next tick,
+        so a tick never sees half of one profile and half of another.
+        """
+        wheel = profile.virtual_wheel
+        vc = self.controller_manager.virtual_controller
+        vc.set_arrow_key_sensitivity(wheel['sensitivity'])
+        vc.set_auto_center_speed(wheel['auto_center'])
+        vc.set_max_angle(wheel['max_angle'])
+        vc.set_max_throttle_angle(wheel['max_throttle_angle'])
+        # Input to servo mappings: {servo_id: {'controller': index, 'input_type': 'axis/button/hat', 'input_id': id}}
+        self.mappings = profile.mappings
+        # Gain and invert for each axis: {axis_id: {'gain': float, 'invert': bool}}
+        self.axis_settings = profile.axis_settings
+        # Per-servo calibration: {servo_id: ServoCalibration} (others use default_calibration)
+        self.servo_calibration = profile.servo_calibration
+        # Mixer: servos driven by weighted sums of several inputs (takes priority over a mapping for the same servo)
+        self.mixer = profile.mixer
+        self.active_profile = profile
+        self.publish_mappings()
+        self.profile_seq += 1
+    
+    def publish_mappings(self):
+        """Compile the active mappings, axis settings, mixer and calibration into a new MappingTable and publish it
+        
+        Call after every configuration change, on the Tk thread (or before
+        polling starts) - never on the polling thread. The polling thread picks
+        the new table up at the start of its next tick; a tick already running
+        finishes with the table it started with.
+        """
+        table = MappingTable(self.mappings, self.axis_settings, self.mixer.compiled, self.servo_calibration,
+                             self.default_calibration, self.device_read_histogram)
+        self.mapping_table = table  # Single reference swap - no lock needed
+        self.arduino_manager.set_failsafe(self.active_profile.serial['failsafe_timeout_ms'], table.failsafe)
+        return table
+    
+    def load_profiles(self):
+        """Load and compile every saved profile, then activate the last used one (before the UI is built)"""
+        profiles = self.profile_store.load_all()
+        settings = self.profile_store.load_settings()
+        button = settings.get('switch_button')
+        if button:
+            self.profile_switch_button = (int(button['controller']), int(button['button']))
+        if not profiles:
+            profiles = {self.active_profile.name: self.active_profile}  # Nothing saved yet
+        self.profiles = profiles
+        self.apply_profile(profiles.get(settings.get('active')) or profiles[min(profiles)])
+        print(f"[INFO] Profile '{self.active_profile.name}' active ({len(profiles)} loaded)")
+    
+    def start_port_watcher(self):
+        """Start watching for serial ports, knowing the baud rate each saved profile uses for its port"""
+        for profile in self.profiles.values():
+            self.port_watcher.remember_baudrate(profile.serial['port'], profile.serial['baudrate'])
+        self.port_watcher.start()
+    
+    def next_profile(self):
+        """The profile after the active one (alphabetical, wrapping around), or None if there is only one"""
+        names = sorted(self.profiles)
+        if len(names) < 2:
+            return None
+        name = self.active_profile.name
+        index = names.index(name) + 1 if name in names else 0
+        return self.profiles[names[index % len(names)]]
+    
+    def check_profile_button(self, button):
+        """Ask for a switch to the next profile when the profile button is pressed (polling thread)"""
+        controller, button_id = button
+        state = self.tick_states.get(controller)
+        if state is None:
+            state = self.controller_manager.get_controller_state(controller)
+        pressed = state is not None and button_id < state.button_count and state.buttons[button_id] != 0
+        if pressed and not self.profile_button_down:
+            profile = self.next_profile()
+            if profile is not None:
+                self.pending_profile = profile
+        self.profile_button_down = pressed
     
     def bring_to_front(self):
         """Bring the window to the front"""
@@ -650,14 +1423,21 @@ class ServoControlApp:
             value_label.grid(row=0, column=2, padx=5)
             
             # Store canvas, colors, and label for updates
-            self.axis_charts.append({
+            chart = {
                 'canvas': chart_canvas,
                 'color1': color1,
                 'color2': color2,
                 'value_label': value_label,
-                'name': name
-            })
-            
+                'name': name,
+                'width': 250,  # Cached from <Configure> events
+                'height': 30,
+                'bar_px': None,  # Last drawn bar extents (x1, x2) in pixels
+                'label_text': None  # Last text written to value_label
+            }
+            self.create_axis_chart_items(chart)
+            chart_canvas.bind("<Configure>", lambda e, c=chart: self.on_axis_chart_configure(c, e))
+            self.axis_charts.append(chart)
+
             axis_frame.columnconfigure(1, weight=1)
         
         axis_charts_frame.columnconfigure(0, weight=1)
@@ -710,6 +1490,19 @@ class ServoControlApp:
         
         axis_settings_frame.columnconfigure(0, weight=1)
         
+        # UI refresh rate display
+        self.ui_perf_label = ttk.Label(left_panel, text="", font=("Arial", 8), foreground="gray")
+        self.ui_perf_label.grid(row=8, column=0, columnspan=2, sticky=W, pady=(5, 0))
+        
+        # Performance HUD toggle (also F3)
+        self.perf_hud_var = BooleanVar(value=False)
+        ttk.Checkbutton(left_panel, text="Performance HUD (F3)", variable=self.perf_hud_var,
+                        command=self.on_perf_hud_toggle).grid(row=8, column=2, columnspan=2, sticky=E, pady=(5, 0))
+        
+        # Performance HUD overlay (placed over the window when shown)
+        self.perf_hud = Label(self.root, text="", font=("Courier", 9), justify=LEFT, anchor=NW,
+                              bg='#000000', fg='#00ff00', padx=6, pady=4)
+        
         # Right panel - Tabbed interface
         right_panel = ttk.LabelFrame(main_frame, text="Controller & Servo Control", padding="10")
         right_panel.grid(row=0, column=1, sticky=(W, E, N, S))
@@ -718,6 +1511,25 @@ class ServoControlApp:
         notebook = ttk.Notebook(right_panel)
         notebook.grid(row=0, column=0, sticky=(W, E, N, S), pady=5)
         
+        # Profile bar (below the tabs, always visible)
+        profile_frame = ttk.Frame(right_panel)
+        profile_frame.grid(row=1, column=0, sticky=(W, E), pady=(5, 0))
+        ttk.Label(profile_frame, text="Profile:").grid(row=0, column=0, padx=2, sticky=W)
+        self.profile_var = StringVar()
+        self.profile_combo = ttk.Combobox(profile_frame, textvariable=self.profile_var, state="readonly", width=20)
+        self.profile_combo.grid(row=0, column=1, padx=2, sticky=W)
+        self.profile_combo.bind("<<ComboboxSelected>>", self.on_profile_selected)
+        ttk.Button(profile_frame, text="Save", command=self.save_profile).grid(row=0, column=2, padx=2)
+        ttk.Button(profile_frame, text="Save As...", command=self.save_profile_as).grid(row=0, column=3, padx=2)
+        ttk.Button(profile_frame, text="Delete", command=self.delete_profile).grid(row=0, column=4, padx=2)
+        
+        ttk.Label(profile_frame, text="Next-profile button:").grid(row=1, column=0, padx=2, sticky=W)
+        self.profile_button_var = StringVar(value=str(self.profile_switch_button[1]) if self.profile_switch_button else "-1")
+        ttk.Spinbox(profile_frame, from_=-1, to=31, textvariable=self.profile_button_var, width=5).grid(row=1, column=1, padx=2, sticky=W)
+        ttk.Button(profile_frame, text="Set", command=self.set_profile_button).grid(row=1, column=2, padx=2)
+        self.profile_status = ttk.Label(profile_frame, text="Ctrl+1..9 switches profiles", font=("Arial", 8), foreground="gray")
+        self.profile_status.grid(row=1, column=3, columnspan=2, padx=5, sticky=W)
+        
         # Tab 1: Controller & Wheel
         controller_tab = ttk.Frame(notebook, padding="10")
         notebook.add(controller_tab, text="Controller & Wheel")
@@ -742,6 +1554,27 @@ class ServoControlApp:
         self.debug_status = ttk.Label(arduino_frame, text="", font=("Arial", 8), foreground="gray")
         self.debug_status.grid(row=2, column=0, columnspan=4, pady=2)
         
+        # What the firmware reports about itself (loop rate, parse errors, receive buffer)
+        self.board_status = ttk.Label(arduino_frame, text="", font=("Arial", 8), foreground="gray")
+        self.board_status.grid(row=5, column=0, columnspan=4, sticky=W, pady=2)
+        
+        # What the selected port is (USB description, VID:PID, last baud rate that worked)
+        self.port_info = ttk.Label(arduino_frame, text="", font=("Arial", 8), foreground="gray")
+        self.port_info.grid(row=4, column=0, columnspan=4, sticky=W, pady=2)
+        
+        # Failsafe: servos go to their failsafe positions if the board hears nothing for this long
+        failsafe_frame = ttk.Frame(arduino_frame)
+        failsafe_frame.grid(row=3, column=0, columnspan=4, sticky=W, pady=2)
+        ttk.Label(failsafe_frame, text="Failsafe after:").grid(row=0, column=0, sticky=W)
+        self.failsafe_timeout_var = StringVar()
+        failsafe_spinbox = ttk.Spinbox(failsafe_frame, from_=0, to=5000, increment=50, width=6,
+                                       textvariable=self.failsafe_timeout_var, command=self.set_failsafe_timeout)
+        failsafe_spinbox.grid(row=0, column=1, padx=2)
+        failsafe_spinbox.bind('<Return>', lambda e: self.set_failsafe_timeout())
+        failsafe_spinbox.bind('<FocusOut>', lambda e: self.set_failsafe_timeout())
+        ttk.Label(failsafe_frame, text="ms without a command (0 = off)", font=("Arial", 8),
+                  foreground="gray").grid(row=0, column=2, sticky=W)
+        
         # Interactive wheel widget (shown when virtual controller is selected)
         wheel_frame = ttk.LabelFrame(controller_tab, text="On-Screen Wheel (Testing)", padding="10")
         wheel_frame.grid(row=1, column=0, sticky=(W, E), pady=5)
@@ -792,6 +1625,15 @@ class ServoControlApp:
                                font=("Arial", 24, "bold"))
         wheel_label.grid(row=0, column=0, pady=10)
         
+        # Session recording
+        recording_frame = ttk.LabelFrame(controller_tab, text="Session Recording", padding="5")
+        recording_frame.grid(row=3, column=0, sticky=(W, E), pady=5)
+        
+        self.record_btn = ttk.Button(recording_frame, text="Start Recording", command=self.toggle_recording)
+        self.record_btn.grid(row=0, column=0, padx=2)
+        self.recording_status = ttk.Label(recording_frame, text="Not recording", font=("Arial", 8), foreground="gray")
+        self.recording_status.grid(row=0, column=1, sticky=W, padx=5)
+        
         # Tab 2: Servo Mappings
         mapping_tab = ttk.Frame(notebook, padding="10")
         notebook.add(mapping_tab, text="Servo Mappings")
@@ -846,6 +1688,127 @@ class ServoControlApp:
         ttk.Button(add_frame, text="Add Mapping", command=self.add_mapping).grid(row=1, column=0, columnspan=3, padx=2, pady=2, sticky=(W, E))
         ttk.Button(add_frame, text="Remove", command=self.remove_mapping).grid(row=1, column=3, columnspan=3, padx=2, pady=2, sticky=(W, E))
         
+        # Per-servo calibration (pulse widths in microseconds)
+        calibration_frame = ttk.LabelFrame(mapping_tab, text="Servo Calibration (µs)", padding="5")
+        calibration_frame.grid(row=3, column=0, sticky=(W, E), pady=5)
+        
+        ttk.Label(calibration_frame, text="Servo ID:").grid(row=0, column=0, padx=2, sticky=W)
+        self.calibration_servo_var = StringVar(value="0")
+        ttk.Spinbox(calibration_frame, from_=0, to=15, textvariable=self.calibration_servo_var,
+                    width=5).grid(row=0, column=1, padx=2, sticky=W)
+        # Reload on any change, typed or not, so Apply never writes one servo's fields onto another
+        self.calibration_servo_var.trace_add('write', lambda *args: self.load_calibration())
+        self.calibration_vars = {}
+        for column, (key, label) in enumerate((('min_us', "Min:"), ('center_us', "Center:"),
+                                               ('max_us', "Max:"), ('trim_us', "Trim:"),
+                                               ('failsafe_us', "Failsafe:"))):
+            ttk.Label(calibration_frame, text=label).grid(row=1, column=column * 2, padx=2, sticky=W)
+            self.calibration_vars[key] = StringVar()
+            ttk.Entry(calibration_frame, textvariable=self.calibration_vars[key], width=6).grid(
+                row=1, column=column * 2 + 1, padx=2, sticky=W)
+        self.calibration_reverse_var = BooleanVar(value=False)
+        ttk.Checkbutton(calibration_frame, text="Reverse", variable=self.calibration_reverse_var).grid(
+            row=0, column=2, columnspan=2, padx=2, sticky=W)
+        
+        ttk.Button(calibration_frame, text="Apply", command=self.apply_calibration).grid(row=2, column=0, columnspan=2, padx=2, pady=2, sticky=(W, E))
+        ttk.Button(calibration_frame, text="Reset", command=self.reset_calibration).grid(row=2, column=2, columnspan=2, padx=2, pady=2, sticky=(W, E))
+        self.calibration_status = ttk.Label(calibration_frame, text="Default: 544 / 1472 / 2400 (same travel as 0-180°)",
+                                            font=("Arial", 8), foreground="gray")
+        self.calibration_status.grid(row=2, column=4, columnspan=4, padx=5, sticky=W)
+        
+        # Tab 3: Mixer (servos driven by weighted sums of several inputs)
+        mixer_tab = ttk.Frame(notebook, padding="10")
+        notebook.add(mixer_tab, text="Mixer")
+        self.mixer_tab = mixer_tab
+        
+        ttk.Label(mixer_tab, text="Mixer Inputs", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky=W, pady=(0, 5))
+        
+        input_columns = ("#", "Controller", "Input Type", "Input ID")
+        self.mixer_input_tree = ttk.Treeview(mixer_tab, columns=input_columns, show="headings", height=4)
+        for col in input_columns:
+            self.mixer_input_tree.heading(col, text=col)
+            self.mixer_input_tree.column(col, width=50 if col == "#" else 120)
+        self.mixer_input_tree.grid(row=1, column=0, sticky=(W, E), pady=2)
+        
+        mixer_input_frame = ttk.Frame(mixer_tab)
+        mixer_input_frame.grid(row=2, column=0, sticky=W, pady=2)
+        ttk.Label(mixer_input_frame, text="Type:").grid(row=0, column=0, padx=2, sticky=W)
+        self.mixer_input_type_var = StringVar(value="axis")
+        ttk.Combobox(mixer_input_frame, textvariable=self.mixer_input_type_var, values=["axis", "button", "hat"],
+                    state="readonly", width=7).grid(row=0, column=1, padx=2, sticky=W)
+        ttk.Label(mixer_input_frame, text="ID:").grid(row=0, column=2, padx=2, sticky=W)
+        self.mixer_input_id_var = StringVar(value="0")
+        ttk.Spinbox(mixer_input_frame, from_=0, to=15, textvariable=self.mixer_input_id_var, width=5).grid(row=0, column=3, padx=2, sticky=W)
+        ttk.Button(mixer_input_frame, text="Add Input", command=self.add_mixer_input).grid(row=0, column=4, padx=2)
+        ttk.Button(mixer_input_frame, text="Remove Input", command=self.remove_mixer_input).grid(row=0, column=5, padx=2)
+        
+        ttk.Label(mixer_tab, text="Mixer Outputs", font=("Arial", 10, "bold")).grid(row=3, column=0, sticky=W, pady=(10, 5))
+        
+        output_columns = ("Servo", "Offset", "Mix", "Value")
+        self.mixer_output_tree = ttk.Treeview(mixer_tab, columns=output_columns, show="headings", height=8)
+        for col in output_columns:
+            self.mixer_output_tree.heading(col, text=col)
+            self.mixer_output_tree.column(col, width=240 if col == "Mix" else 70)
+        self.mixer_output_tree.grid(row=4, column=0, sticky=(W, E, N, S), pady=2)
+        
+        mixer_edit_frame = ttk.LabelFrame(mixer_tab, text="Edit Output", padding="5")
+        mixer_edit_frame.grid(row=5, column=0, sticky=(W, E), pady=5)
+        ttk.Label(mixer_edit_frame, text="Servo ID:").grid(row=0, column=0, padx=2, sticky=W)
+        self.mixer_servo_var = StringVar(value="0")
+        ttk.Spinbox(mixer_edit_frame, from_=0, to=63, textvariable=self.mixer_servo_var, width=5).grid(row=0, column=1, padx=2, sticky=W)
+        ttk.Label(mixer_edit_frame, text="Input #:").grid(row=0, column=2, padx=2, sticky=W)
+        self.mixer_weight_input_var = StringVar(value="0")
+        ttk.Spinbox(mixer_edit_frame, from_=0, to=63, textvariable=self.mixer_weight_input_var, width=5).grid(row=0, column=3, padx=2, sticky=W)
+        ttk.Label(mixer_edit_frame, text="Weight:").grid(row=0, column=4, padx=2, sticky=W)
+        self.mixer_weight_var = StringVar(value="1.0")
+        ttk.Entry(mixer_edit_frame, textvariable=self.mixer_weight_var, width=7).grid(row=0, column=5, padx=2, sticky=W)
+        ttk.Button(mixer_edit_frame, text="Set Weight", command=self.set_mixer_weight).grid(row=0, column=6, padx=2)
+        ttk.Label(mixer_edit_frame, text="Offset:").grid(row=1, column=4, padx=2, sticky=W)
+        self.mixer_offset_var = StringVar(value="0.0")
+        ttk.Entry(mixer_edit_frame, textvariable=self.mixer_offset_var, width=7).grid(row=1, column=5, padx=2, sticky=W)
+        ttk.Button(mixer_edit_frame, text="Set Offset", command=self.set_mixer_offset).grid(row=1, column=6, padx=2, pady=2)
+        ttk.Button(mixer_edit_frame, text="Remove Output", command=self.remove_mixer_output).grid(row=1, column=0, columnspan=4, padx=2, pady=2, sticky=W)
+        
+        mixer_file_frame = ttk.Frame(mixer_tab)
+        mixer_file_frame.grid(row=6, column=0, sticky=(W, E), pady=2)
+        ttk.Button(mixer_file_frame, text="Import...", command=self.import_mixer).grid(row=0, column=0, padx=2)
+        ttk.Button(mixer_file_frame, text="Export...", command=self.export_mixer).grid(row=0, column=1, padx=2)
+        ttk.Button(mixer_file_frame, text="Clear", command=self.clear_mixer).grid(row=0, column=2, padx=2)
+        self.mixer_status = ttk.Label(mixer_file_frame, text="Mixed servos override their simple mapping",
+                                      font=("Arial", 8), foreground="gray")
+        self.mixer_status.grid(row=0, column=3, padx=5, sticky=W)
+        self.mixer_value_items = {}  # {servo_id: tree item id} for live value updates
+        
+        # Tab 4: Telemetry plot
+        telemetry_tab = ttk.Frame(notebook, padding="10")
+        notebook.add(telemetry_tab, text="Telemetry")
+        self.notebook = notebook
+        self.telemetry_tab = telemetry_tab
+        
+        telemetry_controls = ttk.Frame(telemetry_tab)
+        telemetry_controls.grid(row=0, column=0, sticky=(W, E), pady=(0, 5))
+        
+        ttk.Label(telemetry_controls, text="Servo ID:").grid(row=0, column=0, padx=2, sticky=W)
+        self.telemetry_servo_var = StringVar(value="0")
+        ttk.Spinbox(telemetry_controls, from_=0, to=15, textvariable=self.telemetry_servo_var,
+                    width=5).grid(row=0, column=1, padx=2, sticky=W)
+        # Typed IDs as well as the arrow buttons
+        self.telemetry_servo_var.trace_add('write', lambda *args: self.on_telemetry_servo_change())
+        
+        # Trace legend
+        trace_styles = [
+            ("Input (scaled)", "#4A90E2"),
+            ("Commanded", "#50C878"),
+            ("Acknowledged", "#FF8C00")
+        ]
+        for i, (trace_name, trace_color) in enumerate(trace_styles):
+            ttk.Label(telemetry_controls, text=f"■ {trace_name}", foreground=trace_color,
+                  font=("Arial", 9)).grid(row=0, column=2 + i, padx=8, sticky=W)
+        
+        self.telemetry_plot = TelemetryPlot(telemetry_tab, self.telemetry_history, trace_styles,
+                                            width=400, height=250)
+        self.telemetry_plot.grid(row=1, column=0, sticky=(W, E, N, S))
+        
         # Configure grid weights
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
@@ -861,6 +1824,10 @@ class ServoControlApp:
         controller_tab.columnconfigure(0, weight=1)
         mapping_tab.columnconfigure(0, weight=1)
         mapping_tab.rowconfigure(1, weight=1)
+        mixer_tab.columnconfigure(0, weight=1)
+        mixer_tab.rowconfigure(4, weight=1)
+        telemetry_tab.columnconfigure(0, weight=1)
+        telemetry_tab.rowconfigure(1, weight=1)
         wheel_frame.columnconfigure(0, weight=1)
         arduino_frame.columnconfigure(1, weight=1)
         
@@ -873,26 +1840,25 @@ class ServoControlApp:
         self.root.bind('<KeyRelease-Up>', lambda e: self.on_arrow_key('up', False))
         self.root.bind('<Down>', lambda e: self.on_arrow_key('down', True))
         self.root.bind('<KeyRelease-Down>', lambda e: self.on_arrow_key('down', False))
+        self.root.bind('<F3>', lambda e: self.toggle_perf_hud())
+        for number in range(1, 10):
+            self.root.bind(f'<Control-Key-{number}>', lambda e, n=number: self.switch_profile_number(n))
         self.root.focus_set()  # Allow keyboard focus
         
         # Initialize
         self.refresh_controllers()
-        self.refresh_ports()
         
-        # Initialize sensitivity, auto-center, and max angle settings
-        vc = self.controller_manager.virtual_controller
-        vc.set_arrow_key_sensitivity(self.sensitivity_var.get())
-        vc.set_auto_center_speed(self.autocenter_var.get())
-        vc.set_max_angle(self.max_angle_var.get())
-        vc.set_max_throttle_angle(180.0)  # Default throttle angle limit
+        # Show the active profile's settings (sensitivity, auto-center, max angle, gains, ...)
+        self.sync_profile_ui()
         
     def refresh_controllers(self):
         """Refresh controller list"""
         count = self.controller_manager.refresh_controllers()
         controllers = []
         
-        # Add virtual controller first
+        # Add virtual controller first, then game telemetry
         controllers.append("V: Virtual Controller (On-Screen Wheel)")
+        controllers.append("G: Game Telemetry (UDP)")
         
         # Add real controllers
         for i in range(count):
@@ -938,18 +1904,21 @@ class ServoControlApp:
         """Update arrow key sensitivity"""
         sensitivity = self.sensitivity_var.get()
         self.controller_manager.virtual_controller.set_arrow_key_sensitivity(sensitivity)
+        self.active_profile.virtual_wheel['sensitivity'] = sensitivity
         self.sensitivity_label.config(text=f"{sensitivity:.3f}")
     
     def on_autocenter_change(self, value=None):
         """Update auto-center speed"""
         speed = self.autocenter_var.get()
         self.controller_manager.virtual_controller.set_auto_center_speed(speed)
+        self.active_profile.virtual_wheel['auto_center'] = speed
         self.autocenter_label.config(text=f"{speed:.2f}")
     
     def on_max_angle_change(self, value=None):
         """Update max angle limit"""
         max_angle = self.max_angle_var.get()
         self.controller_manager.virtual_controller.set_max_angle(max_angle)
+        self.active_profile.virtual_wheel['max_angle'] = max_angle
         if max_angle == 0:
             self.max_angle_label.config(text="Unlimited")
         else:
@@ -963,6 +1932,7 @@ class ServoControlApp:
             gain = float(value)
             if axis_id in self.axis_settings:
                 self.axis_settings[axis_id]['gain'] = gain
+                self.publish_mappings()
                 # Update label
                 if axis_id < len(self.axis_settings_ui):
                     self.axis_settings_ui[axis_id]['gain_label'].config(text=f"{gain:.2f}")
@@ -975,87 +1945,463 @@ class ServoControlApp:
             invert = self.axis_settings_ui[axis_id]['invert_var'].get()
             if axis_id in self.axis_settings:
                 self.axis_settings[axis_id]['invert'] = invert
+                self.publish_mappings()
+    
+    def on_telemetry_servo_change(self):
+        """Switch the servo shown in the telemetry plot"""
+        try:
+            servo_id = int(self.telemetry_servo_var.get())
+        except ValueError:
+            return
+        if servo_id != self.telemetry_servo:
+            self.telemetry_servo = servo_id
+            self.telemetry_history.clear()
+    
+    def toggle_perf_hud(self):
+        """Toggle the performance HUD (F3)"""
+        self.perf_hud_var.set(not self.perf_hud_var.get())
+        self.on_perf_hud_toggle()
+    
+    def on_perf_hud_toggle(self):
+        """Show or hide the performance HUD"""
+        self.perf_hud_visible = self.perf_hud_var.get()
+        if self.perf_hud_visible:
+            self.perf_hud.place(relx=1.0, rely=1.0, x=-10, y=-10, anchor=SE)
+            self.perf_hud.lift()
+            self.update_perf_hud(time.perf_counter())
+        else:
+            self.perf_hud.place_forget()
+    
+    def update_perf_hud(self, now):
+        """Refresh the performance HUD text from the counters"""
+        def ms(stats):
+            values = stats.percentiles(50, 99)
+            if values is None:
+                return "      -        -"
+            return f"{values[0] * 1000:7.2f}  {values[1] * 1000:7.2f}"
+        
+        arduino = self.arduino_manager
+        tx_rate = self.serial_tx_rate.update(arduino.bytes_sent, now)
+        rx_rate = self.serial_rx_rate.update(arduino.bytes_received, now)
+        
+        lines = [
+            "PERFORMANCE          p50 ms   p99 ms",
+            f"poll period       {ms(self.poll_period_stats)}",
+            f"poll jitter       {ms(self.poll_jitter_stats)}",
+            f"process_mappings  {ms(self.mapping_stats)}",
+            f"serial write      {ms(arduino.write_stats)}",
+            f"read_responses    {ms(arduino.read_stats)}",
+            f"host -> board     {ms(arduino.one_way_stats)}",
+            f"UI batch          {ms(self.ui_batch_stats)}",
+            f"UI rate           {self.ui_fps:7.1f} fps",
+            f"serial tx/rx      {tx_rate:7.0f} / {rx_rate:.0f} B/s",
+            f"metrics overhead  {self.get_metrics_overhead() * 100:7.3f} % of tick"
+        ]
+        
+        # The board's own view (firmware telemetry)
+        frame = arduino.board_telemetry
+        if frame is not None:
+            lines.append(f"board loop        {frame['loop_rate']:7d} /s")
+            lines.append(f"board rx peak     {frame['rx_peak']:7d} B  (max {arduino.board_rx_peak})")
+            lines.append(f"board rejected    {frame['rejected']:7d}")
+        sync = arduino.clock_sync
+        if sync.synced:
+            lines.append(f"clock sync        ±{sync.error_bound_ns / 1e6:6.2f} ms  {sync.drift_ppm:+.0f} ppm")
+        
+        # Game telemetry packets (received and decoded on their own thread)
+        game = self.controller_manager.game_telemetry
+        if game.address is not None:
+            packet_rate = self.game_packet_rate.update(game.packets, now)
+            snapshot = game.decode_histogram.snapshot()
+            p99 = histogram_percentile(snapshot, 99)
+            decode = f"  decode p99 <= {p99 * 1e6:.0f} us" if p99 is not None else ""
+            lines.append(f"game packets      {packet_rate:7.0f} /s{decode}")
+        
+        # One read per referenced controller per tick (histogram bucket bounds, since start)
+        table = self.mapping_table
+        if table is not None:
+            device_lines = []
+            for controller, histogram, _ in table.inputs.controllers:
+                snapshot = histogram.snapshot()
+                p50 = histogram_percentile(snapshot, 50)
+                p99 = histogram_percentile(snapshot, 99)
+                if p50 is None:
+                    continue
+                label = {-1: "virtual", GAME_TELEMETRY_CONTROLLER: "game"}.get(controller, f"controller {controller}")
+                device_lines.append(f" read {label:12s}{p50 * 1000:7.3f}  {p99 * 1000:7.3f}")
+            lines[4:4] = device_lines
+        self.perf_hud.config(text="\n".join(lines))
+    
+    def start_metrics_export(self):
+        """Start metrics exporters configured through environment variables
+        
+        RCSERVO_METRICS_FILE      append a JSON-lines snapshot to this file
+        RCSERVO_METRICS_INTERVAL  seconds between snapshots (default 10)
+        RCSERVO_METRICS_PORT      serve Prometheus text on http://127.0.0.1:<port>/metrics
+        """
+        path = os.environ.get('RCSERVO_METRICS_FILE')
+        if path:
+            try:
+                interval = float(os.environ.get('RCSERVO_METRICS_INTERVAL', '10'))
+            except ValueError:
+                interval = 10.0
+            self.metrics_exporter = MetricsExporter(self.metrics, path, interval)
+            self.metrics_exporter.start()
+            print(f"[INFO] Writing metrics to {path} every {interval:g}s")
+        
+        port = os.environ.get('RCSERVO_METRICS_PORT')
+        if port:
+            try:
+                self.metrics_server = start_metrics_server(self.metrics, int(port))
+            except ValueError:
+                print(f"[WARNING] Invalid RCSERVO_METRICS_PORT: {port}")
+    
+    def start_shared_telemetry(self):
+        """Publish every tick to a shared-memory ring that external tools can read
+        
+        RCSERVO_SHM_NAME  name of the shared memory block (default rcservo_telemetry, "off" disables)
+        """
+        name = os.environ.get('RCSERVO_SHM_NAME', SHARED_TELEMETRY_NAME)
+        if not name or name.lower() == 'off':
+            return
+        writer = SharedTelemetryWriter(name)
+        try:
+            writer.open()
+        except FileExistsError:
+            print(f"[WARNING] Shared telemetry '{name}' is in use by another instance - not publishing")
+            return
+        except OSError as e:
+            print(f"[WARNING] Could not create shared telemetry '{name}': {e}")
+            return
+        self.shared_telemetry = writer
+        print(f"[INFO] Publishing telemetry to shared memory '{name}'")
+    
+    def start_game_telemetry(self):
+        """Listen for racing game UDP telemetry (the "G:" controller)
+        
+        RCSERVO_GAME_TELEMETRY  UDP port or host:port to listen on (default 127.0.0.1:20777, "off" disables;
+                                use 0.0.0.0:<port> for a game on another machine or a console)
+        """
+        setting = os.environ.get('RCSERVO_GAME_TELEMETRY', '')
+        if setting.lower() == 'off':
+            return
+        address = DEFAULT_ADDRESS
+        if setting:
+            try:
+                address = parse_address(setting)
+            except ValueError:
+                print(f"[WARNING] Invalid RCSERVO_GAME_TELEMETRY: {setting}")
+                return
+        telemetry = self.controller_manager.game_telemetry
+        if telemetry.start(address):
+            print(f"[INFO] Listening for game telemetry on UDP {telemetry.address[0]}:{telemetry.address[1]}")
+    
+    def get_metrics_overhead(self):
+        """Estimated fraction of a polling tick spent recording histograms"""
+        # Per mapping: input read, mapping eval, encode, serial write and the ack echo
+        observations = 5 * len(self.mappings)
+        period = self.poll_period_stats.percentiles(50)
+        return self.metrics.overhead_ratio(observations, period[0] if period else self.poll_interval)
     
     def refresh_ports(self):
-        """Refresh serial port list"""
-        ports = self.arduino_manager.get_available_ports()
-        self.port_combo['values'] = ports
-        if ports:
-            self.port_combo.current(0)
+        """Ask the port watcher to list the ports again now (the list updates when it is done)"""
+        self.port_watcher.refresh()
+    
+    def update_port_list(self):
+        """Show the port watcher's latest list and what the selected port is (from update_arduino_status)"""
+        watcher = self.port_watcher
+        seq = watcher.seq
+        if seq != self.ui_ports_seq:
+            first = self.ui_ports_seq == -1
+            self.ui_ports_seq = seq
+            old = set(self.port_combo['values'])
+            ports = watcher.devices()
+            self.port_combo['values'] = ports
+            if not first:
+                for port in ports:
+                    if port not in old:
+                        print(f"[INFO] Serial port plugged in: {port} {watcher.describe(port)}")
+            if not self.connection.wanted and self.port_var.get() not in ports:
+                if self.active_profile.serial['port'] in ports:
+                    self.port_var.set(self.active_profile.serial['port'])
+                elif ports:
+                    self.port_combo.current(0)
+        info = watcher.describe(self.port_var.get())
+        if self.port_info.cget('text') != info:
+            self.port_info.config(text=info)
     
     def on_controller_selected(self, event=None):
         """Update display when controller is selected"""
         self.update_controller_info()
         # Show/hide wheel widget based on selection
         selection = self.controller_var.get()
+        self.selected_controller = self.get_selected_controller_index()
         if selection and selection.startswith("V:"):
             self.wheel_widget.grid()
         else:
             self.wheel_widget.grid_remove()
     
-    def update_controller_info(self):
-        """Update controller information display"""
+    def get_selected_controller_index(self):
+        """Get the controller index for the current selection (-1 = virtual, None = none)"""
         selection = self.controller_var.get()
         if not selection:
+            return None
+        if selection.startswith("V:"):
+            return -1
+        if selection.startswith("G:"):
+            return GAME_TELEMETRY_CONTROLLER
+        try:
+            return int(selection.split(':')[0])
+        except ValueError:
+            return None
+    
+    def update_controller_info(self):
+        """Update controller information display"""
+        index = self.get_selected_controller_index()
+        if index is None:
             return
         
         try:
-            # Check if virtual controller
-            if selection.startswith("V:"):
-                index = -1
-            else:
-                index = int(selection.split(':')[0])
-            
             info = self.controller_manager.get_controller_info(index)
             if info:
                 text = f"Name: {info['name']}\n"
                 text += f"Axes: {info['axes']}\n"
                 text += f"Buttons: {info['buttons']}\n"
                 text += f"Hats: {info['hats']}\n"
+                if index == GAME_TELEMETRY_CONTROLLER:
+                    text += self.controller_manager.game_telemetry.describe() + "\n"
+                    text += "Axes: " + ", ".join(f"{i} {name}" for i, name in enumerate(info['channels'])) + "\n"
+                    text += "Buttons: 0 receiving, 1 race on\n"
                 self.controller_info_text.delete(1.0, END)
                 self.controller_info_text.insert(1.0, text)
         except:
             pass
     
     def toggle_arduino_connection(self):
-        """Toggle Arduino connection"""
-        if self.arduino_manager.connected:
-            self.arduino_manager.disconnect()
-            self.connect_btn.config(text="Connect")
-            self.connection_status.config(text="Disconnected", foreground="red")
-            self.debug_status.config(text="")
+        """Connect or disconnect (the connection supervisor does the work in the background)"""
+        if self.connection.wanted:
+            self.connection.disconnect()
         else:
             port = self.port_var.get()
             if port:
-                if self.arduino_manager.connect(port):
-                    self.connect_btn.config(text="Disconnect")
-                    self.connection_status.config(text=f"Connected: {port}", foreground="green")
-                    # Start reading responses in background
-                    self.update_arduino_status()
-                else:
-                    self.connection_status.config(text="Connection Failed", foreground="red")
-                    self.debug_status.config(text="Check if Arduino is powered and servos aren't drawing too much current")
+                # Start with the rate that last worked on this port instead of scanning them all
+                self.connection.connect(port, self.active_profile.serial['baudrate'],
+                                        self.port_watcher.known_baudrates.get(port))
+    
+    def set_failsafe_timeout(self):
+        """Apply the failsafe timeout from the spinbox (sent to the board on the next tick)"""
+        try:
+            timeout_ms = max(0, int(self.failsafe_timeout_var.get()))
+        except ValueError:
+            timeout_ms = self.active_profile.serial['failsafe_timeout_ms']
+        self.failsafe_timeout_var.set(str(timeout_ms))
+        if timeout_ms != self.active_profile.serial['failsafe_timeout_ms']:
+            self.active_profile.serial['failsafe_timeout_ms'] = timeout_ms
+            self.publish_mappings()
+    
+    def toggle_recording(self):
+        """Start or stop recording the session to sessions/<timestamp>.rcsrec"""
+        recorder = self.session_recorder
+        if recorder is not None:
+            # Detach first so the polling thread stops feeding it
+            self.session_recorder = None
+            recorder.stop()
+            self.record_btn.config(text="Start Recording")
+            self.recording_status.config(text=f"Saved: {os.path.basename(recorder.path)} "
+                                              f"({recorder.file_records} records)", foreground="gray")
+            print(f"Session saved to {recorder.path}")
+            return
+        
+        path = os.path.join(self.sessions_dir, time.strftime("session_%Y%m%d_%H%M%S.rcsrec"))
+        # Save the mapping setup with the recording so it can be replayed (session_replay.py)
+        config = {
+            'mappings': {servo_id: dict(mapping) for servo_id, mapping in self.mappings.items()},
+            'axis_settings': {axis_id: dict(settings) for axis_id, settings in self.axis_settings.items()},
+            'mixer': self.mixer.to_dict(),
+            'calibration': {servo_id: calibration.to_dict() for servo_id, calibration in self.servo_calibration.items()}
+        }
+        recorder = SessionRecorder(path, config=config)
+        try:
+            recorder.start()
+        except OSError as e:
+            print(f"Could not start recording: {e}")
+            self.recording_status.config(text=f"Recording failed: {e}", foreground="red")
+            return
+        self.session_recorder = recorder
+        self.record_btn.config(text="Stop Recording")
+        self.recording_status.config(text="Recording...", foreground="red")
+        print(f"Recording session to {path}")
+    
+    def switch_profile(self, name):
+        """Switch to a loaded profile (takes effect from the next polling tick)"""
+        profile = self.profiles.get(name)
+        if profile is None or profile is self.active_profile:
+            return
+        self.apply_profile(profile)
+    
+    def switch_profile_number(self, number):
+        """Switch to the n-th profile in alphabetical order (Ctrl+1..9)"""
+        names = sorted(self.profiles)
+        if number <= len(names):
+            self.switch_profile(names[number - 1])
+    
+    def on_profile_selected(self, event=None):
+        """Switch profiles from the profile dropdown"""
+        self.switch_profile(self.profile_var.get())
+    
+    def sync_profile_ui(self):
+        """Show the active profile's settings in every widget that displays them"""
+        self.ui_profile_seq = self.profile_seq
+        profile = self.active_profile
+        self.profile_combo['values'] = sorted(self.profiles)
+        self.profile_var.set(profile.name)
+        
+        wheel = profile.virtual_wheel
+        self.sensitivity_var.set(wheel['sensitivity'])
+        self.sensitivity_label.config(text=f"{wheel['sensitivity']:.3f}")
+        self.autocenter_var.set(wheel['auto_center'])
+        self.autocenter_label.config(text=f"{wheel['auto_center']:.2f}")
+        self.max_angle_var.set(wheel['max_angle'])
+        self.max_angle_label.config(text="Unlimited" if wheel['max_angle'] == 0 else f"{wheel['max_angle']:.0f}°")
+        
+        for axis_ui in self.axis_settings_ui:
+            settings = self.axis_settings.get(axis_ui['axis_id'], {'gain': 1.0, 'invert': False})
+            axis_ui['gain_var'].set(settings['gain'])
+            axis_ui['gain_label'].config(text=f"{settings['gain']:.2f}")
+            axis_ui['invert_var'].set(settings['invert'])
+        
+        port = profile.serial['port']
+        if not self.connection.wanted and port in self.port_combo['values']:
+            self.port_var.set(port)
+        self.failsafe_timeout_var.set(str(profile.serial['failsafe_timeout_ms']))
+        
+        self.update_mapping_display()
+        self.update_mixer_display()
+        self.load_calibration()
+    
+    def save_profile(self):
+        """Write the active profile (and which one is active) to the profiles folder"""
+        try:
+            self.profile_store.save(self.active_profile)
+            self.save_profile_settings()
+        except OSError as e:
+            self.profile_status.config(text=f"Save failed: {e}", foreground="red")
+            return
+        self.profile_status.config(text=f"Saved '{self.active_profile.name}'", foreground="green")
+    
+    def save_profile_as(self):
+        """Save the current settings as a new profile and switch to it"""
+        name = simpledialog.askstring("Save Profile As", "Profile name:", parent=self.root)
+        if not name:
+            return
+        name = name.strip()
+        try:
+            # A separate copy, so editing the new profile leaves the old one alone
+            profile = Profile.from_dict(name, self.active_profile.to_dict())
+        except ValueError as e:
+            self.profile_status.config(text=str(e), foreground="red")
+            return
+        self.profiles = {**self.profiles, name: profile}
+        self.switch_profile(name)
+        try:
+            self.profile_store.save(profile)
+            self.save_profile_settings()
+        except OSError as e:
+            self.profile_status.config(text=f"Save failed: {e}", foreground="red")
+            return
+        self.profile_status.config(text=f"Saved '{name}'", foreground="green")
+    
+    def delete_profile(self):
+        """Delete the active profile and switch to another one"""
+        name = self.active_profile.name
+        profiles = {n: p for n, p in self.profiles.items() if n != name}
+        if not profiles:
+            fresh = Profile(DEFAULT_PROFILE)
+            profiles = {fresh.name: fresh}
+        self.profile_store.delete(name)
+        self.profiles = profiles
+        self.switch_profile(min(profiles))
+        self.save_profile_settings()
+        self.profile_status.config(text=f"Deleted '{name}'", foreground="gray")
+    
+    def set_profile_button(self):
+        """Use a button on the selected controller to switch to the next profile (-1 = none)"""
+        try:
+            button_id = int(self.profile_button_var.get())
+        except ValueError:
+            return
+        controller = self.get_selected_controller_index()
+        if button_id < 0 or controller is None:
+            self.profile_switch_button = None
+            self.profile_status.config(text="Next-profile button off", foreground="gray")
+        else:
+            self.profile_switch_button = (controller, button_id)
+            self.profile_status.config(text=f"Button {button_id} switches to the next profile", foreground="green")
+        self.save_profile_settings()
+    
+    def save_profile_settings(self):
+        """Remember the active profile and the next-profile button for the next start"""
+        button = self.profile_switch_button
+        try:
+            self.profile_store.save_settings({
+                'active': self.active_profile.name,
+                'switch_button': {'controller': button[0], 'button': button[1]} if button else None
+            })
+        except OSError as e:
+            print(f"[WARNING] Could not save profile settings: {e}")
     
     def update_arduino_status(self):
-        """Update Arduino status display"""
-        if self.arduino_manager.connected:
-            # Read any responses
-            responses = self.arduino_manager.read_responses()
-            if responses:
-                # Update debug status with last response
-                last_response = responses[-1]
-                if last_response.startswith("OK:"):
-                    self.debug_status.config(text=f"✓ Last command confirmed: {last_response}", foreground="green")
-                else:
-                    self.debug_status.config(text=f"Arduino: {last_response}", foreground="blue")
+        """Show the connection supervisor's progress and the link status (every 100 ms)"""
+        arduino = self.arduino_manager
+        seq, state, message = self.connection.status
+        if seq != self.ui_connection_seq:
+            self.ui_connection_seq = seq
+            self.connect_btn.config(text="Connect" if state == DISCONNECTED else "Disconnect")
+            if state == CONNECTED:
+                # Remember the port and the (possibly auto-detected) baud rate in the profile
+                self.active_profile.serial.update(port=arduino.port, baudrate=arduino.baudrate)
+                self.port_watcher.remember_baudrate(arduino.port, arduino.baudrate)
+                self.debug_status.config(text="")
+            elif state == DISCONNECTED:
+                self.debug_status.config(text="")
+            else:
+                self.debug_status.config(text="Check if Arduino is powered and servos aren't drawing too much current",
+                                         foreground="gray")
+        
+        if state == CONNECTED:
+            if arduino.board_silent:
+                # Board stopped answering heartbeats (the firmware's failsafe has taken over)
+                text = f"No response from {arduino.port} (noticed after {arduino.silence_detect_time * 1000:.0f} ms)"
+                color = "red"
+            else:
+                text = message
+                color = "green"
             
-            # Update status with command stats
-            status_text = self.arduino_manager.get_status()
+            # Last response from the board, or the command stats
+            status_text = arduino.get_status()
             if "Commands:" in status_text:
-                self.debug_status.config(text=status_text.split("|")[1].strip() if "|" in status_text else "")
-            
-            # Schedule next update
-            self.root.after(100, self.update_arduino_status)
+                debug_text = next(part.strip() for part in status_text.split("|") if "Commands:" in part)
+                debug_color = "gray"
+            elif arduino.last_response.startswith("OK:"):
+                debug_text = f"✓ Last command confirmed: {arduino.last_response}"
+                debug_color = "green"
+            else:
+                debug_text = f"Arduino: {arduino.last_response}" if arduino.last_response else ""
+                debug_color = "blue"
+            if self.debug_status.cget('text') != debug_text:
+                self.debug_status.config(text=debug_text, foreground=debug_color)
+            board_text = "\n".join(text for text in (arduino.board_summary(), arduino.latency_summary()) if text)
+        else:
+            text = message
+            color = "red" if state == DISCONNECTED else "orange"
+            board_text = ""
+        if self.board_status.cget('text') != board_text:
+            self.board_status.config(text=board_text)
+        if self.connection_status.cget('text') != text:
+            self.connection_status.config(text=text, foreground=color)
+        self.update_port_list()
+        
+        self.root.after(100, self.update_arduino_status)
     
     def add_mapping(self):
         """Add a new servo mapping"""
@@ -1065,23 +2411,18 @@ class ServoControlApp:
             input_id = int(self.input_id_var.get())
             
             # Get selected controller
-            selection = self.controller_var.get()
-            if not selection:
+            controller_index = self.get_selected_controller_index()
+            if controller_index is None:
                 print("No controller selected")
                 return
             
-            # Handle virtual controller
-            if selection.startswith("V:"):
-                controller_index = -1
-            else:
-                controller_index = int(selection.split(':')[0])
-            
             # Add mapping
             self.mappings[servo_id] = {
                 'controller': controller_index,
                 'input_type': input_type,
                 'input_id': input_id
             }
+            self.publish_mappings()
             
             print(f"Added mapping: Servo {servo_id} -> {input_type} {input_id} from controller {controller_index}")
             print(f"Total mappings: {len(self.mappings)}")
@@ -1101,39 +2442,208 @@ class ServoControlApp:
             servo_id = int(item['values'][0])
             if servo_id in self.mappings:
                 del self.mappings[servo_id]
+                self.publish_mappings()
                 self.update_mapping_display()
     
+    def load_calibration(self):
+        """Show the selected servo's calibration in the calibration fields"""
+        try:
+            servo_id = int(self.calibration_servo_var.get())
+        except ValueError:
+            return
+        calibration = self.servo_calibration.get(servo_id, self.default_calibration)
+        for key, var in self.calibration_vars.items():
+            value = getattr(calibration, key)
+            var.set("" if value is None else str(value))  # Blank failsafe = center
+        self.calibration_reverse_var.set(calibration.reverse)
+    
+    def apply_calibration(self):
+        """Build the selected servo's lookup table from the calibration fields and swap it in"""
+        try:
+            servo_id = int(self.calibration_servo_var.get())
+            values = {key: var.get().strip() for key, var in self.calibration_vars.items()}
+            calibration = ServoCalibration(int(values['min_us']), int(values['center_us']), int(values['max_us']),
+                                           int(values['trim_us']), self.calibration_reverse_var.get(),
+                                           int(values['failsafe_us']) if values['failsafe_us'] else None)
+        except ValueError as e:
+            self.calibration_status.config(text=str(e), foreground="red")
+            return
+        self.servo_calibration[servo_id] = calibration
+        self.publish_mappings()
+        self.calibration_status.config(text=f"Servo {servo_id}: {calibration.min_us} / {calibration.center_us} / "
+                                            f"{calibration.max_us} µs", foreground="green")
+    
+    def reset_calibration(self):
+        """Return the selected servo to the default calibration"""
+        try:
+            servo_id = int(self.calibration_servo_var.get())
+        except ValueError:
+            return
+        self.servo_calibration.pop(servo_id, None)
+        self.publish_mappings()
+        self.load_calibration()
+        self.calibration_status.config(text=f"Servo {servo_id}: default calibration", foreground="gray")
+    
     def update_mapping_display(self):
-        """Update the mapping tree display"""
+        """Update the mapping tree display (only rows that were added, removed or changed)"""
         try:
-            # Clear existing items
-            for item in self.mapping_tree.get_children():
-                self.mapping_tree.delete(item)
+            # Remove rows whose mapping no longer exists
+            for servo_id in [s for s in self.mapping_rows if s not in self.mappings]:
+                self.mapping_tree.delete(self.mapping_rows.pop(servo_id))
+                self.mapping_row_config.pop(servo_id, None)
+                self.mapping_row_values.pop(servo_id, None)
             
-            # Add current mappings
-            for servo_id, mapping in sorted(self.mappings.items()):
-                # Format controller name
-                if mapping['controller'] == -1:
-                    controller_name = "Virtual Controller"
-                else:
-                    controller_name = f"Controller {mapping['controller']}"
+            # Add new mappings and refresh edited ones, keeping rows sorted by servo ID
+            order = sorted(self.mappings)
+            for position, servo_id in enumerate(order):
+                mapping = self.mappings[servo_id]
                 
-                input_type = mapping['input_type']
-                input_id = mapping['input_id']
-                
-                # Get current value
-                value = self.get_mapping_value(mapping)
-                value_str = f"{value:.2f}" if isinstance(value, float) else str(value)
+                config = (controller_name(mapping['controller']), mapping['input_type'], mapping['input_id'])
                 
-                # Insert into treeview
-                item_id = self.mapping_tree.insert("", END, values=(servo_id, controller_name, input_type, input_id, value_str))
+                item_id = self.mapping_rows.get(servo_id)
+                if item_id is None:
+                    # Get current value
+                    value = self.get_mapping_value(mapping)
+                    value_str = f"{value:.2f}" if isinstance(value, float) else str(value)
+                    
+                    # Insert into treeview (position keeps the sort order)
+                    item_id = self.mapping_tree.insert("", position, values=(servo_id,) + config + (value_str,))
+                    self.mapping_rows[servo_id] = item_id
+                    self.mapping_row_values[servo_id] = value_str
+                elif self.mapping_row_config.get(servo_id) != config:
+                    self.mapping_tree.item(item_id, values=(servo_id,) + config + (self.mapping_row_values[servo_id],))
+                self.mapping_row_config[servo_id] = config
+            
+            self.mapping_row_order = order
         except Exception as e:
             print(f"Error updating mapping display: {e}")
     
-    def get_mapping_value(self, mapping):
-        """Get current value for a mapping (with axis settings applied)"""
+    def add_mixer_input(self):
+        """Add the selected controller's input to the mixer's input list"""
+        controller_index = self.get_selected_controller_index()
+        if controller_index is None:
+            self.mixer_status.config(text="No controller selected", foreground="red")
+            return
+        try:
+            index = self.mixer.add_input(controller_index, self.mixer_input_type_var.get(),
+                                         int(self.mixer_input_id_var.get()))
+        except ValueError as e:
+            self.mixer_status.config(text=str(e), foreground="red")
+            return
+        self.mixer_status.config(text=f"Input #{index} ready", foreground="gray")
+        self.publish_mappings()
+        self.update_mixer_display()
+    
+    def remove_mixer_input(self):
+        """Remove the selected mixer input (and its weights)"""
+        selection = self.mixer_input_tree.selection()
+        if not selection:
+            return
+        index = int(self.mixer_input_tree.item(selection[0])['values'][0])
+        self.mixer.remove_input(index)
+        self.publish_mappings()
+        self.update_mixer_display()
+    
+    def set_mixer_weight(self):
+        """Set one weight of the mixer matrix from the edit controls"""
         try:
-            state = self.controller_manager.get_controller_state(mapping['controller'])
+            self.mixer.set_weight(int(self.mixer_servo_var.get()), int(self.mixer_weight_input_var.get()),
+                                  float(self.mixer_weight_var.get()))
+        except ValueError as e:
+            self.mixer_status.config(text=f"Can't set weight: {e}", foreground="red")
+            return
+        self.mixer_status.config(text="Mixed servos override their simple mapping", foreground="gray")
+        self.publish_mappings()
+        self.update_mixer_display()
+    
+    def set_mixer_offset(self):
+        """Set a mixer output's offset from the edit controls"""
+        try:
+            self.mixer.set_offset(int(self.mixer_servo_var.get()), float(self.mixer_offset_var.get()))
+        except ValueError as e:
+            self.mixer_status.config(text=f"Can't set offset: {e}", foreground="red")
+            return
+        self.publish_mappings()
+        self.update_mixer_display()
+    
+    def remove_mixer_output(self):
+        """Remove the selected mixer output (or the one in the Servo ID box)"""
+        selection = self.mixer_output_tree.selection()
+        try:
+            if selection:
+                servo_id = int(self.mixer_output_tree.item(selection[0])['values'][0])
+            else:
+                servo_id = int(self.mixer_servo_var.get())
+        except ValueError:
+            return
+        self.mixer.remove_output(servo_id)
+        self.publish_mappings()
+        self.update_mixer_display()
+    
+    def clear_mixer(self):
+        """Remove every mixer input and output"""
+        self.mixer.clear()
+        self.publish_mappings()
+        self.update_mixer_display()
+    
+    def import_mixer(self):
+        """Load the mixer matrix from a JSON file"""
+        path = filedialog.askopenfilename(title="Import Mixer", filetypes=[("Mixer JSON", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.mixer.import_file(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not import mixer: {e}")
+            self.mixer_status.config(text=f"Import failed: {e}", foreground="red")
+            return
+        self.mixer_status.config(text=f"Imported {os.path.basename(path)}", foreground="gray")
+        self.publish_mappings()
+        self.update_mixer_display()
+    
+    def export_mixer(self):
+        """Save the mixer matrix to a JSON file"""
+        path = filedialog.asksaveasfilename(title="Export Mixer", defaultextension=".json",
+                                            filetypes=[("Mixer JSON", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.mixer.export_file(path)
+        except OSError as e:
+            print(f"Could not export mixer: {e}")
+            self.mixer_status.config(text=f"Export failed: {e}", foreground="red")
+            return
+        self.mixer_status.config(text=f"Exported {os.path.basename(path)}", foreground="gray")
+    
+    def update_mixer_display(self):
+        """Rebuild the mixer trees (only called after edits)"""
+        self.mixer_input_tree.delete(*self.mixer_input_tree.get_children())
+        for index, source in enumerate(self.mixer.inputs):
+            self.mixer_input_tree.insert("", END, values=(index, controller_name(source['controller']),
+                                                          source['input_type'], source['input_id']))
+        
+        self.mixer_output_tree.delete(*self.mixer_output_tree.get_children())
+        self.mixer_value_items = {}
+        for servo_id, output in sorted(self.mixer.outputs.items()):
+            terms = " ".join(f"{weight:+.2f}×in{index}" for index, weight in sorted(output['weights'].items()))
+            item_id = self.mixer_output_tree.insert("", END, values=(servo_id, f"{output['offset']:+.2f}", terms or "-", ""))
+            self.mixer_value_items[servo_id] = item_id
+    
+    def update_mixer_values(self, mapping_values):
+        """Update the Value column of the mixer output tree"""
+        for servo_id, item_id in self.mixer_value_items.items():
+            value = mapping_values.get(servo_id)
+            if value is not None:
+                self.mixer_output_tree.set(item_id, "Value", f"{value:.2f}")
+    
+    def get_mapping_value(self, mapping, state=None):
+        """Get current value for a mapping (with axis settings applied)
+        
+        Pass the controller state if it has already been read this tick.
+        """
+        try:
+            if state is None:
+                state = self.controller_manager.get_controller_state(mapping['controller'])
             if not state:
                 return 0
             
@@ -1141,8 +2651,8 @@ class ServoControlApp:
             input_id = mapping['input_id']
             
             if input_type == 'axis':
-                if input_id < len(state['axes']):
-                    value = state['axes'][input_id]
+                if input_id < len(state.axes):
+                    value = state.axes[input_id]
                     # Apply axis settings (gain and invert)
                     if input_id in self.axis_settings:
                         settings = self.axis_settings[input_id]
@@ -1153,11 +2663,11 @@ class ServoControlApp:
                         value = max(-1.0, min(1.0, value))
                     return value
             elif input_type == 'button':
-                if input_id < len(state['buttons']):
-                    return 1 if state['buttons'][input_id] else 0
+                if input_id < len(state.buttons):
+                    return 1 if state.buttons[input_id] else 0
             elif input_type == 'hat':
-                if input_id < len(state['hats']):
-                    hat = state['hats'][input_id]
+                if input_id < len(state.hats):
+                    hat = state.hats[input_id]
                     return hat[0]  # X value of hat
             
             return 0
@@ -1170,9 +2680,24 @@ class ServoControlApp:
         self.poll_thread = threading.Thread(target=self.poll_loop, daemon=True)
         self.poll_thread.start()
     
+    def stop_polling(self):
+        """Stop the polling thread and wait for it to finish"""
+        self.running = False
+        if self.poll_thread:
+            self.poll_thread.join(timeout=2)
+            self.poll_thread = None
+    
     def poll_loop(self):
-        """Main polling loop"""
+        """Main polling loop (one tick every poll_interval, on a fixed schedule)"""
+        last_tick = None
+        next_tick = time.perf_counter()  # Deadline of the next tick
         while self.running:
+            tick_start = time.perf_counter()
+            self.poll_jitter_stats.add(max(0.0, tick_start - next_tick))
+            if last_tick is not None:
+                self.poll_period_stats.add(tick_start - last_tick)
+            last_tick = tick_start
+            
             # Only pump pygame events if pygame is available
             if self.controller_manager.pygame_available:
                 try:
@@ -1181,109 +2706,228 @@ class ServoControlApp:
                     pass
             
             # Update virtual controller arrow keys (continuous update while keys are held)
-            selection = self.controller_var.get()
-            if selection and selection.startswith("V:"):
+            index = self.selected_controller
+            wheel_angle = None
+            if index == -1:
                 vc = self.controller_manager.virtual_controller
                 # Apply arrow key input continuously with adjustable sensitivity
                 vc.update_arrow_keys(vc.arrow_keys['left'], vc.arrow_keys['right'], 
                                     vc.arrow_keys['up'], vc.arrow_keys['down'])
-                
-                # Store wheel angle for batched UI update
-                self.pending_ui_updates['wheel_widget'] = vc.wheel_angle
+                wheel_angle = vc.wheel_angle
+            
+            # Clock sync ping (when due) before this tick's commands, so it doesn't queue behind them
+            self.arduino_manager.sync_clock()
             
             # Process mappings and send to Arduino (always do this - it's critical)
-            self.process_mappings()
+            mapping_start = time.perf_counter()
+            mapping_values = self.process_mappings()
+            self.mapping_stats.add(time.perf_counter() - mapping_start)
+            # Numbered marker after this tick's commands: the board's reply shows when they arrived
+            self.arduino_manager.end_frame()
             
-            # Read Arduino responses (non-blocking)
-            if self.arduino_manager.connected:
-                responses = self.arduino_manager.read_responses()
+            # Next-profile button (the Tk thread makes the switch)
+            button = self.profile_switch_button
+            if button is not None:
+                self.check_profile_button(button)
             
-            # Throttle UI updates to prevent freezing
-            self.ui_update_counter += 1
-            if self.ui_update_counter >= self.ui_update_interval:
-                self.ui_update_counter = 0
-                
-                # Batch all UI updates into a single after() call to prevent queue buildup
-                self.root.after_idle(self._batch_ui_updates)
+            # Record this tick's inputs and commands (only packs into memory - never waits on disk)
+            recorder = self.session_recorder
+            if recorder is not None:
+                timestamp = time.perf_counter_ns()
+                for controller, state in self.tick_states.items():
+                    recorder.record_input(timestamp, controller, state)
+                recorder.record_commands(timestamp, mapping_values, self.commanded_pulses)
+            
+            # Read Arduino responses (non-blocking), then heartbeat / failsafe config and the silent-board check
+            arduino = self.arduino_manager
+            if arduino.connected:
+                responses = arduino.read_responses()
+                if arduino.resync_needed:
+                    # New connection or the board reset: every servo's position right away, not just the mapped ones
+                    arduino.resend_state(self.commanded_pulses)
+                arduino.keep_alive()
             
-            time.sleep(0.05)  # ~20Hz update rate for input polling
+            # Record telemetry for the plotted servo
+            servo_id = self.telemetry_servo
+            if servo_id in mapping_values:
+                value = mapping_values[servo_id]
+                self.telemetry_history.append(
+                    time.perf_counter(),
+                    (value + 1.0) * 90,  # Input scaled to the 0-180 angle range
+                    pulse_to_angle(self.commanded_pulses.get(servo_id, math.nan)),
+                    pulse_to_angle(self.arduino_manager.acked_pulses.get(servo_id, math.nan)))
+            
+            # Publish the latest state for the UI thread (single reference swap, no lock).
+            # The UI refresh loop picks up whatever is newest, so nothing ever queues up.
+            self.publish_seq += 1
+            # The selected controller was usually already read by process_mappings this tick
+            state = self.tick_states.get(index)
+            if state is None and index is not None:
+                state = self.controller_manager.get_controller_state(index)
+            self.published_state = {
+                'seq': self.publish_seq,
+                'controller': index,
+                # A copy: the live buffers are overwritten by the next tick while the UI is still reading them
+                'state': state.copy() if state is not None else None,
+                'wheel_angle': wheel_angle,
+                'mapping_values': mapping_values
+            }
+            
+            # Same tick to the shared-memory ring (plain stores into the mapped block, never waits on readers)
+            shared = self.shared_telemetry
+            if shared is not None:
+                axes_controller = index
+                if state is None and self.tick_states:
+                    # Nothing selected in the UI - use the first controller the mappings read
+                    axes_controller, state = next(iter(self.tick_states.items()))
+                shared.publish(self.publish_seq, axes_controller, state.axes if state else None,
+                               mapping_values, self.commanded_pulses)
+            
+            # ~20Hz update rate for input polling. Sleep to the next deadline rather than for a
+            # fixed time, so the tick's own work doesn't stretch the period
+            next_tick += self.poll_interval
+            now = time.perf_counter()
+            if now - next_tick > self.poll_interval:
+                next_tick = now  # Missed whole ticks (e.g. a stalled device): resume from now instead of bursting
+            time.sleep(max(0.0, next_tick - now))
+    
+    def start_ui_refresh(self):
+        """Start the UI refresh loop on the Tk thread"""
+        now = time.perf_counter()
+        self.ui_next_frame = now
+        self.ui_fps_window_start = now
+        self.ui_refresh_loop()
     
-    def _batch_ui_updates(self):
+    def ui_refresh_loop(self):
+        """Redraw from the latest published state at the target frame rate"""
+        if not self.running:
+            return
+        
+        frame_start = time.perf_counter()
+        pending = self.pending_profile
+        if pending is not None:
+            self.pending_profile = None
+            self.switch_profile(pending.name)  # The next-profile button was pressed
+        if self.profile_seq != self.ui_profile_seq:
+            self.sync_profile_ui()
+        snapshot = self.published_state
+        # Only redraw when the polling thread published something new
+        if snapshot is not None and snapshot['seq'] != self.ui_last_seq:
+            self.ui_last_seq = snapshot['seq']
+            self._batch_ui_updates(snapshot)
+            frame_end = time.perf_counter()
+            self.ui_batch_stats.add(frame_end - frame_start)
+            self.ui_batch_histogram.observe(frame_end - frame_start)
+        else:
+            frame_end = time.perf_counter()
+        self.ui_frame_time = frame_end - frame_start
+        
+        if self.perf_hud_visible and frame_end - self.perf_hud_last_update >= self.perf_hud_interval:
+            self.perf_hud_last_update = frame_end
+            self.update_perf_hud(frame_end)
+        
+        # Achieved frame rate, refreshed once per second
+        self.ui_frame_count += 1
+        elapsed = frame_end - self.ui_fps_window_start
+        if elapsed >= 1.0:
+            self.ui_fps = self.ui_frame_count / elapsed
+            self.ui_frame_count = 0
+            self.ui_fps_window_start = frame_end
+            self.ui_perf_label.config(
+                text=f"UI: {self.ui_fps:.1f} fps | frame {self.ui_frame_time * 1000:.2f} ms | skipped {self.ui_frames_skipped}")
+            if self.session_recorder is not None:
+                self.recording_status.config(text=self.session_recorder.get_status())
+        
+        # Schedule the next frame. If we fell behind, skip the missed frames
+        # instead of running them back to back.
+        period = 1.0 / self.ui_target_fps
+        self.ui_next_frame += period
+        if self.ui_next_frame < frame_end:
+            missed = int((frame_end - self.ui_next_frame) / period) + 1
+            self.ui_frames_skipped += missed
+            self.ui_next_frame += missed * period
+        delay_ms = max(1, int((self.ui_next_frame - frame_end) * 1000))
+        self.root.after(delay_ms, self.ui_refresh_loop)
+    
+    def _batch_ui_updates(self, snapshot):
         """Batch all UI updates together to prevent freezing"""
         try:
+            state = snapshot['state']
+            
             # Update stats (only if changed)
-            self.update_stats()
+            self.update_stats(state)
             
             # Update wheel angle display
-            self.update_wheel_angle()
+            self.update_wheel_angle(state, snapshot['wheel_angle'])
             
             # Update visual axis charts
-            self.update_axis_charts()
+            self.update_axis_charts(state)
             
-            # Update wheel widget if needed
-            if self.pending_ui_updates['wheel_widget'] is not None:
-                angle = self.pending_ui_updates['wheel_widget']
-                self.pending_ui_updates['wheel_widget'] = None
+            # Update wheel widget if needed (skip when the angle has not changed)
+            angle = snapshot['wheel_angle']
+            if angle is not None and angle != self.wheel_widget.angle:
                 self.wheel_widget.set_angle(angle)
             
             # Update mapping display values
-            self.update_mapping_values()
+            self.update_mapping_values(snapshot['mapping_values'])
+            
+            # Update mixer output values (only while its tab is showing)
+            if self.mixer_value_items and self.notebook.select() == str(self.mixer_tab):
+                self.update_mixer_values(snapshot['mapping_values'])
+            
+            # Update telemetry plot (only while its tab is showing)
+            if self.notebook.select() == str(self.telemetry_tab):
+                self.telemetry_plot.redraw()
         except Exception as e:
             # Silently handle errors to prevent spam
             pass
     
-    def update_mapping_values(self):
-        """Update only the values in existing mapping tree items (for real-time updates)"""
+    def update_mapping_values(self, mapping_values):
+        """Update only the value cells that changed (for real-time updates)
+        
+        Visible rows are refreshed every frame; off-screen rows are refreshed
+        round-robin with whatever is left of mapping_value_budget.
+        """
         try:
-            # Only update if treeview exists and has items
-            if not hasattr(self, 'mapping_tree'):
+            order = self.mapping_row_order
+            count = len(order)
+            if count == 0:
                 return
             
-            # Update values for existing items (limit to prevent freezing)
-            items = list(self.mapping_tree.get_children())
-            if len(items) > 20:  # If too many items, skip update to prevent freeze
-                return
+            # Rows currently scrolled into view
+            first, last = self.mapping_tree.yview()
+            visible_start = int(first * count)
+            visible_stop = min(count, int(math.ceil(last * count)))
+            servo_ids = order[visible_start:visible_stop][:self.mapping_value_budget]
             
-            for item_id in items:
-                try:
-                    item_values = list(self.mapping_tree.item(item_id, 'values'))
-                    if len(item_values) >= 4:
-                        servo_id = int(item_values[0])
-                        if servo_id in self.mappings:
-                            mapping = self.mappings[servo_id]
-                            # Get current value
-                            value = self.get_mapping_value(mapping)
-                            value_str = f"{value:.2f}" if isinstance(value, float) else str(value)
-                            # Update the value column (index 4)
-                            new_values = list(item_values)
-                            if len(new_values) >= 5:
-                                new_values[4] = value_str
-                            else:
-                                new_values.append(value_str)
-                            self.mapping_tree.item(item_id, values=tuple(new_values))
-                except:
-                    # Skip individual item errors
+            # Spend the rest of the budget on off-screen rows
+            remaining = min(self.mapping_value_budget - len(servo_ids), count - len(servo_ids))
+            while remaining > 0:
+                index = self.mapping_refresh_cursor % count
+                self.mapping_refresh_cursor = index + 1
+                if not visible_start <= index < visible_stop:
+                    servo_ids.append(order[index])
+                remaining -= 1
+            
+            for servo_id in servo_ids:
+                # Value computed by the polling thread this tick
+                value = mapping_values.get(servo_id)
+                if value is None:
                     continue
+                value_str = f"{value:.2f}" if isinstance(value, float) else str(value)
+                if value_str != self.mapping_row_values.get(servo_id):
+                    self.mapping_tree.set(self.mapping_rows[servo_id], "Value", value_str)
+                    self.mapping_row_values[servo_id] = value_str
         except Exception as e:
             # If update fails, don't do full refresh (too expensive)
             pass
     
-    def update_stats(self):
+    def update_stats(self, state):
         """Update input statistics display"""
-        selection = self.controller_var.get()
-        if not selection:
+        if not state:
             return
         
         try:
-            # Handle virtual controller
-            if selection.startswith("V:"):
-                index = -1
-            else:
-                index = int(selection.split(':')[0])
-            
-            state = self.controller_manager.get_controller_state(index)
-            if not state:
-                return
             
             # Build text efficiently
             text = "RACING WHEEL INPUTS:\n"
@@ -1291,7 +2935,7 @@ class ServoControlApp:
             
             # Common racing wheel axes (only show first 4, which are typically steering, throttle, brake, clutch)
             axis_names = ["Steering", "Throttle", "Brake", "Clutch"]
-            for i, value in enumerate(state['axes'][:4]):  # Only show first 4 axes
+            for i, value in enumerate(state.axes[:4]):  # Only show first 4 axes
                 # Apply axis settings (gain and invert) for display
                 raw_value = value
                 if i in self.axis_settings:
@@ -1318,14 +2962,14 @@ class ServoControlApp:
                         text += f"{label:20s}: {value:7.3f} ({percent:5.1f}%)\n"
             
             # Only show active buttons (pressed buttons)
-            active_buttons = [i for i, pressed in enumerate(state['buttons']) if pressed]
+            active_buttons = [i for i, pressed in enumerate(state.buttons) if pressed]
             if active_buttons:
                 text += "\nACTIVE BUTTONS:\n"
                 for i in active_buttons:
                     text += f"  Button {i}\n"
             
             # Only show active hats (non-zero hats)
-            active_hats = [(i, hat) for i, hat in enumerate(state['hats']) if hat[0] != 0 or hat[1] != 0]
+            active_hats = [(i, hat) for i, hat in enumerate(state.hats) if hat[0] != 0 or hat[1] != 0]
             if active_hats:
                 text += "\nACTIVE HATS:\n"
                 for i, hat in active_hats:
@@ -1340,27 +2984,48 @@ class ServoControlApp:
             # Silently fail to prevent error spam
             pass
     
-    def update_axis_charts(self):
+    def create_axis_chart_items(self, chart):
+        """Create the track, bar and center line once (updated later via coords)"""
+        canvas = chart['canvas']
+        chart['track_item'] = canvas.create_rectangle(0, 0, 0, 0, fill="#1a1a1a", outline="#555555", width=1)
+        # Solid color instead of a gradient - cheap to move around every frame
+        chart['bar_item'] = canvas.create_rectangle(0, 0, 0, 0, fill=chart['color1'], outline=chart['color1'],
+                                                    width=0, state='hidden')
+        chart['center_item'] = canvas.create_line(0, 0, 0, 0, fill="#666666", width=2)
+        self.layout_axis_chart(chart)
+    
+    def on_axis_chart_configure(self, chart, event):
+        """Cache canvas size on resize instead of querying it every frame"""
+        if event.width < 10 or event.height < 10:
+            return
+        if event.width == chart['width'] and event.height == chart['height']:
+            return
+        chart['width'] = event.width
+        chart['height'] = event.height
+        self.layout_axis_chart(chart)
+    
+    def layout_axis_chart(self, chart):
+        """Position the static chart items for the cached canvas size"""
+        canvas = chart['canvas']
+        width = chart['width']
+        height = chart['height']
+        margin = 3
+        center_x = width / 2
+        canvas.coords(chart['track_item'], margin, margin, width - margin, height - margin)
+        canvas.coords(chart['center_item'], center_x, margin, center_x, height - margin)
+        # Force the bar to be re-placed on the next update
+        chart['bar_px'] = None
+    
+    def update_axis_charts(self, state):
         """Update visual gradient bar chart sliders for each axis"""
         try:
-            selection = self.controller_var.get()
-            if not selection:
-                return
-            
-            # Handle virtual controller
-            if selection.startswith("V:"):
-                index = -1
-            else:
-                index = int(selection.split(':')[0])
-            
-            state = self.controller_manager.get_controller_state(index)
-            if not state or not state['axes']:
+            if not state or not state.axes:
                 return
             
-            # Update each axis chart (limit operations to prevent freezing)
+            margin = 3
             for i, chart in enumerate(self.axis_charts):
-                if i < len(state['axes']):
-                    value = state['axes'][i]
+                if i < len(state.axes):
+                    value = state.axes[i]
                     # Apply axis settings (gain and invert) for display
                     if i in self.axis_settings:
                         settings = self.axis_settings[i]
@@ -1370,141 +3035,144 @@ class ServoControlApp:
                         # Clamp to valid range after gain
                         value = max(-1.0, min(1.0, value))
                     canvas = chart['canvas']
-                    color1 = chart['color1']
-                    color2 = chart['color2']
-                    value_label = chart['value_label']
-                    
-                    # Get canvas dimensions (cache if possible to avoid repeated calls)
-                    try:
-                        canvas.update_idletasks()
-                        width = canvas.winfo_width()
-                        height = canvas.winfo_height()
-                        if width < 10:
-                            width = 250  # Default width
-                        if height < 10:
-                            height = 30  # Default height
-                    except:
-                        # If canvas not ready, skip this update
-                        continue
-                    
-                    # Clear canvas (only if needed - check if value changed significantly)
-                    canvas.delete("all")
                     
-                    # Draw background track
-                    margin = 3
-                    track_y = height // 2
-                    track_height = height - margin * 2
-                    canvas.create_rectangle(margin, margin, width - margin, height - margin, 
-                                          fill="#1a1a1a", outline="#555555", width=1)
-                    
-                    # Calculate bar position (-1.0 to 1.0 maps to left to right)
-                    center_x = width / 2
-                    bar_max_width = (width / 2) - margin * 2
-                    bar_width = abs(value) * bar_max_width
-                    
-                    if abs(value) > 0.001:  # Only draw if significant
-                        # Simplified drawing - use solid color instead of expensive gradient
-                        # This prevents freezing during rapid updates
-                        if value >= 0:
-                            # Positive value - bar extends right from center
-                            bar_x1 = center_x
-                            bar_x2 = center_x + bar_width
-                            # Use color1 (lighter) for simplicity and performance
-                            canvas.create_rectangle(bar_x1, margin, bar_x2, height - margin,
-                                                  fill=color1, outline=color1, width=0)
-                        else:
-                            # Negative value - bar extends left from center
-                            bar_x1 = center_x - bar_width
-                            bar_x2 = center_x
-                            # Use color1 (lighter) for simplicity and performance
-                            canvas.create_rectangle(bar_x1, margin, bar_x2, height - margin,
-                                                  fill=color1, outline=color1, width=0)
+                    # Calculate bar position in whole pixels (-1.0 to 1.0 maps to left to right)
+                    width = chart['width']
+                    center_x = int(width / 2)
+                    bar_width = int(round(abs(value) * ((width / 2) - margin * 2)))
+                    if value >= 0:
+                        bar_px = (center_x, center_x + bar_width)
+                    else:
+                        bar_px = (center_x - bar_width, center_x)
                     
-                    # Draw center line
-                    canvas.create_line(center_x, margin, center_x, height - margin,
-                                     fill="#666666", width=2)
+                    # Only touch the canvas when the bar moved by at least a pixel
+                    if bar_px != chart['bar_px']:
+                        if chart['bar_px'] is None or (bar_width == 0) != (chart['bar_px'][0] == chart['bar_px'][1]):
+                            canvas.itemconfig(chart['bar_item'], state='hidden' if bar_width == 0 else 'normal')
+                        canvas.coords(chart['bar_item'], bar_px[0], margin, bar_px[1], chart['height'] - margin)
+                        chart['bar_px'] = bar_px
                     
                     # Update value label
                     if i == 0:  # Steering - show degrees
-                        angle = value * 180
-                        value_label.config(text=f"{angle:+6.1f}°")
+                        label_text = f"{value * 180:+6.1f}°"
                     else:  # Others - show percentage
-                        percent = (value + 1.0) * 50
-                        value_label.config(text=f"{percent:5.1f}%")
+                        label_text = f"{(value + 1.0) * 50:5.1f}%"
+                    if label_text != chart['label_text']:
+                        chart['value_label'].config(text=label_text)
+                        chart['label_text'] = label_text
         except Exception as e:
             # Silently fail to prevent error spam
             pass
     
-    def update_wheel_angle(self):
+    def update_wheel_angle(self, state, virtual_wheel_angle=None):
         """Update wheel rotation angle display"""
-        selection = self.controller_var.get()
-        if not selection:
+        if not state or not state.axes:
             return
         
         try:
-            # Handle virtual controller
-            if selection.startswith("V:"):
-                index = -1
-            else:
-                index = int(selection.split(':')[0])
-            
-            state = self.controller_manager.get_controller_state(index)
-            if not state or not state['axes']:
-                return
-            
-            # Use first axis as steering wheel (typically axis 0)
-            wheel_value = state['axes'][0]
             # For virtual controller, show actual continuous angle
-            if selection.startswith("V:"):
-                vc = self.controller_manager.virtual_controller
-                rotations = int(vc.wheel_angle / 360)
-                remainder = vc.wheel_angle % 360
+            if virtual_wheel_angle is not None:
+                rotations = int(virtual_wheel_angle / 360)
+                remainder = virtual_wheel_angle % 360
                 if remainder > 180:
                     remainder -= 360
                 if rotations != 0:
-                    self.wheel_angle_var.set(f"{remainder:+.1f}° ({rotations:+d} rot)")
+                    text = f"{remainder:+.1f}° ({rotations:+d} rot)"
                 else:
-                    self.wheel_angle_var.set(f"{remainder:+.1f}°")
+                    text = f"{remainder:+.1f}°"
             else:
+                # Use first axis as steering wheel (typically axis 0)
                 # Convert from -1.0 to 1.0 range to degrees (-180 to 180)
-                angle = wheel_value * 180
-                self.wheel_angle_var.set(f"{angle:+.1f}°")
+                angle = state.axes[0] * 180
+                text = f"{angle:+.1f}°"
+            if text != self.wheel_angle_var.get():
+                self.wheel_angle_var.set(text)
         except:
             pass
     
     def process_mappings(self):
-        """Process all mappings and send commands to Arduino"""
+        """Process all mappings and send commands to Arduino (returns {servo_id: input value})"""
+        values = {}
+        states = self.tick_states
+        states.clear()
+        clock = time.perf_counter
+        # One consistent snapshot for the whole tick - edits publish a new table instead of changing this one
+        table = self.mapping_table
+        mixer = table.mixer
+        commanded = self.commanded_pulses
+        send_pulse = self.arduino_manager.send_servo_pulse
         try:
-            for servo_id, mapping in self.mappings.items():
-                value = self.get_mapping_value(mapping)
+            # Read every referenced controller once into the input vector
+            start = clock()
+            inputs = table.inputs.read(self.controller_manager, states)
+            self.input_histogram.observe(clock() - start)
+            
+            for servo_id, slot, kind, lut in table.mappings:
+                start = clock()
+                value = values[servo_id] = inputs[slot]
                 
-                # Convert value to servo angle (0-180)
-                if mapping['input_type'] == 'axis':
-                    # Map from -1.0 to 1.0 to 0-180
-                    angle = int((value + 1.0) * 90)  # -1 -> 0, 0 -> 90, 1 -> 180
-                elif mapping['input_type'] == 'button':
-                    # Button: 0 or 90 degrees (or could be 0/180)
-                    angle = 90 if value > 0 else 0
-                elif mapping['input_type'] == 'hat':
-                    # Hat: map -1/0/1 to 0/90/180
-                    angle = int((value + 1.0) * 90)
+                # Convert value to a servo position (-1.0 to 1.0)
+                if kind == AXIS or kind == HAT:
+                    # Axis -1.0 to 1.0, hat -1/0/1 -> full travel
+                    position = -1.0 if value < -1.0 else (1.0 if value > 1.0 else value)
+                elif kind == BUTTON:
+                    # Button: center when pressed, min endpoint when released
+                    position = 0.0 if value > 0 else -1.0
                 else:
-                    angle = 90  # Default center position
+                    position = 0.0  # Default center position
                 
-                # Clamp angle
-                angle = max(0, min(180, angle))
+                # One table lookup applies the servo's endpoints, trim and direction
+                pulse = lut[int((position + 1.0) * LUT_HALF)]
+                self.mapping_histogram.observe(clock() - start)
                 
                 # Send to Arduino (non-blocking, handles errors internally)
-                self.arduino_manager.send_servo_command(servo_id, angle)
+                commanded[servo_id] = pulse
+                send_pulse(servo_id, pulse)
+            
+            if mixer.rows:
+                # Gather the mixer's inputs from the input vector, then evaluate every mixed servo in one pass
+                start = clock()
+                mixer.values[:] = map(inputs.__getitem__, table.mixer_slots)
+                mixer.evaluate(values)
+                self.mapping_histogram.observe(clock() - start)
+                
+                # Mixer outputs are already clamped to -1.0 to 1.0
+                for servo_id, lut in zip(mixer.servo_ids, table.mixer_tables):
+                    pulse = lut[int((values[servo_id] + 1.0) * LUT_HALF)]
+                    commanded[servo_id] = pulse
+                    send_pulse(servo_id, pulse)
         except Exception as e:
             # Silently handle errors to prevent freezing
             pass
+        return values
+    
+    def device_read_histogram(self, controller):
+        """Read-time histogram for one controller (stage device_read_<index>, device_read_virtual or _game)"""
+        label = {-1: 'virtual', GAME_TELEMETRY_CONTROLLER: 'game'}.get(controller, controller)
+        return self.metrics.histogram(f"device_read_{label}")
     
     def on_closing(self):
         """Clean up on window close"""
         self.running = False
-        if self.arduino_manager.connected:
-            self.arduino_manager.disconnect()
+        if self.session_recorder is not None:
+            recorder = self.session_recorder
+            self.session_recorder = None
+            recorder.stop()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+        if self.shared_telemetry is not None:
+            shared = self.shared_telemetry
+            self.shared_telemetry = None
+            if self.poll_thread:
+                self.poll_thread.join(timeout=1)  # Let an in-flight publish finish before unmapping
+            shared.close()
+        self.port_watcher.stop()
+        self.controller_manager.game_telemetry.stop()
+        self.connection.stop()
+        if self.active_profile.name in self.profile_store.names():
+            self.save_profile_settings()  # Start with the same profile next time
         self.root.destroy()
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+"""
+Compiled mapping table for the RC Servo Racing Sim Controller
+
+The polling thread never reads the editable configuration (the mappings dict,
+the axis settings, the mixer's input and output lists, the calibration dict).
+Instead, every change - adding or removing a mapping, an axis gain / invert
+edit, a mixer edit, a calibration change, a profile switch - builds a new
+MappingTable from the configuration on the Tk thread, the only thread that
+edits it (so a table is never built from dicts that are changing under it),
+and publishes it with one assignment:
+
+    app.mapping_table = MappingTable(...)
+
+process_mappings() reads app.mapping_table once at the start of a tick and
+uses only that snapshot for the whole tick. A table is never modified after
+it is built, so the polling thread needs no lock, and an edit made halfway
+through a tick takes effect on the next one instead of breaking this one
+(read-copy-update: the old table stays valid for as long as a tick holds it).
+"""
+
+from input_plan import InputPlan, INPUT_KINDS
+
+
+class MappingTable:
+    """Immutable snapshot of the mappings, axis settings, mixer and calibration, ready to evaluate"""
+    __slots__ = ('inputs', 'mappings', 'mixer', 'mixer_slots', 'mixer_tables', 'failsafe')
+
+    def __init__(self, mappings, axis_settings, mixer, calibration, default_calibration, read_histogram):
+        """mappings: {servo_id: mapping}; axis_settings: {axis_id: {'gain', 'invert'}};
+        mixer: the CompiledMixer to use;
+        calibration: {servo_id: ServoCalibration} (others use default_calibration);
+        read_histogram(controller) -> Histogram for that controller's read time"""
+        mixed = mixer.servo_set
+        # Mixed servos are left to the mixer
+        simple = [(servo_id, mapping) for servo_id, mapping in mappings.items() if servo_id not in mixed]
+        # Mixer inputs are only read if some servo is mixed
+        mixer_sources = mixer.inputs if mixer.rows else ()
+        self.inputs = InputPlan([mapping for _, mapping in simple] + list(mixer_sources), axis_settings,
+                                read_histogram)
+        slots = self.inputs.slots
+
+        def calibration_for(servo_id):
+            return calibration.get(servo_id, default_calibration)
+
+        def table_for(servo_id):
+            return calibration_for(servo_id).table
+
+        # (servo_id, input vector slot, input kind, pulse lookup table) per simple mapping, in mapping order
+        self.mappings = tuple((servo_id, slots[index], INPUT_KINDS.get(mapping['input_type'], -1), table_for(servo_id))
+                              for index, (servo_id, mapping) in enumerate(simple))
+        self.mixer = mixer
+        self.mixer_slots = slots[len(simple):]  # Input vector slot of each mixer input
+        self.mixer_tables = tuple(table_for(servo_id) for servo_id in mixer.servo_ids)  # Aligned with mixer.servo_ids
+        # (servo_id, failsafe pulse width) for every servo the table drives, for the firmware's failsafe
+        self.failsafe = tuple((servo_id, calibration_for(servo_id).failsafe_pulse())
+                              for servo_id in sorted({servo_id for servo_id, _ in simple} | mixed))
@@ -0,0 +1,198 @@
+"""
+Mixer matrix for the RC Servo Racing Sim Controller
+
+The simple servo mappings drive each servo from exactly one input. The mixer
+drives a servo from a weighted sum of any number of inputs plus an offset:
+
+    servo value = clamp(offset + sum(weight[i] * input[i]), -1.0, 1.0)
+
+which covers differential steering, throttle/brake mixed into one ESC channel,
+one axis driving several servos with different trims, and so on. Values use
+the same -1.0 to 1.0 range as axes and are turned into angles the same way
+(-1 -> 0°, 0 -> 90°, 1 -> 180°).
+
+The matrix is sparse: each output row only stores the inputs it uses, and
+rows that use every input are evaluated as a plain dot product with the whole
+input vector. A fully dense 64 x 64 matrix is 4096 multiply-adds per tick,
+done inside sum()/map() rather than a Python loop. Edits build a new
+CompiledMixer and swap it in with one assignment, so the polling thread
+always evaluates a consistent matrix without locking.
+
+Import/export format (JSON):
+
+    {
+      "inputs": [
+        {"controller": -1, "input_type": "axis", "input_id": 0},
+        {"controller": -1, "input_type": "axis", "input_id": 1}
+      ],
+      "outputs": [
+        {"servo": 0, "offset": 0.0, "weights": {"0": 1.0, "1": 0.5}},
+        {"servo": 1, "offset": 0.0, "weights": {"0": 1.0, "1": -0.5}}
+      ]
+    }
+
+"weights" maps an index into "inputs" to its weight.
+"""
+
+import json
+from operator import mul
+
+MAX_INPUTS = 64
+MAX_OUTPUTS = 64
+INPUT_TYPES = ('axis', 'button', 'hat')
+
+
+class CompiledMixer:
+    """Immutable, evaluation-ready form of a MixerMatrix"""
+    __slots__ = ('inputs', 'rows', 'servo_ids', 'servo_set', 'values')
+
+    def __init__(self, inputs, rows):
+        self.inputs = tuple(inputs)  # Input source dicts, in input vector order
+        # (servo_id, offset, input indexes or None if the row uses every input in order, weights) per output
+        self.rows = tuple(rows)
+        self.servo_ids = tuple(row[0] for row in self.rows)
+        self.servo_set = frozenset(self.servo_ids)
+        # Input vector, overwritten in place every tick (a list: reading floats back
+        # out of it is cheaper than out of an array)
+        self.values = [0.0] * len(self.inputs)
+
+    def evaluate(self, out):
+        """Evaluate every output from self.values into out ({servo_id: value})"""
+        values = self.values
+        get_input = values.__getitem__
+        for servo_id, offset, columns, weights in self.rows:
+            if columns is None:
+                value = offset + sum(map(mul, weights, values))
+            else:
+                value = offset + sum(map(mul, weights, map(get_input, columns)))
+            out[servo_id] = -1.0 if value < -1.0 else (1.0 if value > 1.0 else value)
+        return out
+
+
+class MixerMatrix:
+    """Editable mixer: input sources plus a sparse weight matrix and per-output offsets"""
+    def __init__(self):
+        self.inputs = []  # [{'controller': index, 'input_type': 'axis/button/hat', 'input_id': id}]
+        self.outputs = {}  # {servo_id: {'offset': float, 'weights': {input index: weight}}}
+        self.compiled = CompiledMixer((), ())
+
+    def compile(self):
+        """Rebuild the evaluation form and publish it (single reference swap)"""
+        rows = []
+        input_count = len(self.inputs)
+        for servo_id in sorted(self.outputs):
+            output = self.outputs[servo_id]
+            terms = sorted((index, weight) for index, weight in output['weights'].items() if weight != 0)
+            columns = tuple(index for index, _ in terms)
+            if input_count and columns == tuple(range(input_count)):
+                columns = None  # Dense row
+            rows.append((servo_id, float(output['offset']), columns, tuple(float(weight) for _, weight in terms)))
+        self.compiled = CompiledMixer((dict(source) for source in self.inputs), rows)
+
+    # ---- editing ----
+
+    def add_input(self, controller, input_type, input_id):
+        """Add an input source (or find the existing one); returns its index"""
+        if input_type not in INPUT_TYPES:
+            raise ValueError(f"Unknown input type: {input_type}")
+        source = {'controller': int(controller), 'input_type': input_type, 'input_id': int(input_id)}
+        if source in self.inputs:
+            return self.inputs.index(source)
+        if len(self.inputs) >= MAX_INPUTS:
+            raise ValueError(f"The mixer supports at most {MAX_INPUTS} inputs")
+        self.inputs.append(source)
+        self.compile()
+        return len(self.inputs) - 1
+
+    def remove_input(self, index):
+        """Remove an input source and every weight that uses it"""
+        if not 0 <= index < len(self.inputs):
+            raise ValueError(f"No mixer input {index}")
+        del self.inputs[index]
+        for output in self.outputs.values():
+            output['weights'] = {(i if i < index else i - 1): weight
+                                 for i, weight in output['weights'].items() if i != index}
+        self.compile()
+
+    def get_output(self, servo_id):
+        """Get (creating if needed) the row for a servo"""
+        if servo_id not in self.outputs:
+            if len(self.outputs) >= MAX_OUTPUTS:
+                raise ValueError(f"The mixer supports at most {MAX_OUTPUTS} outputs")
+            self.outputs[servo_id] = {'offset': 0.0, 'weights': {}}
+        return self.outputs[servo_id]
+
+    def set_weight(self, servo_id, input_index, weight):
+        """Set how much an input contributes to a servo (0 removes the term)"""
+        if not 0 <= input_index < len(self.inputs):
+            raise ValueError(f"No mixer input {input_index}")
+        weights = self.get_output(servo_id)['weights']
+        if weight == 0:
+            weights.pop(input_index, None)
+        else:
+            weights[input_index] = float(weight)
+        self.compile()
+
+    def set_offset(self, servo_id, offset):
+        """Set a servo's constant offset (trim), in the -1.0 to 1.0 value range"""
+        self.get_output(servo_id)['offset'] = float(offset)
+        self.compile()
+
+    def remove_output(self, servo_id):
+        """Stop mixing a servo"""
+        if self.outputs.pop(servo_id, None) is not None:
+            self.compile()
+
+    def clear(self):
+        """Remove all inputs and outputs"""
+        self.inputs = []
+        self.outputs = {}
+        self.compile()
+
+    # ---- import / export ----
+
+    def to_dict(self):
+        """Plain data for JSON (see the module docstring for the format)"""
+        return {
+            'inputs': [dict(source) for source in self.inputs],
+            'outputs': [{'servo': servo_id,
+                         'offset': output['offset'],
+                         'weights': {str(index): weight for index, weight in sorted(output['weights'].items())}}
+                        for servo_id, output in sorted(self.outputs.items())]
+        }
+
+    def load_dict(self, data):
+        """Replace the matrix with data from to_dict() (raises ValueError if it is invalid)"""
+        try:
+            inputs = []
+            for source in data.get('inputs', []):
+                if source['input_type'] not in INPUT_TYPES:
+                    raise ValueError(f"Unknown input type: {source['input_type']}")
+                inputs.append({'controller': int(source['controller']),
+                               'input_type': source['input_type'],
+                               'input_id': int(source['input_id'])})
+            outputs = {}
+            for output in data.get('outputs', []):
+                weights = {int(index): float(weight) for index, weight in output.get('weights', {}).items()}
+                for index in weights:
+                    if not 0 <= index < len(inputs):
+                        raise ValueError(f"Servo {output['servo']} uses missing input {index}")
+                outputs[int(output['servo'])] = {'offset': float(output.get('offset', 0.0)), 'weights': weights}
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid mixer data: {e}")
+        if len(inputs) > MAX_INPUTS or len(outputs) > MAX_OUTPUTS:
+            raise ValueError(f"The mixer supports at most {MAX_INPUTS} inputs and {MAX_OUTPUTS} outputs")
+        self.inputs = inputs
+        self.outputs = outputs
+        self.compile()
+
+    def export_file(self, path):
+        """Save the matrix as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    def import_file(self, path):
+        """Load the matrix from a JSON file"""
+        with open(path, encoding='utf-8') as f:
+            self.load_dict(json.load(f))
@@ -0,0 +1,158 @@
+"""
+Background serial port discovery for the RC Servo Racing Sim Controller
+
+serial.tools.list_ports.comports() can take hundreds of milliseconds on a
+busy system, too long for the Tk thread. PortWatcher runs it on its own
+thread, and only when something may have changed:
+
+- Linux / macOS: device nodes are created and removed in /dev (and
+  /dev/serial/by-id with udev), which changes the directory's modification
+  time. One os.stat() per check is all it costs while nothing is plugged in
+  or out. Timestamps are coarse, so a node added and removed within the same
+  clock tick could leave the time unchanged; for a second after any change
+  the watcher therefore enumerates on every check.
+- Windows: the registry key HARDWARE\\DEVICEMAP\\SERIALCOMM lists the COM
+  ports that exist right now; reading it is just as cheap.
+- Anywhere else the full enumeration simply runs every check.
+
+The result is cached as `ports`, a tuple of dicts with the device metadata
+(description, USB VID/PID, serial number), replaced in one assignment and
+counted by `seq` so the UI can poll it for changes. refresh() asks for a full
+enumeration right away (the Refresh button) without waiting for it.
+"""
+
+import os
+import threading
+import time
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+try:
+    import serial.tools.list_ports
+except ImportError:
+    serial = None
+
+CHECK_INTERVAL = 0.5  # Seconds between change checks
+SETTLE_NS = 1_000_000_000  # Directory times this recent can't be trusted yet (nanoseconds)
+WATCHED_DIRS = ("/dev", "/dev/serial/by-id")
+SERIALCOMM_KEY = r"HARDWARE\DEVICEMAP\SERIALCOMM"
+
+
+def list_ports():
+    """Full enumeration: [{'device', 'description', 'vid', 'pid', 'serial_number'}] sorted by device"""
+    if serial is None:
+        return []
+    return sorted(({'device': port.device,
+                    'description': port.description if port.description != 'n/a' else "",
+                    'vid': port.vid,
+                    'pid': port.pid,
+                    'serial_number': port.serial_number}
+                   for port in serial.tools.list_ports.comports()), key=lambda port: port['device'])
+
+
+def change_signature():
+    """Something cheap that changes whenever ports come or go (None = can't tell, always enumerate)"""
+    if winreg is not None:
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, SERIALCOMM_KEY) as key:
+                values = []
+                index = 0
+                while True:
+                    try:
+                        values.append(winreg.EnumValue(key, index)[:2])
+                    except OSError:
+                        break
+                    index += 1
+            return tuple(sorted(values))
+        except OSError:
+            return ()  # No key = no COM ports
+    signature = []
+    now = time.time_ns()
+    for path in WATCHED_DIRS:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is not None and now - mtime < SETTLE_NS:
+            return None  # Changed just now - it may change again within the same timestamp
+        signature.append(mtime)
+    if signature[0] is None:
+        return None
+    return tuple(signature)
+
+
+class PortWatcher:
+    """Keeps a cached, up-to-date list of serial ports on a background thread"""
+    def __init__(self, interval=CHECK_INTERVAL):
+        self.interval = interval
+        self.ports = ()  # Port dicts (see list_ports), replaced - never edited - on every change
+        self.seq = 0  # Bumped whenever `ports` changes
+        self.enumerations = 0  # Full enumerations run (the cheap check skipped the rest)
+        self.known_baudrates = {}  # {device: baud rate that last worked}
+        self.listeners = []  # Called as listener(ports) from the watcher thread after a change
+        self.wake = threading.Event()
+        self.force = False
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.force = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+    def refresh(self):
+        """Enumerate now instead of waiting for a change (returns immediately)"""
+        self.force = True
+        self.wake.set()
+
+    def run(self):
+        last_signature = None
+        while self.running:
+            signature = change_signature()
+            if self.force or signature is None or signature != last_signature:
+                self.force = False
+                last_signature = signature
+                self.update(list_ports())
+            self.wake.wait(self.interval)
+            self.wake.clear()
+
+    def update(self, ports):
+        """Publish a fresh enumeration if it differs from the cached one"""
+        self.enumerations += 1
+        ports = tuple(ports)
+        if ports == self.ports:
+            return
+        self.ports = ports
+        self.seq += 1
+        for listener in self.listeners:
+            listener(ports)
+
+    def devices(self):
+        return [port['device'] for port in self.ports]
+
+    def remember_baudrate(self, device, baudrate):
+        if device:
+            self.known_baudrates[device] = baudrate
+
+    def describe(self, device):
+        """One line about a port for the UI: description, VID:PID and the last baud rate that worked"""
+        parts = []
+        for port in self.ports:
+            if port['device'] == device:
+                if port['description']:
+                    parts.append(port['description'])
+                if port['vid'] is not None:
+                    parts.append(f"{port['vid']:04X}:{port['pid'] or 0:04X}")
+                break
+        baudrate = self.known_baudrates.get(device)
+        if baudrate:
+            parts.append(f"last {baudrate} baud")
+        return " · ".join(parts)
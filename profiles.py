@@ -0,0 +1,172 @@
+"""
+Rig profiles for the RC Servo Racing Sim Controller
+
+A profile is everything needed to drive one rig: servo mappings, axis
+settings (gain / invert), servo calibration, the mixer, the on-screen wheel
+settings and the serial link (port, baud rate, failsafe timeout). Profiles are stored as one JSON file
+each in the profiles folder:
+
+    profiles/<name>.json
+    {
+      "version": 1,
+      "mappings": {"0": {"controller": -1, "input_type": "axis", "input_id": 0}},
+      "axis_settings": {"0": {"gain": 1.0, "invert": false}},
+      "calibration": {"0": {"min_us": 1000, "center_us": 1500, "max_us": 2000, "trim_us": 0, "reverse": false,
+                            "failsafe_us": null}},
+      "mixer": {"inputs": [], "outputs": []},
+      "virtual_wheel": {"sensitivity": 0.02, "auto_center": 0.95, "max_angle": 180.0, "max_throttle_angle": 180.0},
+      "serial": {"port": "COM3", "baudrate": 115200, "failsafe_timeout_ms": 250}
+    }
+
+plus profiles/profiles.json with the profile that was active last and the
+controller button that switches to the next profile.
+
+Every profile is loaded and compiled (calibration tables built, mixer
+compiled) when the app starts, so switching only builds the new profile's
+mapping table. The switch is made on the Tk thread, like every other edit
+(the next-profile button only asks for it); the polling thread picks up the
+new table at the start of its next tick.
+"""
+
+import json
+import os
+import re
+
+from calibration import ServoCalibration
+from mixer import MixerMatrix
+
+FORMAT_VERSION = 1
+SETTINGS_FILE = "profiles.json"
+DEFAULT_PROFILE = "Default"
+DEFAULT_WHEEL = {'sensitivity': 0.02, 'auto_center': 0.95, 'max_angle': 180.0, 'max_throttle_angle': 180.0}
+AXIS_COUNT = 16  # Axes with gain / invert settings
+DEFAULT_FAILSAFE_TIMEOUT_MS = 250  # Silence after which the board goes to failsafe (0 = off)
+
+NAME_PATTERN = re.compile(r"^[\w][\w \-.]{0,63}$")
+
+
+def check_name(name):
+    """Raise ValueError unless name can be used as a profile (file) name"""
+    if not NAME_PATTERN.match(name) or name.endswith('.') or name + ".json" == SETTINGS_FILE:
+        raise ValueError(f"Invalid profile name: {name!r} (letters, digits, spaces, '-', '_' and '.')")
+
+
+class Profile:
+    """One rig configuration in its runtime form
+
+    The dicts and objects here are the ones the app uses while the profile is
+    active, so edits made in the UI go straight into the profile.
+    """
+    def __init__(self, name):
+        check_name(name)
+        self.name = name
+        self.mappings = {}  # {servo_id: {'controller', 'input_type', 'input_id'}}
+        self.axis_settings = {i: {'gain': 1.0, 'invert': False} for i in range(AXIS_COUNT)}
+        self.servo_calibration = {}  # {servo_id: ServoCalibration}
+        self.mixer = MixerMatrix()
+        self.virtual_wheel = dict(DEFAULT_WHEEL)
+        self.serial = {'port': None, 'baudrate': 9600, 'failsafe_timeout_ms': DEFAULT_FAILSAFE_TIMEOUT_MS}
+
+    @classmethod
+    def from_dict(cls, name, data):
+        """Build (and compile) a profile from its JSON data (raises ValueError if invalid)"""
+        profile = cls(name)
+        try:
+            for servo_id, mapping in data.get('mappings', {}).items():
+                profile.mappings[int(servo_id)] = {'controller': int(mapping['controller']),
+                                                   'input_type': mapping['input_type'],
+                                                   'input_id': int(mapping['input_id'])}
+            for axis_id, settings in data.get('axis_settings', {}).items():
+                profile.axis_settings[int(axis_id)] = {'gain': float(settings.get('gain', 1.0)),
+                                                       'invert': bool(settings.get('invert', False))}
+            for servo_id, calibration in data.get('calibration', {}).items():
+                profile.servo_calibration[int(servo_id)] = ServoCalibration.from_dict(calibration)
+            profile.mixer.load_dict(data.get('mixer', {}))
+            for key, value in data.get('virtual_wheel', {}).items():
+                if key in DEFAULT_WHEEL:
+                    profile.virtual_wheel[key] = float(value)
+            serial = data.get('serial', {})
+            profile.serial = {'port': serial.get('port') or None, 'baudrate': int(serial.get('baudrate', 9600)),
+                              'failsafe_timeout_ms': int(serial.get('failsafe_timeout_ms', DEFAULT_FAILSAFE_TIMEOUT_MS))}
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid profile '{name}': {e}")
+        return profile
+
+    def to_dict(self):
+        """Plain data for JSON (see the module docstring for the format)"""
+        return {
+            'version': FORMAT_VERSION,
+            'mappings': {str(servo_id): dict(mapping) for servo_id, mapping in sorted(self.mappings.items())},
+            'axis_settings': {str(axis_id): dict(settings) for axis_id, settings in sorted(self.axis_settings.items())},
+            'calibration': {str(servo_id): calibration.to_dict()
+                            for servo_id, calibration in sorted(self.servo_calibration.items())},
+            'mixer': self.mixer.to_dict(),
+            'virtual_wheel': dict(self.virtual_wheel),
+            'serial': dict(self.serial)
+        }
+
+
+class ProfileStore:
+    """Reads and writes the profiles folder"""
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, name):
+        return os.path.join(self.directory, name + ".json")
+
+    def names(self):
+        """Names of the saved profiles, sorted"""
+        try:
+            files = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(f[:-5] for f in files if f.endswith(".json") and f != SETTINGS_FILE)
+
+    def load(self, name):
+        """Load and compile one profile"""
+        with open(self.path(name), encoding='utf-8') as f:
+            return Profile.from_dict(name, json.load(f))
+
+    def load_all(self):
+        """{name: Profile} for every saved profile (broken files are reported and skipped)"""
+        profiles = {}
+        for name in self.names():
+            try:
+                profiles[name] = self.load(name)
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Could not load profile '{name}': {e}")
+        return profiles
+
+    def save(self, profile):
+        """Write a profile (replaces the file in one step, so a crash never leaves half a file)"""
+        self.write_json(self.path(profile.name), profile.to_dict())
+
+    def delete(self, name):
+        """Remove a saved profile"""
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def load_settings(self):
+        """{'active': name or None, 'switch_button': {'controller', 'button'} or None}"""
+        settings = {'active': None, 'switch_button': None}
+        try:
+            with open(os.path.join(self.directory, SETTINGS_FILE), encoding='utf-8') as f:
+                settings.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Could not read {SETTINGS_FILE}: {e}")
+        return settings
+
+    def save_settings(self, settings):
+        self.write_json(os.path.join(self.directory, SETTINGS_FILE), settings)
+
+    def write_json(self, path, data):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        os.replace(temp_path, path)
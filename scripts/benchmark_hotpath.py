@@ -0,0 +1,294 @@
+"""
+Microbenchmarks for the functions that run on every polling tick
+
+Everything runs with stubbed devices (fake joystick, fake serial port) and no
+window, so results only depend on the Python code. Each benchmark reports:
+
+- ns/op: best-of-N average time per call
+- B/op:  peak memory allocated during one call (tracemalloc), i.e. the
+         temporary objects the call creates. 0 means allocation-free.
+
+Usage:
+    python scripts/benchmark_hotpath.py                     # run and compare to the baseline
+    python scripts/benchmark_hotpath.py --save-baseline     # update the stored baseline
+    python scripts/benchmark_hotpath.py --filter process_mappings
+    python scripts/benchmark_hotpath.py --save-baseline --baseline before.json   # then, after a change:
+    python scripts/benchmark_hotpath.py --baseline before.json
+
+The baseline lives next to this script (benchmark_hotpath_baseline.json) and is
+committed (re-save it in a change that touches the hot path), so a change that
+makes the hot path slower or allocate more shows up in review. Timings are
+machine dependent: against the committed baseline, ns/op changes are only
+reported, and only extra allocations fail the run. Pass --baseline with a file
+saved on the same machine to fail on ns/op regressions too.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+# Allow running from the scripts folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ServoControlApp, ControllerManager, ArduinoManager, VirtualController
+from calibration import ServoCalibration
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_hotpath_baseline.json")
+
+# Mapping counts: realistic rigs and a stress case
+MAPPING_COUNTS = (4, 16, 256)
+
+# Mixer inputs and outputs (the supported maximum)
+MIXER_SIZE = 64
+
+
+class FakeJoystick:
+    """pygame.joystick.Joystick stand-in with a typical wheel layout"""
+    def __init__(self, axes=6, buttons=24, hats=1):
+        self.axes = [0.1 * i for i in range(axes)]
+        self.buttons = [i % 3 == 0 for i in range(buttons)]
+        self.hats = [(0, 1)] * hats
+
+    def get_name(self):
+        return "Fake Wheel"
+
+    def get_numaxes(self):
+        return len(self.axes)
+
+    def get_numbuttons(self):
+        return len(self.buttons)
+
+    def get_numhats(self):
+        return len(self.hats)
+
+    def get_axis(self, i):
+        return self.axes[i]
+
+    def get_button(self, i):
+        return self.buttons[i]
+
+    def get_hat(self, i):
+        return self.hats[i]
+
+
+class NullSerial:
+    """serial.Serial stand-in that accepts every write and never has replies"""
+    in_waiting = 0
+
+    def write(self, data):
+        return len(data)
+
+    def readline(self):
+        return b""
+
+    def close(self):
+        pass
+
+
+def make_app(mapping_count, controller=-1):
+    """Headless app with a fake joystick, a fake serial port and N axis mappings"""
+    app = ServoControlApp.create_headless()
+    app.controller_manager.set_joysticks([FakeJoystick()])
+    arduino = app.arduino_manager
+    arduino.serial_connection = NullSerial()
+    arduino.connected = True
+    for servo_id in range(mapping_count):
+        app.mappings[servo_id] = {'controller': controller, 'input_type': 'axis', 'input_id': servo_id % 4}
+    app.publish_mappings()
+    return app
+
+
+def make_rig_app(mapping_count):
+    """Headless app with a wheel, a pedal box and a shifter, N mappings spread over all three"""
+    app = make_app(0)
+    app.controller_manager.set_joysticks([FakeJoystick(), FakeJoystick(axes=3, buttons=0, hats=0),
+                                          FakeJoystick(axes=0, buttons=8, hats=1)])
+    for servo_id in range(mapping_count):
+        device = servo_id % 3
+        if device == 2:
+            app.mappings[servo_id] = {'controller': 2, 'input_type': 'button', 'input_id': servo_id % 8}
+        else:
+            app.mappings[servo_id] = {'controller': device, 'input_type': 'axis', 'input_id': servo_id % 3}
+    app.publish_mappings()
+    return app
+
+
+def make_mixer_app(terms_per_servo):
+    """Headless app with MIXER_SIZE mixer inputs and servos, each servo using `terms_per_servo` inputs"""
+    app = make_app(0)
+    app.controller_manager.set_joysticks([FakeJoystick(axes=8) for _ in range(MIXER_SIZE // 8)])
+    mixer = app.mixer
+    for index in range(MIXER_SIZE):
+        mixer.add_input(index // 8, 'axis', index % 8)
+    for servo_id in range(MIXER_SIZE):
+        output = mixer.get_output(servo_id)
+        for term in range(terms_per_servo):
+            output['weights'][(servo_id + term) % MIXER_SIZE] = 1.0 / terms_per_servo
+    mixer.compile()
+    app.publish_mappings()
+    return app
+
+
+def build_benchmarks():
+    """Return [(name, callable)] for every hot-path function"""
+    benchmarks = []
+
+    vc = VirtualController()
+    vc.wheel_angle = 30.0
+    benchmarks.append(("VirtualController.get_state", vc.get_state))
+    benchmarks.append(("VirtualController.update_arrow_keys",
+                       lambda: vc.update_arrow_keys(False, True, False, False)))
+
+    manager = ControllerManager()
+    manager.set_joysticks([FakeJoystick()])
+    benchmarks.append(("ControllerManager.get_controller_state[virtual]",
+                       lambda: manager.get_controller_state(-1)))
+    benchmarks.append(("ControllerManager.get_controller_state[joystick]",
+                       lambda: manager.get_controller_state(0)))
+
+    app = make_app(1)
+    mapping = app.mappings[0]
+    benchmarks.append(("ServoControlApp.get_mapping_value", lambda: app.get_mapping_value(mapping)))
+
+    arduino = ArduinoManager()
+    arduino.serial_connection = NullSerial()
+    arduino.connected = True
+    benchmarks.append(("ArduinoManager.send_servo_command", lambda: arduino.send_servo_command(7, 135)))
+    benchmarks.append(("ArduinoManager.send_servo_pulse", lambda: arduino.send_servo_pulse(7, 1500)))
+    
+    calibration = ServoCalibration(1000, 1500, 2000, trim_us=12, reverse=True)
+    benchmarks.append(("ServoCalibration.pulse", lambda: calibration.pulse(0.25)))
+
+    for count in MAPPING_COUNTS:
+        for controller, label in ((-1, "virtual"), (0, "joystick")):
+            mapped = make_app(count, controller)
+            benchmarks.append((f"ServoControlApp.process_mappings[{count} {label}]", mapped.process_mappings))
+        rig = make_rig_app(count)
+        benchmarks.append((f"ServoControlApp.process_mappings[{count} 3 devices]", rig.process_mappings))
+    
+    # Input stage alone: one read per device, 16 sources
+    rig = make_rig_app(16)
+    plan = rig.mapping_table.inputs
+    benchmarks.append(("InputPlan.read[3 devices]",
+                       lambda: plan.read(rig.controller_manager, rig.tick_states)))
+    
+    # Mixer at its maximum size: 64 inputs x 64 servos, dense and 4 inputs per servo
+    for label, terms in (("dense", MIXER_SIZE), ("sparse", 4)):
+        mixed = make_mixer_app(terms)
+        compiled = mixed.mixer.compiled
+        out = {}
+        benchmarks.append((f"CompiledMixer.evaluate[64x64 {label}]", lambda c=compiled, o=out: c.evaluate(o)))
+        benchmarks.append((f"ServoControlApp.process_mappings[mixer 64x64 {label}]", mixed.process_mappings))
+
+    return benchmarks
+
+
+def time_per_op(func, repeat=5, target=0.2):
+    """Best-of-repeat time per call in nanoseconds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    # Scale up so each repeat takes roughly `target` seconds
+    number = max(number, int(number * target / max(timer.timeit(number), 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e9
+
+
+def bytes_per_op(func, calls=20):
+    """Average peak bytes allocated during one call"""
+    func()  # Warm up caches so one-time allocations are not counted
+    total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            total += max(0, peak - before)
+    finally:
+        tracemalloc.stop()
+    return total / calls
+
+
+def run(name_filter=None):
+    """Run all benchmarks; returns {name: {'ns_per_op', 'bytes_per_op'}}"""
+    results = {}
+    for name, func in build_benchmarks():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = {
+            'ns_per_op': time_per_op(func),
+            'bytes_per_op': bytes_per_op(func)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks")
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this text")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--baseline', help="Baseline saved on this machine to compare against / save to "
+                                            "(ns/op regressions fail the run; default: the committed baseline, "
+                                            "where they are only reported)")
+    parser.add_argument('--max-regression', type=float, default=25.0,
+                        help="Flag ns/op regressions above this percentage (default: 25)")
+    args = parser.parse_args()
+    # Timings from another machine can't fail a run - allocations can
+    check_timing = args.baseline is not None
+    if args.baseline is None:
+        args.baseline = BASELINE_FILE
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    results = run(args.filter)
+
+    regressions = []
+    slower = []  # Slower than the committed baseline - maybe just a different machine
+    print(f"{'benchmark':55s} {'ns/op':>11s} {'B/op':>9s} {'vs baseline':>12s}")
+    for name, result in results.items():
+        change = ""
+        old = baseline.get(name)
+        if old:
+            percent = (result['ns_per_op'] / old['ns_per_op'] - 1.0) * 100
+            change = f"{percent:+11.1f}%"
+            if result['bytes_per_op'] > old['bytes_per_op'] + 64:
+                change += " ! B/op"
+                regressions.append(name)
+            elif percent > args.max_regression:
+                if check_timing:
+                    change += " !"
+                    regressions.append(name)
+                else:
+                    change += " ?"
+                    slower.append(name)
+        print(f"{name:55s} {result['ns_per_op']:11.0f} {result['bytes_per_op']:9.0f} {change}")
+
+    if args.save_baseline:
+        # Merge so a filtered run only updates the benchmarks it ran
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                'results': baseline
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline saved to {args.baseline}")
+    else:
+        if slower:
+            print(f"\n{len(slower)} benchmark(s) slower than the committed baseline (marked with ?) - "
+                  f"timings from another machine; compare with --baseline to check")
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed (marked with !)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+End-to-end input -> servo latency benchmark
+
+Runs the real ServoControlApp pipeline (poll_loop, process_mappings,
+ArduinoManager.send_servo_pulse) without a window. The virtual controller
+gets scripted step inputs and the serial port is replaced by a simulated
+device that timestamps every command it receives, optionally modelling the
+time each byte spends on the wire at a given baud rate.
+
+For every step it measures how long it takes until each mapped servo
+receives a command with the new pulse width, then reports p50/p95/p99/max latency
+and the effective per-servo update rate.
+
+Usage:
+    python scripts/benchmark_latency.py
+    python scripts/benchmark_latency.py --servos 1,4,16 --rates 20,100 --baud 115200
+    python scripts/benchmark_latency.py --output new.json --compare baseline.json
+
+With --compare the script exits with code 1 if any configuration's p99
+latency got worse than the baseline by more than --max-regression percent.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Allow running from the scripts folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ServoControlApp
+
+
+class SimulatedSerialDevice:
+    """Stands in for serial.Serial: records when each command would reach the board
+
+    With baudrate > 0 a command "arrives" once all its bytes (10 bits each)
+    have been clocked out after anything still queued ahead of it, like a
+    real UART. With baudrate = 0 it arrives the moment write() is called.
+    """
+    def __init__(self, baudrate=0, echo=True):
+        self.baudrate = baudrate
+        self.echo = echo  # Reply with OK:U<id>:<us> like the firmware
+        self.lock = threading.Lock()
+        self.wire_free_at = 0.0  # perf_counter time the simulated wire is idle again
+        self.received = []  # [(arrival time, servo_id, value)]
+        self.replies = bytearray()
+        self.bytes_received = 0
+        self.timeout = 2.0
+
+    def write(self, data):
+        now = time.perf_counter()
+        with self.lock:
+            arrival = now
+            if self.baudrate > 0:
+                self.wire_free_at = max(now, self.wire_free_at) + len(data) * 10.0 / self.baudrate
+                arrival = self.wire_free_at
+            self.bytes_received += len(data)
+            try:
+                text = data.decode().strip()
+                if text[:1] not in ('U', 'S'):
+                    return len(data)  # Heartbeat / failsafe config
+                servo_part, value_part = text[1:].split(':')
+                self.received.append((arrival, int(servo_part), int(value_part)))
+                if self.echo:
+                    self.replies += b"OK:%s%d:%d\n" % (text[:1].encode(), int(servo_part), int(value_part))
+            except ValueError:
+                pass
+        return len(data)
+
+    @property
+    def in_waiting(self):
+        return len(self.replies)
+
+    def readline(self):
+        with self.lock:
+            end = self.replies.find(b"\n")
+            if end < 0:
+                line, self.replies = bytes(self.replies), bytearray()
+            else:
+                line, self.replies = bytes(self.replies[:end + 1]), self.replies[end + 1:]
+        return line
+
+    def read(self, size=1):
+        """Up to size bytes, waiting up to `timeout` for the first one"""
+        deadline = time.perf_counter() + (self.timeout or 0.0)
+        while True:
+            with self.lock:
+                if self.replies or time.perf_counter() >= deadline:
+                    data, self.replies = bytes(self.replies[:size]), self.replies[size:]
+                    return data
+            time.sleep(0.0002)
+
+    def reset_input_buffer(self):
+        with self.lock:
+            self.replies = bytearray()
+
+    def close(self):
+        pass
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(percent / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_config(servo_count, tick_rate, steps, baudrate, timeout=2.0):
+    """Benchmark one servo count / tick rate combination; returns a result dict"""
+    app = ServoControlApp.create_headless()
+    app.poll_interval = 1.0 / tick_rate
+    device = SimulatedSerialDevice(baudrate)
+    arduino = app.arduino_manager
+    arduino.attach(device, "SIMULATED", baudrate or arduino.baudrate)
+
+    # Every servo follows the virtual wheel (axis 0). Nothing is selected in the
+    # (non-existent) UI, so the virtual wheel's auto-center does not run.
+    for servo_id in range(servo_count):
+        app.mappings[servo_id] = {'controller': -1, 'input_type': 'axis', 'input_id': 0}
+    app.publish_mappings()
+    vc = app.controller_manager.virtual_controller
+    vc.set_max_angle(0)  # No limit
+    vc.set_wheel_angle(-90.0)  # Axis -1.0 -> min endpoint
+
+    app.start_polling()
+    time.sleep(0.2)  # Let the loop settle
+
+    latencies = []
+    missed = 0
+    calibration = app.default_calibration
+    targets = [(90.0, calibration.pulse(1.0)), (-90.0, calibration.pulse(-1.0))]  # (wheel angle, expected pulse)
+    start_time = time.perf_counter()
+    start_ticks = app.poll_period_stats.total
+    with device.lock:
+        start_received = len(device.received)
+    for step in range(steps):
+        wheel_angle, expected = targets[step % 2]
+        # Random offset so steps land at different points of the polling tick
+        time.sleep(random.uniform(0, 1.0 / tick_rate))
+        with device.lock:
+            first_index = len(device.received)
+        step_time = time.perf_counter()
+        vc.set_wheel_angle(wheel_angle)
+
+        pending = set(range(servo_count))
+        deadline = step_time + timeout
+        scanned = first_index
+        while pending and time.perf_counter() < deadline:
+            with device.lock:
+                new = device.received[scanned:]
+            scanned += len(new)
+            for arrival, servo_id, pulse in new:
+                if servo_id in pending and pulse == expected and arrival >= step_time:
+                    latencies.append(arrival - step_time)
+                    pending.discard(servo_id)
+            time.sleep(0.0005)
+        missed += len(pending)
+        # Give a backed-up simulated wire a chance to drain before the next step.
+        # If the link is saturated it never will - that shows up as missed steps.
+        deadline = time.perf_counter() + timeout
+        while device.wire_free_at > time.perf_counter() < deadline:
+            time.sleep(0.001)
+    elapsed = time.perf_counter() - start_time
+    with device.lock:
+        commands = len(device.received) - start_received
+
+    app.stop_polling()
+    arduino.connected = False
+
+    latencies.sort()
+    return {
+        'servos': servo_count,
+        'tick_rate': tick_rate,
+        'baudrate': baudrate,
+        'steps': steps,
+        'samples': len(latencies),
+        'missed': missed,
+        'latency_ms': {
+            'p50': percentile(latencies, 50) * 1000 if latencies else None,
+            'p95': percentile(latencies, 95) * 1000 if latencies else None,
+            'p99': percentile(latencies, 99) * 1000 if latencies else None,
+            'max': latencies[-1] * 1000 if latencies else None
+        },
+        # Commands that reached each servo per second, on average
+        'update_rate_hz': commands / elapsed / servo_count,
+        'achieved_tick_rate_hz': (app.poll_period_stats.total - start_ticks) / elapsed
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Check p99 latency against a baseline file; returns a list of failure messages"""
+    failures = []
+    previous = {(r['servos'], r['tick_rate'], r['baudrate']): r for r in baseline.get('results', [])}
+    for result in results:
+        key = (result['servos'], result['tick_rate'], result['baudrate'])
+        old = previous.get(key)
+        if not old or old['latency_ms']['p99'] is None or result['latency_ms']['p99'] is None:
+            continue
+        limit = old['latency_ms']['p99'] * (1.0 + max_regression / 100.0)
+        if result['latency_ms']['p99'] > limit:
+            failures.append(f"{result['servos']} servos @ {result['tick_rate']}Hz: p99 "
+                            f"{result['latency_ms']['p99']:.2f}ms > {limit:.2f}ms "
+                            f"(baseline {old['latency_ms']['p99']:.2f}ms + {max_regression:g}%)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end input -> servo latency benchmark")
+    parser.add_argument('--servos', default="1,4,16", help="Comma-separated servo counts (default: 1,4,16)")
+    parser.add_argument('--rates', default="20,100", help="Comma-separated poll rates in Hz (default: 20,100)")
+    parser.add_argument('--steps', type=int, default=40, help="Step inputs per configuration (default: 40)")
+    parser.add_argument('--baud', type=int, default=115200,
+                        help="Simulated serial baud rate, 0 = infinitely fast (default: 115200)")
+    parser.add_argument('--output', default="latency_results.json", help="Where to write the results")
+    parser.add_argument('--compare', help="Baseline results file to compare p99 latency against")
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help="Allowed p99 regression vs baseline in percent (default: 20)")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'servos':>6} {'rate':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'upd/s':>7} {'missed':>6}")
+    for servo_count in [int(s) for s in args.servos.split(',')]:
+        for tick_rate in [float(r) for r in args.rates.split(',')]:
+            result = run_config(servo_count, tick_rate, args.steps, args.baud)
+            results.append(result)
+            lat = result['latency_ms']
+            if lat['p50'] is None:
+                print(f"{servo_count:6d} {tick_rate:6g}   (no samples)")
+                continue
+            print(f"{servo_count:6d} {tick_rate:6g} {lat['p50']:8.2f} {lat['p95']:8.2f} {lat['p99']:8.2f} "
+                  f"{lat['max']:8.2f} {result['update_rate_hz']:7.1f} {result['missed']:6d}")
+
+    output = {
+        'benchmark': 'latency',
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': sys.version.split()[0],
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.max_regression)
+        if failures:
+            print("\nLatency regressions:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print("No latency regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
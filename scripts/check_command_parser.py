@@ -0,0 +1,137 @@
+"""
+Build and check the firmware's command parser on this computer
+
+Compiles arduino/host_test/command_parser_test.c (which includes the same
+arduino/command_parser.h the sketches use) with gcc, then:
+
+  1. runs its correctness tests,
+  2. feeds it thousands of random lines - valid commands, near misses and
+     garbage - and checks it accepts and rejects exactly what firmware_sim.py
+     (the Python reference of the firmware) does,
+  3. runs its throughput benchmark.
+
+Usage:
+    python scripts/check_command_parser.py
+    python scripts/check_command_parser.py --lines 100000 --frames 1000000 --cc clang
+
+Exits with code 1 if any check fails.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Allow running from the scripts folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from firmware_sim import parse_command, BLANKS
+
+ARDUINO_DIR = os.path.join(ROOT, "arduino")
+TEST_SOURCE = os.path.join(ARDUINO_DIR, "host_test", "command_parser_test.c")
+
+# Bytes random lines are made of (no '\n' - that ends a line)
+NOISE = b"HTRPNUSFX0123456789:: \t\r-+.\x00\xff"
+
+
+def build(cc, folder):
+    """Compile the host test; returns the executable's path"""
+    executable = os.path.join(folder, "command_parser_test")
+    subprocess.run([cc, "-O2", "-Wall", "-Wextra", "-std=c99", "-I", ARDUINO_DIR, "-o", executable, TEST_SOURCE],
+                   check=True)
+    return executable
+
+
+def random_line(rng):
+    """A valid command, a valid command with one byte changed, or noise"""
+    kind = rng.random()
+    if kind < 0.4:
+        line = rng.choice([b"H", b"%c%d" % (rng.choice(b"TRPN"), rng.randrange(0, 10000)),
+                           b"%c%d:%d" % (rng.choice(b"USF"), rng.randrange(0, 20), rng.randrange(0, 3000))])
+        line = rng.choice([b"", b" ", b"\t"]) + line + rng.choice([b"", b"\r", b" \r"])
+    elif kind < 0.8:
+        line = bytearray(b"%c%d:%d" % (rng.choice(b"USF"), rng.randrange(0, 2000), rng.randrange(0, 10 ** 10)))
+        position = rng.randrange(len(line) + 1)
+        if rng.random() < 0.5 and position < len(line):
+            line[position] = rng.choice(NOISE)
+        else:
+            line.insert(position, rng.choice(NOISE))
+        line = bytes(line)
+    else:
+        line = bytes(rng.choice(NOISE) for _ in range(rng.randrange(0, 12)))
+    return line
+
+
+def expected_output(lines):
+    """What command_parser_test --stdin should print for these lines, according to firmware_sim"""
+    output = []
+    rejected = 0
+    for line in lines:
+        command = parse_command(line)
+        if command is None:
+            if line.strip(BLANKS):
+                rejected += 1
+        elif command[0] in ('H', 'T', 'R', 'P', 'N'):
+            output.append("H" if command[0] == 'H' else f"{command[0]}{command[2]}")
+        else:
+            output.append(f"{command[0]}{command[1]}:{command[2]}")
+    output.append(f"rejected {rejected}")
+    return output
+
+
+def cross_check(executable, count, seed):
+    """Random lines through the C parser and firmware_sim; returns a list of failure messages"""
+    rng = random.Random(seed)
+    lines = [random_line(rng) for _ in range(count)]
+    result = subprocess.run([executable, "--stdin"], input=b"".join(line + b"\n" for line in lines),
+                            capture_output=True, check=True)
+    got = result.stdout.decode().splitlines()
+    want = expected_output(lines)
+    if got == want:
+        accepted = len(want) - 1
+        print(f"Cross-check: {count} random lines, {accepted} commands, {count - accepted} others - "
+              f"same as firmware_sim")
+        return []
+    for index, (got_line, want_line) in enumerate(zip(got, want)):
+        if got_line != want_line:
+            return [f"cross-check differs at output line {index + 1}: parser '{got_line}', firmware_sim '{want_line}'"]
+    return [f"cross-check: parser printed {len(got)} lines, firmware_sim expects {len(want)}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build, test and benchmark the firmware command parser with gcc")
+    parser.add_argument('--cc', default=os.environ.get('CC', 'gcc'), help="C compiler (default: $CC or gcc)")
+    parser.add_argument('--lines', type=int, default=20000, help="Random lines to cross-check (default: 20000)")
+    parser.add_argument('--frames', type=int, default=200000, help="16-servo frames to benchmark (default: 200000)")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed for the cross-check (default: 1)")
+    args = parser.parse_args()
+
+    if shutil.which(args.cc) is None:
+        print(f"Compiler '{args.cc}' not found - install gcc or pass --cc")
+        sys.exit(1)
+
+    failures = []
+    folder = tempfile.mkdtemp(prefix="command_parser_")
+    try:
+        executable = build(args.cc, folder)
+        if subprocess.run([executable]).returncode != 0:
+            failures.append("host tests failed")
+        failures += cross_check(executable, args.lines, args.seed)
+        if subprocess.run([executable, "--bench", str(args.frames)]).returncode != 0:
+            failures.append("benchmark failed")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("Command parser checks passed")
+
+
+if __name__ == "__main__":
+    main()
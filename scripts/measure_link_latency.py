@@ -0,0 +1,164 @@
+"""
+Measure host -> board latency with the clock sync (clock_sync.py)
+
+Runs the real ServoControlApp pipeline without a window, sweeping the virtual
+wheel so every tick sends commands, and reports what ArduinoManager measured:
+how well the board's clock is synced (error bound, drift) and how long each
+tick's commands took to reach the board (from the numbered end-of-frame
+markers).
+
+Without --port it runs against SimulatedBoard (firmware_sim.py), whose clock
+and link delay are known exactly, and checks the estimates against them:
+
+    python scripts/measure_link_latency.py
+    python scripts/measure_link_latency.py --latency 5 --drift 2000 --seconds 20 --wrap
+
+With --port it measures a real board running the current firmware:
+
+    python scripts/measure_link_latency.py --port COM3 --seconds 30
+
+Exits with code 1 if a simulated check fails.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+# Allow running from the scripts folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ServoControlApp
+from firmware_sim import SimulatedBoard, LOOP_PERIOD_MS
+from instrumentation import histogram_percentile
+from clock_sync import serial_time_ns
+
+SCHEDULING_SLACK = 0.005  # Allowance for thread scheduling on a busy machine (seconds)
+SWEEP_SERVOS = range(4)
+
+
+def make_app(rate):
+    """Headless app driving four servos from the virtual wheel"""
+    app = ServoControlApp.create_headless()
+    app.poll_interval = 1.0 / rate
+    for servo_id in SWEEP_SERVOS:
+        app.mappings[servo_id] = {'controller': -1, 'input_type': 'axis', 'input_id': 0}
+    app.publish_mappings()
+    return app
+
+
+def run(app, seconds):
+    """Poll for `seconds` while sweeping the wheel so every tick has commands to send"""
+    wheel = app.controller_manager.virtual_controller
+    app.start_polling()
+    try:
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            wheel.set_wheel_angle(90.0 * math.sin(time.perf_counter() * 3.0))
+            time.sleep(0.005)
+    finally:
+        app.stop_polling()
+
+
+def report(arduino):
+    """Print the clock sync and one-way latency figures; returns (p50, p99) seconds or None"""
+    sync = arduino.clock_sync
+    snapshot = arduino.one_way_histogram.snapshot()
+    print(f"Clock sync samples:  {len(sync.samples)}")
+    if sync.synced:
+        print(f"Clock error bound:   ±{sync.error_bound_ns / 1e6:.3f} ms (half the longest round trip fitted)")
+        print(f"Board clock drift:   {sync.drift_ppm:+.0f} ppm")
+    if not snapshot['count']:
+        print("No one-way latency samples - is the board running the current firmware?")
+        return None
+    values = arduino.one_way_stats.percentiles(50, 99)
+    print(f"Host -> board:       p50 {values[0] * 1000:.2f} ms, p99 {values[1] * 1000:.2f} ms "
+          f"({snapshot['count']} frames; histogram p99 <= {histogram_percentile(snapshot, 99) * 1000:.2f} ms)")
+    return values
+
+
+def measure_simulated(args):
+    failures = []
+    start_us = 0xFFFFFFFF - 2_000_000 if args.wrap else 0  # micros() wraps 2 s in
+    board = SimulatedBoard(latency_ms=args.latency, clock_rate=1.0 + args.drift / 1e6, start_us=start_us,
+                           baudrate=args.baud)
+    app = make_app(args.rate)
+    arduino = app.arduino_manager
+    arduino.attach(board, "SIMULATED", args.baud)
+    try:
+        run(app, args.seconds)
+    finally:
+        board.close()
+        arduino.connected = False
+    print(f"Simulated link: {args.baud} baud, {args.latency} ms each way, board clock {args.drift:+.0f} ppm"
+          f"{', micros() wrapping' if args.wrap else ''}")
+    values = report(arduino)
+    sync = arduino.clock_sync
+    if not sync.synced or values is None:
+        return ["no clock sync or latency samples"]
+
+    # The simulated board's clock is known: compare the mapping with the truth right now
+    board_us = board.now_us()
+    truth_ns = (board.origin + (board_us - start_us) / 1e6 / board.clock_rate) * 1e9
+    error = abs(sync.board_to_host_ns(board_us & 0xFFFFFFFF) - truth_ns) / 1e9
+    print(f"Clock error now:     {error * 1000:.3f} ms (true board clock)")
+    if error > sync.error_bound_ns / 1e9 + SCHEDULING_SLACK:
+        failures.append(f"clock error {error * 1000:.2f} ms is above the bound")
+    # Drift is a slope over the run: the clock error at each end limits how well it can be known
+    drift_tolerance = max(200.0, abs(args.drift) * 0.2, sync.error_bound_ns / 2 / args.seconds / 1e3)
+    if args.seconds >= 5 and abs(sync.drift_ppm - args.drift) > drift_tolerance:
+        failures.append(f"drift estimated at {sync.drift_ppm:+.0f} ppm, simulated {args.drift:+.0f} ppm")
+    # A frame marker is read by the first board loop after it arrives, behind the frame's commands on the wire
+    wire = serial_time_ns(len(SWEEP_SERVOS) * len("U0:1500\n") + len("N100\n"), args.baud) / 1e9
+    # and the measurement is only as good as the clock sync
+    slack = sync.error_bound_ns / 1e9 + SCHEDULING_SLACK
+    low = args.latency / 1000.0 - slack
+    high = args.latency / 1000.0 + wire + 2 * LOOP_PERIOD_MS / 1000.0 + slack
+    if not low <= values[0] <= high:
+        failures.append(f"median host -> board {values[0] * 1000:.2f} ms, want {low * 1000:.1f} to {high * 1000:.1f}")
+    return failures
+
+
+def measure_port(args):
+    app = make_app(args.rate)
+    arduino = app.arduino_manager
+    print(f"Connecting to {args.port}...")
+    if not arduino.connect(args.port, args.baud or 9600, detect_baudrate=args.baud is None):
+        print(f"Could not connect to {args.port}")
+        sys.exit(1)
+    try:
+        run(app, args.seconds)
+    finally:
+        arduino.disconnect()
+    print(f"{args.port} at {arduino.baudrate} baud")
+    report(arduino)
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure host -> board latency using the board's clock")
+    parser.add_argument('--port', help="Measure a real board on this port instead of the simulated one")
+    parser.add_argument('--baud', type=int, help="Baud rate (default: auto-detect; simulated: 115200)")
+    parser.add_argument('--seconds', type=float, default=10, help="How long to run (default: 10)")
+    parser.add_argument('--rate', type=float, default=20, help="Polling rate in Hz (default: 20, the app's rate)")
+    parser.add_argument('--latency', type=float, default=2.0, help="Simulated delay each way in ms (default: 2)")
+    parser.add_argument('--drift', type=float, default=300.0, help="Simulated board clock error in ppm (default: 300)")
+    parser.add_argument('--wrap', action='store_true', help="Simulated micros() wraps around during the run")
+    args = parser.parse_args()
+
+    if args.port:
+        measure_port(args)
+        return
+    if args.baud is None:
+        args.baud = 115200
+    failures = measure_simulated(args)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("Latency checks passed")
+
+
+if __name__ == "__main__":
+    main()
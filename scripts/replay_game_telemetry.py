@@ -0,0 +1,341 @@
+"""
+Stand-in racing game: sends UDP telemetry packets (game_telemetry.py)
+
+Sends the packets a racing game would, so mappings on the "G: Game
+Telemetry" controller can be set up and tested without the game running:
+synthetic laps (speed, RPM, g-forces, steering, pedals and suspension that
+follow each other like a car going round a track), or packets captured from
+the real game.
+
+    python scripts/replay_game_telemetry.py                        synthetic laps, Forza Dash, 60 Hz
+    python scripts/replay_game_telemetry.py --format codemasters --rate 360
+    python scripts/replay_game_telemetry.py --capture lap.rcgame   record the game (Ctrl+C to stop)
+    python scripts/replay_game_telemetry.py --file lap.rcgame      send them again, with the recorded timing
+    python scripts/replay_game_telemetry.py --check                end-to-end check at 360 Hz
+
+--check runs the real ServoControlApp pipeline without a window, listening on
+a free local port, sends synthetic packets at --rate (default 360) for
+--seconds and checks that every packet was received and decoded, that every
+format decodes to the channels it was made from, and that the channels go to
+rest when the packets stop. Exits with code 1 if a check fails.
+
+Capture files start with the 8 bytes "RCGAME01"; each packet follows as a
+little-endian int64 (nanoseconds since the first packet), a uint16 length and
+the packet bytes.
+"""
+
+import argparse
+import math
+import os
+import socket
+import struct
+import sys
+import time
+
+# Allow running from the scripts folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_telemetry import (FORMATS_BY_NAME, DEFAULT_ADDRESS, STANDARD_GRAVITY, SUSPENSION_FULL_SCALE_MM,
+                            SPEED_FULL_SCALE, G_FULL_SCALE, STALE_AFTER, CHANNEL_NAMES, REST, SPEED, RPM, LATERAL_G,
+                            LONGITUDINAL_G, VERTICAL_G, STEERING, THROTTLE, BRAKE, SUSPENSION, SUSPENSION_FIELDS,
+                            GAME_TELEMETRY_CONTROLLER, BUTTON_RECEIVING, parse_address)
+from instrumentation import histogram_percentile
+
+FORMAT_CHOICES = {
+    'forza-sled': "Forza Sled",
+    'forza-dash': "Forza Dash",
+    'forza-horizon': "Forza Horizon",
+    'forza-motorsport': "Forza Motorsport",
+    'codemasters': "Codemasters",
+}
+CAPTURE_MAGIC = b"RCGAME01"
+CAPTURE_RECORD = struct.Struct('<qH')
+
+LAP_SECONDS = 20.0
+MAX_RPM = 8000.0
+IDLE_RPM = 900.0
+GEARS = 6
+TOLERANCE = 0.02  # Channel error allowed in the check (pedals and steering are sent as bytes by Forza)
+
+
+def car(t):
+    """The synthetic car at time t (seconds): a dict of physical values
+
+    A lap is a long straight, a braking zone and a long corner; speed, RPM and
+    the g-forces follow from it, so mapped servos move the way they would in
+    a game.
+    """
+    phase = (t % LAP_SECONDS) / LAP_SECONDS
+    if phase < 0.5:  # Straight: accelerate
+        throttle, brake, steer = 1.0, 0.0, 0.05 * math.sin(t * 7.0)
+        speed = 25.0 + 55.0 * (1.0 - math.exp(-phase * 8.0))
+        longitudinal = 0.6 * math.exp(-phase * 8.0)
+    elif phase < 0.6:  # Braking zone
+        progress = (phase - 0.5) / 0.1
+        throttle, brake, steer = 0.0, 1.0 - 0.5 * progress, 0.0
+        speed = 25.0 + 55.0 * (1.0 - math.exp(-4.0)) * (1.0 - progress)
+        longitudinal = -1.4 * (1.0 - 0.5 * progress)
+    else:  # Corner at constant speed
+        progress = (phase - 0.6) / 0.4
+        throttle, brake = 0.4, 0.0
+        steer = 0.6 * math.sin(math.pi * progress)
+        speed = 25.0 + 3.0 * progress
+        longitudinal = 0.05
+    speed = min(speed, SPEED_FULL_SCALE)
+    lateral = 1.8 * steer
+    vertical = 0.1 * math.sin(t * 23.0)
+    gear = max(1, min(GEARS, int(speed / (SPEED_FULL_SCALE / GEARS)) + 1))
+    gear_low = (gear - 1) * SPEED_FULL_SCALE / GEARS
+    rpm = IDLE_RPM + (MAX_RPM - IDLE_RPM) * min(1.0, 0.35 + 0.65 * (speed - gear_low) / (SPEED_FULL_SCALE / GEARS))
+    # Suspension travel (0 = extended, 1 = compressed): the outside wheels in a corner, the front under braking
+    roll = 0.25 * lateral / G_FULL_SCALE
+    pitch = -0.15 * longitudinal / G_FULL_SCALE
+    travel = (0.5 + roll + pitch, 0.5 - roll + pitch, 0.5 + roll - pitch, 0.5 - roll - pitch)
+    return {'speed': speed, 'rpm': rpm, 'max_rpm': MAX_RPM, 'lateral': lateral, 'longitudinal': longitudinal,
+            'vertical': vertical, 'steer': steer, 'throttle': throttle, 'brake': brake, 'travel': travel}
+
+
+def field_values(packet_format, state):
+    """The packet fields (in packet_format.fields order) for a car state"""
+    travel = dict(zip(SUSPENSION_FIELDS, state['travel']))
+    if packet_format.name == "Codemasters":
+        fields = {'speed': state['speed'], 'throttle': state['throttle'], 'steer': state['steer'],
+                  'brake': state['brake'], 'g_lat': state['lateral'], 'g_lon': state['longitudinal'],
+                  'rpm': state['rpm'] / 10.0, 'max_rpm': state['max_rpm'] / 10.0}  # Sent as RPM / 10
+        for name, value in travel.items():
+            fields[name] = (value - 0.5) * 2.0 * SUSPENSION_FULL_SCALE_MM
+    else:
+        fields = {'race_on': 1, 'max_rpm': state['max_rpm'], 'rpm': state['rpm'],
+                  'accel_x': state['lateral'] * STANDARD_GRAVITY, 'accel_y': state['vertical'] * STANDARD_GRAVITY,
+                  'accel_z': state['longitudinal'] * STANDARD_GRAVITY, 'speed': state['speed'],
+                  'accel': round(state['throttle'] * 255), 'brake': round(state['brake'] * 255),
+                  'steer': round(state['steer'] * 127)}
+        fields.update(travel)
+    return [fields[name] for name in packet_format.fields]
+
+
+def expected_channels(packet_format, state):
+    """What GameTelemetry should make of a car state sent in packet_format (-1..1 per channel)"""
+    values = list(REST)
+    carried = {axis for axis, *_ in packet_format.channels}
+    travel = [value * 2.0 - 1.0 for value in state['travel']]
+    physical = {SPEED: state['speed'] / SPEED_FULL_SCALE * 2.0 - 1.0, RPM: state['rpm'] / state['max_rpm'] * 2.0 - 1.0,
+                LATERAL_G: state['lateral'] / G_FULL_SCALE, LONGITUDINAL_G: state['longitudinal'] / G_FULL_SCALE,
+                VERTICAL_G: state['vertical'] / G_FULL_SCALE, STEERING: state['steer'],
+                THROTTLE: state['throttle'] * 2.0 - 1.0, BRAKE: state['brake'] * 2.0 - 1.0}
+    physical.update(zip(SUSPENSION, travel))
+    for axis in carried:
+        values[axis] = max(-1.0, min(1.0, physical[axis]))
+    return values
+
+
+class SyntheticGame:
+    """Makes packets of one format into one reusable buffer"""
+    def __init__(self, packet_format):
+        self.format = packet_format
+        self.buffer = bytearray(packet_format.size)
+
+    def packet(self, t):
+        self.format.struct.pack_into(self.buffer, 0, *field_values(self.format, car(t)))
+        return self.buffer
+
+
+def send_paced(sock, address, rate, seconds, make_packet):
+    """Send make_packet(t) rate times a second for `seconds` (None = until Ctrl+C); returns packets sent"""
+    period = 1.0 / rate
+    start = time.perf_counter()
+    sent = 0
+    while seconds is None or sent < seconds * rate:
+        due = start + sent * period
+        wait = due - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        sock.sendto(make_packet(due - start), address)
+        sent += 1
+    return sent
+
+
+def capture(address, path):
+    """Record packets arriving on address to a capture file until Ctrl+C"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(address)
+    buffer = bytearray(65536)
+    count = 0
+    first = None
+    print(f"Capturing UDP {address[0]}:{address[1]} to {path} (Ctrl+C to stop)")
+    with open(path, 'wb') as f:
+        f.write(CAPTURE_MAGIC)
+        try:
+            while True:
+                size = sock.recv_into(buffer)
+                now = time.perf_counter_ns()
+                if first is None:
+                    first = now
+                f.write(CAPTURE_RECORD.pack(now - first, size))
+                f.write(buffer[:size])
+                count += 1
+        except KeyboardInterrupt:
+            pass
+    sock.close()
+    print(f"Captured {count} packets")
+
+
+def read_capture(path):
+    """[(nanoseconds, packet bytes)] from a capture file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+        raise ValueError(f"{path} is not a game telemetry capture")
+    packets = []
+    offset = len(CAPTURE_MAGIC)
+    while offset + CAPTURE_RECORD.size <= len(data):
+        timestamp, size = CAPTURE_RECORD.unpack_from(data, offset)
+        offset += CAPTURE_RECORD.size
+        packets.append((timestamp, data[offset:offset + size]))
+        offset += size
+    return packets
+
+
+def replay_capture(sock, address, packets, loop):
+    """Send captured packets with their recorded timing"""
+    while True:
+        start = time.perf_counter_ns()
+        for timestamp, packet in packets:
+            wait = start + timestamp - time.perf_counter_ns()
+            if wait > 0:
+                time.sleep(wait / 1e9)
+            sock.sendto(packet, address)
+        if not loop:
+            return
+
+
+def check_formats(app, sock):
+    """Every format through the app's decoder; returns a list of failure messages"""
+    failures = []
+    telemetry = app.controller_manager.game_telemetry
+    for packet_format in FORMATS_BY_NAME.values():
+        state = car(7.3)
+        packet = SyntheticGame(packet_format).packet(7.3)
+        packets = telemetry.packets
+        sock.sendto(packet, telemetry.address)
+        deadline = time.perf_counter() + 1.0
+        while telemetry.packets == packets and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        axes = app.controller_manager.get_controller_state(GAME_TELEMETRY_CONTROLLER).axes
+        want = expected_channels(packet_format, state)
+        for axis, name in enumerate(CHANNEL_NAMES):
+            if abs(axes[axis] - want[axis]) > TOLERANCE:
+                failures.append(f"{packet_format.name}: {name} decoded as {axes[axis]:+.3f}, sent {want[axis]:+.3f}")
+    print(f"Formats: {', '.join(FORMATS_BY_NAME)} - {'OK' if not failures else 'FAILED'}")
+    return failures
+
+
+def run_check(args):
+    from main import ServoControlApp  # Only the check needs the app (sending works without pyserial)
+    failures = []
+    app = ServoControlApp.create_headless()
+    telemetry = app.controller_manager.game_telemetry
+    if not telemetry.start(("127.0.0.1", 0)):
+        return ["could not open a UDP socket"]
+    # Speed needle and a motion-seat servo per front corner, as a rig would use them
+    app.mappings[0] = {'controller': GAME_TELEMETRY_CONTROLLER, 'input_type': 'axis', 'input_id': SPEED}
+    app.mappings[1] = {'controller': GAME_TELEMETRY_CONTROLLER, 'input_type': 'axis', 'input_id': SUSPENSION[0]}
+    app.mappings[2] = {'controller': GAME_TELEMETRY_CONTROLLER, 'input_type': 'axis', 'input_id': SUSPENSION[1]}
+    app.publish_mappings()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        failures += check_formats(app, sock)
+
+        # Sustained rate while the polling loop runs
+        game = SyntheticGame(FORMATS_BY_NAME[FORMAT_CHOICES[args.format]])
+        first = telemetry.packets
+        app.start_polling()
+        start = time.perf_counter()
+        sent = send_paced(sock, telemetry.address, args.rate, args.seconds, game.packet)
+        elapsed = time.perf_counter() - start
+        deadline = time.perf_counter() + 1.0
+        while telemetry.packets - first < sent and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        app.stop_polling()
+        received = telemetry.packets - first
+        snapshot = telemetry.decode_histogram.snapshot()
+        p50 = histogram_percentile(snapshot, 50)
+        p99 = histogram_percentile(snapshot, 99)
+        print(f"Sent {sent} {game.format.name} packets in {elapsed:.2f} s ({sent / elapsed:.0f} /s), "
+              f"received {received}, unknown {telemetry.unknown_packets}")
+        print(f"Per packet (receive thread): p50 <= {p50 * 1e6:.0f} us, p99 <= {p99 * 1e6:.0f} us "
+              f"(budget at {args.rate:.0f} Hz: {1e6 / args.rate:.0f} us)")
+        if received < sent:
+            failures.append(f"{sent - received} of {sent} packets lost")
+        if p99 * args.rate > 0.5:
+            failures.append(f"per-packet work p99 {p99 * 1e6:.0f} us is over half the packet period")
+        state = app.controller_manager.get_controller_state(GAME_TELEMETRY_CONTROLLER)
+        if not app.commanded_pulses or not state.buttons[BUTTON_RECEIVING]:
+            failures.append("game telemetry did not reach the servos")
+
+        # Packets stop: channels go to rest
+        time.sleep(STALE_AFTER + 0.1)
+        axes = app.controller_manager.get_controller_state(GAME_TELEMETRY_CONTROLLER).axes
+        if list(axes) != list(REST) or state.buttons[BUTTON_RECEIVING]:
+            failures.append("channels did not go to rest after the packets stopped")
+        else:
+            print(f"Packets stopped: channels at rest after {STALE_AFTER} s")
+    finally:
+        sock.close()
+        telemetry.stop()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send racing game UDP telemetry (a stand-in game)")
+    parser.add_argument('--address', default=f"{DEFAULT_ADDRESS[0]}:{DEFAULT_ADDRESS[1]}",
+                        help="Where to send (or --capture: listen), port or host:port (default: the app's)")
+    parser.add_argument('--format', choices=sorted(FORMAT_CHOICES), default='forza-dash',
+                        help="Packet format for synthetic laps (default: forza-dash)")
+    parser.add_argument('--rate', type=float, help="Packets per second (default: 60; --check: 360)")
+    parser.add_argument('--seconds', type=float, help="How long to send (default: until Ctrl+C; --check: 5)")
+    parser.add_argument('--file', help="Send the packets in this capture file instead of synthetic laps")
+    parser.add_argument('--loop', action='store_true', help="Repeat the capture file until Ctrl+C")
+    parser.add_argument('--capture', metavar='FILE', help="Record packets arriving on --address to FILE")
+    parser.add_argument('--check', action='store_true', help="End-to-end check against the app pipeline")
+    args = parser.parse_args()
+
+    try:
+        address = parse_address(args.address)
+    except ValueError:
+        parser.error(f"invalid address: {args.address}")
+
+    if args.check:
+        args.rate = args.rate or 360.0
+        args.seconds = args.seconds or 5.0
+        failures = run_check(args)
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            sys.exit(1)
+        print("Game telemetry checks passed")
+        return
+    if args.capture:
+        capture(address, args.capture)
+        return
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        if args.file:
+            packets = read_capture(args.file)
+            print(f"Sending {len(packets)} captured packets to {address[0]}:{address[1]}")
+            replay_capture(sock, address, packets, args.loop)
+        else:
+            rate = args.rate or 60.0
+            game = SyntheticGame(FORMATS_BY_NAME[FORMAT_CHOICES[args.format]])
+            print(f"Sending synthetic {game.format.name} laps at {rate:g} Hz to {address[0]}:{address[1]} "
+                  f"(Ctrl+C to stop)")
+            send_paced(sock, address, rate, args.seconds, game.packet)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
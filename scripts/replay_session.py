@@ -0,0 +1,136 @@
+"""
+Replay a recorded session through the mapping pipeline
+
+Feeds the controller inputs of a recording (sessions/*.rcsrec) through the
+current mapping code without a wheel or an Arduino, then compares the servo
+commands it produces with the ones that were recorded. Use it to check that a
+change to the pipeline does not change its output, or to benchmark the
+pipeline on real driving data.
+
+Usage:
+    python scripts/replay_session.py sessions/session_20260101_120000.rcsrec
+    python scripts/replay_session.py SESSION --speed 1          # real time
+    python scripts/replay_session.py SESSION --speed 4          # 4x real time
+    python scripts/replay_session.py SESSION --output replayed.csv
+    python scripts/replay_session.py SESSION --config other_mappings.json
+
+By default the replay runs as fast as possible. Mappings, axis settings, the
+mixer and servo calibration come from the recording's .json sidecar unless --config gives
+another file (same format). The script exits with code 1 if any replayed command differs
+from the recorded one (unless --no-diff is given).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Allow running from the scripts folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ServoControlApp
+from instrumentation import histogram_percentile
+from session_recorder import SessionReader, load_session_config
+from session_replay import replay, diff_commands
+from calibration import ServoCalibration
+
+
+def load_config(args):
+    """Mapping configuration from --config or the recording's sidecar"""
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config = json.load(f)
+        return {
+            'mappings': {int(k): v for k, v in config.get('mappings', {}).items()},
+            'axis_settings': {int(k): v for k, v in config.get('axis_settings', {}).items()},
+            'mixer': config.get('mixer', {}),
+            'calibration': {int(k): v for k, v in config.get('calibration', {}).items()}
+        }
+    return load_session_config(args.session)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the mapping pipeline")
+    parser.add_argument('session', help="Recording to replay (.rcsrec)")
+    parser.add_argument('--speed', type=float, default=0,
+                        help="Replay speed: 1 = real time, 4 = 4x, 0 = as fast as possible (default: 0)")
+    parser.add_argument('--start', type=float, default=0.0, help="Start this many seconds into the recording")
+    parser.add_argument('--config', help="JSON file with 'mappings', 'axis_settings', 'mixer' and 'calibration' to use instead of the recording's")
+    parser.add_argument('--output', help="Write the replayed commands as CSV (time_s,servo_id,pulse_us)")
+    parser.add_argument('--no-diff', action='store_true', help="Don't compare against the recorded commands")
+    parser.add_argument('--max-diffs', type=int, default=10, help="Differences to print (default: 10)")
+    args = parser.parse_args()
+
+    config = load_config(args)
+    if config is None:
+        print(f"{args.session} has no saved mapping configuration - pass one with --config")
+        sys.exit(2)
+
+    app = ServoControlApp.create_headless()
+    app.mappings.update(config['mappings'])
+    for axis_id, settings in config['axis_settings'].items():
+        app.axis_settings[axis_id] = settings
+    app.mixer.load_dict(config['mixer'])
+    for servo_id, calibration in config['calibration'].items():
+        app.servo_calibration[servo_id] = ServoCalibration.from_dict(calibration)
+    app.publish_mappings()
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    if output:
+        output.write("time_s,servo_id,pulse_us\n")
+
+    frames = 0
+    commands = 0
+    differing_frames = 0
+    printed = 0
+    with SessionReader(args.session) as reader:
+        origin = reader.record_time(0) if reader.record_count else 0
+        if reader.version < 2 and not args.no_diff:
+            # Version 1 recordings store angles, the pipeline now sends pulse widths
+            print(f"{args.session} is a version {reader.version} recording (angles) - not comparing commands")
+            args.no_diff = True
+        print(f"Replaying {reader.duration():.1f}s ({reader.record_count} records, "
+              f"{len(config['mappings'])} mappings) at "
+              f"{'max speed' if not args.speed else f'{args.speed:g}x'}")
+        started = time.perf_counter()
+        for timestamp, recorded, replayed in replay(app, reader, args.speed, args.start):
+            frames += 1
+            commands += len(replayed)
+            if output:
+                seconds = (timestamp - origin) / 1e9
+                for servo_id, pulse in replayed:
+                    output.write(f"{seconds:.6f},{servo_id},{pulse}\n")
+            if args.no_diff:
+                continue
+            differences = diff_commands(recorded, replayed)
+            if differences:
+                differing_frames += 1
+                for servo_id, expected, actual in differences:
+                    if printed < args.max_diffs:
+                        print(f"  t={(timestamp - origin) / 1e9:9.3f}s servo {servo_id}: "
+                              f"recorded {expected}, replayed {actual}")
+                    printed += 1
+        elapsed = time.perf_counter() - started
+    if output:
+        output.close()
+        print(f"Replayed commands written to {args.output}")
+
+    mapping = app.metrics.histogram('mapping_eval').snapshot()
+    p50 = histogram_percentile(mapping, 50)
+    p99 = histogram_percentile(mapping, 99)
+    print(f"{frames} ticks, {commands} commands in {elapsed:.2f}s "
+          f"({frames / elapsed if elapsed > 0 else 0:.0f} ticks/s)")
+    if p50 is not None:
+        print(f"mapping_eval per servo: p50 <= {p50 * 1e6:.0f}us, p99 <= {p99 * 1e6:.0f}us")
+
+    if args.no_diff:
+        return
+    if differing_frames:
+        print(f"{differing_frames} of {frames} ticks differ from the recording ({printed} differences)")
+        sys.exit(1)
+    print("Replayed commands match the recording")
+
+
+if __name__ == "__main__":
+    main()
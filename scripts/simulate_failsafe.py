@@ -0,0 +1,179 @@
+"""
+Heartbeat / failsafe check without hardware
+
+Runs the real ServoControlApp pipeline (poll_loop, heartbeats, failsafe
+config) without a window against SimulatedBoard, the Python reference
+implementation of the firmware (firmware_sim.py), and checks both directions
+of the link:
+
+  1. Host hang: the polling thread stops. The board must move the servos to
+     their failsafe positions within the failsafe timeout (plus one firmware
+     loop), and leave failsafe as soon as the host is back.
+  2. Silent board: the board stops answering. The host must notice within the
+     timeout (plus one polling tick) and report how long it took.
+
+Before that it checks the reference firmware's timer on an exact clock.
+
+Usage:
+    python scripts/simulate_failsafe.py
+    python scripts/simulate_failsafe.py --timeout 100 --rate 50 --runs 10
+
+Exits with code 1 if any check fails.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Allow running from the scripts folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ServoControlApp
+from calibration import ServoCalibration
+from firmware_sim import FirmwareSim, SimulatedBoard, LOOP_PERIOD_MS
+
+SCHEDULING_SLACK = 0.010  # Allowance for thread scheduling on a busy machine (seconds)
+
+
+def check_reference_timing(timeout_ms):
+    """Exact-clock checks of the reference firmware; returns a list of failure messages"""
+    failures = []
+    board = FirmwareSim()
+    board.receive(f"T{timeout_ms}\nF0:1500\nU0:2000\nU1:1000\n".encode(), now_ms=0)
+    if board.update(timeout_ms - 1):
+        failures.append("failsafe tripped before the timeout")
+    if board.update(timeout_ms) != [f"FAILSAFE:{timeout_ms}"]:
+        failures.append("failsafe did not trip exactly at the timeout")
+    if board.pulses[:2] != [1500, 1000]:
+        failures.append(f"servos after failsafe: {board.pulses[:2]} (want [1500, 1000] - servo 1 holds)")
+    if board.update(timeout_ms * 3):
+        failures.append("failsafe reported twice without a command in between")
+
+    # Heartbeats alone keep the board out of failsafe
+    board.receive(b"H\n", now_ms=timeout_ms * 3)
+    for now in range(timeout_ms * 3, timeout_ms * 10, max(1, timeout_ms // 2)):
+        board.receive(b"H\n", now)
+        if board.update(now):
+            failures.append(f"failsafe tripped at {now} ms despite heartbeats")
+            break
+
+    # Invalid lines are not frames
+    board.receive(b"U0:9999\nX\n", now_ms=timeout_ms * 10)
+    if board.update(timeout_ms * 11) == []:
+        failures.append("invalid commands restarted the failsafe timer")
+    return failures
+
+
+def make_app(timeout_ms, rate):
+    """Headless app driving two servos on the virtual wheel, connected to a SimulatedBoard"""
+    app = ServoControlApp.create_headless()
+    app.poll_interval = 1.0 / rate
+    app.active_profile.serial['failsafe_timeout_ms'] = timeout_ms
+    for servo_id in range(2):
+        app.mappings[servo_id] = {'controller': -1, 'input_type': 'axis', 'input_id': 0}
+    app.servo_calibration[1] = ServoCalibration(1000, 1500, 2000, failsafe_us=1000)
+    app.publish_mappings()
+    app.controller_manager.virtual_controller.set_wheel_angle(60.0)
+
+    board = SimulatedBoard()
+    arduino = app.arduino_manager
+    arduino.attach(board, "SIMULATED", arduino.baudrate)  # The simulated wire has no baud rate
+    return app, board
+
+
+def wait_for(condition, limit):
+    """Poll until condition() is true or `limit` seconds have passed; returns whether it became true"""
+    deadline = time.perf_counter() + limit
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.0005)
+    return True
+
+
+def run_once(timeout_ms, rate):
+    """One host-hang and one silent-board episode; returns (failsafe delay, detection delay, failures)"""
+    failures = []
+    timeout = timeout_ms / 1000.0
+    app, board = make_app(timeout_ms, rate)
+    arduino = app.arduino_manager
+    firmware = board.firmware
+    app.start_polling()
+    try:
+        if not wait_for(lambda: arduino.heartbeat_acked, 1.0):
+            return None, None, ["the board never answered a heartbeat"]
+        if firmware.failsafe_timeout_ms != timeout_ms or firmware.failsafe_pulses[:2] != [1472, 1000]:
+            failures.append(f"failsafe config not applied: {firmware.failsafe_timeout_ms} ms, "
+                            f"{firmware.failsafe_pulses[:2]}")
+
+        # 1. Host hang
+        app.stop_polling()
+        hung_at = arduino.last_write_time
+        if not wait_for(lambda: board.failsafe_times, timeout * 2 + 1.0):
+            return None, None, failures + ["the board never went to failsafe"]
+        failsafe_delay = board.failsafe_times[0] - hung_at
+        limit = timeout + 2 * LOOP_PERIOD_MS / 1000.0 + SCHEDULING_SLACK
+        if not timeout - 0.002 <= failsafe_delay <= limit:
+            failures.append(f"failsafe after {failsafe_delay * 1000:.1f} ms (want {timeout_ms} to {limit * 1000:.0f})")
+        if firmware.pulses[:2] != [1472, 1000]:
+            failures.append(f"servos not at failsafe positions: {firmware.pulses[:2]}")
+        app.start_polling()
+        if not wait_for(lambda: not firmware.failsafe_active and firmware.pulses[1] != 1000, 1.0):
+            failures.append("the board did not leave failsafe when the host came back")
+
+        # 2. Silent board
+        time.sleep(timeout)
+        board.silent = True
+        silent_at = time.perf_counter()
+        if not wait_for(lambda: arduino.board_silent, timeout * 2 + 1.0):
+            return failsafe_delay, None, failures + ["the host never noticed the silent board"]
+        detect_delay = time.perf_counter() - silent_at
+        limit = timeout + app.poll_interval + SCHEDULING_SLACK
+        if detect_delay > limit:
+            failures.append(f"silent board noticed after {detect_delay * 1000:.1f} ms (want <= {limit * 1000:.0f})")
+        board.silent = False
+        if not wait_for(lambda: not arduino.board_silent, 1.0):
+            failures.append("the host did not notice the board answering again")
+        return failsafe_delay, detect_delay, failures
+    finally:
+        app.stop_polling()
+        board.close()
+        arduino.connected = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check heartbeat and failsafe timing against the reference firmware")
+    parser.add_argument('--timeout', type=int, default=100, help="Failsafe timeout in ms (default: 100)")
+    parser.add_argument('--rate', type=float, default=20, help="Polling rate in Hz (default: 20, the app's rate)")
+    parser.add_argument('--runs', type=int, default=3, help="Episodes to run (default: 3)")
+    args = parser.parse_args()
+
+    failures = check_reference_timing(args.timeout)
+    print(f"Reference firmware timer: {'OK' if not failures else 'FAILED'}")
+
+    failsafe_delays = []
+    detect_delays = []
+    for run in range(args.runs):
+        failsafe_delay, detect_delay, run_failures = run_once(args.timeout, args.rate)
+        failures += [f"run {run + 1}: {failure}" for failure in run_failures]
+        if failsafe_delay is not None:
+            failsafe_delays.append(failsafe_delay * 1000)
+        if detect_delay is not None:
+            detect_delays.append(detect_delay * 1000)
+
+    if failsafe_delays:
+        print(f"Host hang -> board failsafe:    {min(failsafe_delays):6.1f} - {max(failsafe_delays):6.1f} ms "
+              f"(timeout {args.timeout} ms)")
+    if detect_delays:
+        print(f"Silent board -> host noticed:   {min(detect_delays):6.1f} - {max(detect_delays):6.1f} ms "
+              f"(timeout {args.timeout} ms + one {1000 / args.rate:.0f} ms tick)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("Failsafe checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Example external reader for the shared-memory telemetry ring
+
+Run it while the app is open. It maps the ring the app publishes into and
+prints the servo pulse widths, either once per tick (--follow) or a few times per
+second. Nothing here talks to the app - it only reads shared memory, so it
+can't slow the control loop down.
+
+Usage:
+    python scripts/telemetry_reader_example.py
+    python scripts/telemetry_reader_example.py --follow
+    python scripts/telemetry_reader_example.py --name my_ring   # if RCSERVO_SHM_NAME was set
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Allow running from the scripts folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry_shm import SharedTelemetryReader, DEFAULT_NAME
+
+
+def format_sample(sample):
+    """One line of text for a telemetry sample"""
+    # perf_counter_ns is a system-wide monotonic clock, so the age is meaningful across processes
+    age_ms = (time.perf_counter_ns() - sample['perf_ns']) / 1e6
+    axes = " ".join(f"{value:+.2f}" for value in sample['axes'])
+    servos = " ".join(f"S{servo_id}={pulse}us" for servo_id, pulse in sorted(sample['servos'].items()))
+    return f"#{sample['tick']:<8d} age {age_ms:6.2f}ms | axes {axes} | {servos}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print live telemetry from the app's shared-memory ring")
+    parser.add_argument('--name', default=DEFAULT_NAME, help=f"Shared memory name (default: {DEFAULT_NAME})")
+    parser.add_argument('--follow', action='store_true', help="Print every tick instead of sampling")
+    parser.add_argument('--interval', type=float, default=0.2, help="Seconds between samples (default: 0.2)")
+    args = parser.parse_args()
+
+    try:
+        reader = SharedTelemetryReader(args.name)
+    except FileNotFoundError:
+        print(f"No telemetry ring named '{args.name}' - is the app running?")
+        sys.exit(1)
+
+    print(f"Reading '{args.name}' ({reader.slot_count} slots) from process {reader.writer_pid}. Ctrl+C to stop.")
+    try:
+        with reader:
+            if args.follow:
+                for sample in reader.follow():
+                    print(format_sample(sample))
+            else:
+                while True:
+                    sample = reader.latest()
+                    if sample is not None:
+                        print(format_sample(sample))
+                    time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""
+Compact binary session recorder for the RC Servo Racing Sim Controller
+
+Records every polling tick's controller input and every servo command so a
+session can be inspected (or replayed) after the fact.
+
+How it stays out of the way of the polling loop:
+- The polling thread only packs fixed-size records into a preallocated
+  in-memory ring buffer. It never touches the file.
+- A background flusher thread copies new records into a memory-mapped,
+  preallocated file (grown in large chunks when needed), updates the header
+  and flushes to disk.
+- If the flusher ever falls a whole ring behind, records are dropped (and
+  counted) instead of blocking the polling loop.
+
+File layout (little endian):
+
+    Header (64 bytes)
+        8s  magic "RCSREC01"
+        H   format version (2; version 1 files store angles instead of pulse widths)
+        H   record size (64)
+        I   reserved
+        Q   number of records written
+        q   wall clock time at start (ns since epoch)
+        q   perf_counter_ns() at start (record timestamps use this clock)
+        Q   records dropped because the flusher fell behind
+        16x padding
+
+    Records (64 bytes each), first byte is the record type:
+        REC_INFO     controller layout: B type, b controller, H -, q time,
+                     H axes, H buttons, H hats, 46x
+        REC_INPUT+n  input frame part n (parts cover 6 axes / 32 buttons / 4 hats
+                     each): B type, b controller, H hats (4 bits per hat),
+                     q time, 6d axes, I button bits
+        REC_COMMANDS up to 12 servo commands: B type, b count, H -, q time,
+                     12 x (H servo_id, H pulse width in µs), 4x
+
+A sidecar "<file>.idx" holds (q time, Q record number) pairs written every
+INDEX_INTERVAL_NS of recorded time, for seeking without scanning the file.
+
+A second sidecar "<file>.json" holds the pipeline configuration at the start
+of the recording (mappings, axis settings, mixer and servo calibration), so the session can be replayed
+through the same mappings later (see session_replay.py).
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_right
+
+MAGIC = b"RCSREC01"
+VERSION = 2
+OLDEST_VERSION = 1  # Still readable; its commands are angles (0-180)
+RECORD_SIZE = 64
+HEADER = struct.Struct('<8sHHIQqqQ16x')
+INDEX_ENTRY = struct.Struct('<qQ')
+
+REC_INFO = 0x01
+REC_COMMANDS = 0x02
+REC_INPUT = 0x10  # + part number (0-15)
+
+INFO_RECORD = struct.Struct('<BbHqHHH46x')
+INPUT_RECORD = struct.Struct('<BbHq6dI')
+COMMAND_RECORD = struct.Struct('<BbHq24H4x')
+RECORD_HEAD = struct.Struct('<BbHq')
+COMMAND_PAIR = struct.Struct('<HH')
+EMPTY_RECORD = bytes(RECORD_SIZE)
+
+AXES_PER_PART = 6
+BUTTONS_PER_PART = 32
+HATS_PER_PART = 4
+COMMANDS_PER_RECORD = 12
+
+INDEX_INTERVAL_NS = 100_000_000  # One index entry per 0.1s of recording
+
+assert HEADER.size == RECORD_SIZE
+assert INFO_RECORD.size == INPUT_RECORD.size == COMMAND_RECORD.size == RECORD_SIZE
+
+
+def pack_hats(hats, start):
+    """Pack up to 4 hats (x, y in -1..1) into 16 bits, 4 bits per hat"""
+    bits = 0
+    for i, hat in enumerate(hats[start:start + HATS_PER_PART]):
+        bits |= (((hat[0] + 1) & 0x3) | (((hat[1] + 1) & 0x3) << 2)) << (i * 4)
+    return bits
+
+
+def unpack_hats(bits, count):
+    """Inverse of pack_hats"""
+    hats = []
+    for i in range(count):
+        nibble = (bits >> (i * 4)) & 0xF
+        hats.append(((nibble & 0x3) - 1, ((nibble >> 2) & 0x3) - 1))
+    return hats
+
+
+class SessionRecorder:
+    """Records input frames and servo commands to a memory-mapped binary file"""
+    def __init__(self, path, ring_records=16384, chunk_records=262144, flush_interval=0.1, config=None):
+        self.path = path
+        self.config = config  # Pipeline configuration saved next to the recording
+        self.ring_records = ring_records  # In-memory buffer between polling thread and flusher
+        self.chunk_records = chunk_records  # File grows by this many records (16 MB) at a time
+        self.flush_interval = flush_interval
+        self.ring = bytearray(ring_records * RECORD_SIZE)
+        self.write_count = 0  # Records produced (polling thread only)
+        self.read_count = 0  # Records consumed (flusher only)
+        self.dropped = 0
+        self.shapes = {}  # {controller: (axes, buttons, hats)} last written as REC_INFO
+        self.running = False
+        self.thread = None
+        self.file = None
+        self.map = None
+        self.capacity = 0  # Records the file currently has room for
+        self.file_records = 0  # Records written to the file
+        self.index_file = None
+        self.next_index_time = None
+        self.start_wall_ns = 0
+        self.start_perf_ns = 0
+
+    # ---- polling thread side ----
+
+    def reserve(self):
+        """Get the ring offset for the next record, or -1 if the ring is full"""
+        if self.write_count - self.read_count >= self.ring_records:
+            self.dropped += 1
+            return -1
+        return (self.write_count % self.ring_records) * RECORD_SIZE
+
+    def record_input(self, timestamp_ns, controller, state):
+        """Record one controller's state (a ControllerState: .axes, .buttons, .hats)"""
+        if not self.running or not state:
+            return
+        axes = state.axes
+        buttons = state.buttons
+        hats = state.hats
+        shape = (len(axes), len(buttons), len(hats))
+        if self.shapes.get(controller) != shape:
+            offset = self.reserve()
+            if offset < 0:
+                return
+            INFO_RECORD.pack_into(self.ring, offset, REC_INFO, controller, 0, timestamp_ns, *shape)
+            self.write_count += 1
+            self.shapes[controller] = shape
+
+        parts = max(1,
+                    -(-shape[0] // AXES_PER_PART),
+                    -(-shape[1] // BUTTONS_PER_PART),
+                    -(-shape[2] // HATS_PER_PART))
+        for part in range(parts):
+            offset = self.reserve()
+            if offset < 0:
+                return
+            first_axis = part * AXES_PER_PART
+            part_axes = list(axes[first_axis:first_axis + AXES_PER_PART])
+            while len(part_axes) < AXES_PER_PART:
+                part_axes.append(0.0)
+            button_bits = 0
+            first_button = part * BUTTONS_PER_PART
+            for i, pressed in enumerate(buttons[first_button:first_button + BUTTONS_PER_PART]):
+                if pressed:
+                    button_bits |= 1 << i
+            INPUT_RECORD.pack_into(self.ring, offset, REC_INPUT + part, controller,
+                                   pack_hats(hats, part * HATS_PER_PART), timestamp_ns,
+                                   *part_axes, button_bits)
+            self.write_count += 1
+
+    def record_commands(self, timestamp_ns, servo_ids, values):
+        """Record the servo commands sent this tick (values: {servo_id: pulse width in µs})"""
+        if not self.running:
+            return
+        offset = -1
+        count = 0
+        for servo_id in servo_ids:
+            value = values.get(servo_id)
+            if value is None:
+                continue
+            if count == 0:
+                offset = self.reserve()
+                if offset < 0:
+                    return
+                # Clear the previous contents of this slot
+                self.ring[offset:offset + RECORD_SIZE] = EMPTY_RECORD
+            COMMAND_PAIR.pack_into(self.ring, offset + RECORD_HEAD.size + count * COMMAND_PAIR.size,
+                                   servo_id & 0xFFFF, max(0, min(0xFFFF, int(value))))
+            count += 1
+            if count == COMMANDS_PER_RECORD:
+                RECORD_HEAD.pack_into(self.ring, offset, REC_COMMANDS, count, 0, timestamp_ns)
+                self.write_count += 1
+                count = 0
+        if count:
+            RECORD_HEAD.pack_into(self.ring, offset, REC_COMMANDS, count, 0, timestamp_ns)
+            self.write_count += 1
+
+    # ---- flusher side ----
+
+    def start(self):
+        """Create the file and start the flusher thread"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'w+b')
+        self.capacity = self.chunk_records
+        self.file.truncate(RECORD_SIZE + self.capacity * RECORD_SIZE)
+        self.map = mmap.mmap(self.file.fileno(), RECORD_SIZE + self.capacity * RECORD_SIZE)
+        self.index_file = open(self.path + ".idx", 'wb')
+        if self.config is not None:
+            with open(self.path + ".json", 'w', encoding='utf-8') as f:
+                json.dump(self.config, f, indent=2)
+        self.start_wall_ns = time.time_ns()
+        self.start_perf_ns = time.perf_counter_ns()
+        self.write_header()
+        self.running = True
+        self.thread = threading.Thread(target=self.flush_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop recording, write everything out and trim the file"""
+        if not self.running:
+            return
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+        self.flush()
+        self.map.flush()
+        self.map.close()
+        self.map = None
+        # Drop the unused preallocated space
+        self.file.truncate(RECORD_SIZE + self.file_records * RECORD_SIZE)
+        self.file.close()
+        self.file = None
+        self.index_file.close()
+        self.index_file = None
+
+    def write_header(self):
+        """Write the file header"""
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, RECORD_SIZE, 0, self.file_records,
+                         self.start_wall_ns, self.start_perf_ns, self.dropped)
+
+    def flush_loop(self):
+        """Flusher thread: move records from the ring into the file"""
+        while self.running:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Copy pending ring records into the file and update the header"""
+        end = self.write_count
+        start = self.read_count
+        if end == start:
+            return
+        if self.file_records + (end - start) > self.capacity:
+            self.grow(end - start)
+
+        for record in range(start, end):
+            ring_offset = (record % self.ring_records) * RECORD_SIZE
+            file_offset = RECORD_SIZE + self.file_records * RECORD_SIZE
+            self.map[file_offset:file_offset + RECORD_SIZE] = self.ring[ring_offset:ring_offset + RECORD_SIZE]
+            # Index entry every INDEX_INTERVAL_NS of recorded time
+            timestamp = RECORD_HEAD.unpack_from(self.ring, ring_offset)[3]
+            if self.next_index_time is None or timestamp >= self.next_index_time:
+                self.index_file.write(INDEX_ENTRY.pack(timestamp, self.file_records))
+                self.next_index_time = timestamp + INDEX_INTERVAL_NS
+            self.file_records += 1
+        # Publish the consumed space back to the polling thread only after copying
+        self.read_count = end
+        self.write_header()
+        self.map.flush()
+        self.index_file.flush()
+
+    def grow(self, needed):
+        """Make room for more records (runs on the flusher thread)"""
+        while self.file_records + needed > self.capacity:
+            self.capacity += self.chunk_records
+        self.map.flush()
+        self.map.close()
+        self.file.truncate(RECORD_SIZE + self.capacity * RECORD_SIZE)
+        self.map = mmap.mmap(self.file.fileno(), RECORD_SIZE + self.capacity * RECORD_SIZE)
+
+    def get_status(self):
+        """Short status text for the UI"""
+        seconds = (time.perf_counter_ns() - self.start_perf_ns) / 1e9 if self.running else 0
+        size_mb = self.file_records * RECORD_SIZE / 1e6
+        status = f"Recording {seconds:.0f}s | {self.file_records} records ({size_mb:.1f} MB)"
+        if self.dropped:
+            status += f" | {self.dropped} dropped"
+        return status
+
+
+def load_session_config(path):
+    """Read the configuration saved with a recording
+
+    Returns {'mappings': {servo_id: mapping}, 'axis_settings': {axis_id: settings},
+    'mixer': mixer data (see mixer.py), 'calibration': {servo_id: calibration data
+    (see calibration.py)}} with integer keys restored, or None if the recording has
+    no configuration.
+    """
+    try:
+        with open(path + ".json", encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return None
+    return {
+        'mappings': {int(k): v for k, v in config.get('mappings', {}).items()},
+        'axis_settings': {int(k): v for k, v in config.get('axis_settings', {}).items()},
+        'mixer': config.get('mixer', {}),
+        'calibration': {int(k): v for k, v in config.get('calibration', {}).items()}
+    }
+
+
+class SessionReader:
+    """Reads a file written by SessionRecorder"""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, _, count, wall_ns, perf_ns, dropped = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a session recording")
+        if not OLDEST_VERSION <= version <= VERSION:
+            raise ValueError(f"{path}: unsupported recording version {version}")
+        self.version = version
+        # Never trust the header beyond what the file actually holds
+        self.record_count = min(count, (len(self.map) - RECORD_SIZE) // RECORD_SIZE)
+        self.start_wall_ns = wall_ns
+        self.start_perf_ns = perf_ns
+        self.dropped = dropped
+        self.index_times = []
+        self.index_records = []
+        if os.path.exists(path + ".idx"):
+            with open(path + ".idx", 'rb') as f:
+                data = f.read()
+            for timestamp, record in INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % INDEX_ENTRY.size]):
+                self.index_times.append(timestamp)
+                self.index_records.append(record)
+
+    def close(self):
+        """Release the file"""
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def duration(self):
+        """Recorded time span in seconds"""
+        if self.record_count == 0:
+            return 0.0
+        return (self.record_time(self.record_count - 1) - self.record_time(0)) / 1e9
+
+    def record_time(self, record):
+        """Timestamp (perf_counter ns) of a record"""
+        return RECORD_HEAD.unpack_from(self.map, RECORD_SIZE + record * RECORD_SIZE)[3]
+
+    def seek(self, seconds):
+        """Record number to start from to replay from `seconds` after the start
+
+        Uses the index to land at most INDEX_INTERVAL_NS early; frames() skips
+        forward from there. Device layouts (REC_INFO) seen before that point are
+        picked up by scanning from the start, since they are rare.
+        """
+        if self.record_count == 0:
+            return 0
+        target = self.record_time(0) + int(seconds * 1e9)
+        position = bisect_right(self.index_times, target) - 1
+        return self.index_records[position] if position >= 0 else 0
+
+    def frames(self, start_record=0, start_time_ns=None):
+        """Yield (timestamp_ns, {controller: state}, [(servo_id, value), ...]) per recorded tick"""
+        shapes = {}
+        # Layout records before start_record still apply
+        for record in range(0, min(start_record, self.record_count)):
+            offset = RECORD_SIZE + record * RECORD_SIZE
+            if self.map[offset] == REC_INFO:
+                _, controller, _, _, axes, buttons, hats = INFO_RECORD.unpack_from(self.map, offset)
+                shapes[controller] = (axes, buttons, hats)
+
+        current_time = None
+        states = {}
+        commands = []
+        for record in range(start_record, self.record_count):
+            offset = RECORD_SIZE + record * RECORD_SIZE
+            record_type, small, bits, timestamp = RECORD_HEAD.unpack_from(self.map, offset)
+            if start_time_ns is not None and timestamp < start_time_ns:
+                continue
+            if timestamp != current_time:
+                if current_time is not None and (states or commands):
+                    yield current_time, states, commands
+                current_time = timestamp
+                states = {}
+                commands = []
+
+            if record_type == REC_INFO:
+                _, controller, _, _, axes, buttons, hats = INFO_RECORD.unpack_from(self.map, offset)
+                shapes[controller] = (axes, buttons, hats)
+            elif record_type == REC_COMMANDS:
+                values = COMMAND_RECORD.unpack_from(self.map, offset)[4:4 + small * 2]
+                commands.extend(zip(values[0::2], values[1::2]))
+            elif record_type >= REC_INPUT:
+                shape = shapes.get(small)
+                if shape is None:
+                    continue  # Layout unknown (e.g. dropped) - skip
+                part = record_type - REC_INPUT
+                unpacked = INPUT_RECORD.unpack_from(self.map, offset)
+                state = states.get(small)
+                if state is None:
+                    state = states[small] = {'axes': [], 'buttons': [], 'hats': []}
+                first = part * AXES_PER_PART
+                state['axes'].extend(unpacked[4:4 + max(0, min(AXES_PER_PART, shape[0] - first))])
+                button_bits = unpacked[10]
+                first = part * BUTTONS_PER_PART
+                for i in range(max(0, min(BUTTONS_PER_PART, shape[1] - first))):
+                    state['buttons'].append(bool(button_bits >> i & 1))
+                first = part * HATS_PER_PART
+                state['hats'].extend(unpack_hats(bits, max(0, min(HATS_PER_PART, shape[2] - first))))
+        if current_time is not None and (states or commands):
+            yield current_time, states, commands
@@ -0,0 +1,137 @@
+"""
+Deterministic session replay for the RC Servo Racing Sim Controller
+
+Feeds a recording made by SessionRecorder back through the real mapping
+pipeline (process_mappings -> get_mapping_value -> axis_settings) in place of
+the live controllers, and yields the servo commands the pipeline produces next
+to the ones that were recorded. That makes it possible to regression-test and
+benchmark changes to the pipeline on real driving data without a wheel or an
+Arduino.
+
+The replay is deterministic: every recorded tick is processed exactly once,
+in order, with the recorded controller states, regardless of the replay speed.
+
+    from session_recorder import SessionReader, load_session_config
+    from session_replay import replay
+
+    app = ServoControlApp.create_headless()
+    app.mappings.update(load_session_config(path)['mappings'])
+    app.publish_mappings()
+    with SessionReader(path) as reader:
+        for timestamp_ns, recorded, replayed in replay(app, reader, speed=None):
+            ...
+
+See scripts/replay_session.py for a command line tool.
+"""
+
+import time
+from array import array
+
+from main import ControllerState
+
+
+class ReplayControllerManager:
+    """Stands in for ControllerManager, serving recorded controller states
+
+    Controllers are identified by the same index the mappings use (-1 is the
+    virtual controller), so recorded states line up with the mappings.
+    """
+    def __init__(self, virtual_controller=None):
+        self.pygame_available = False
+        self.joysticks = []
+        self.virtual_controller = virtual_controller
+        self.buffers = {}  # {controller index: ControllerState}, reused across ticks
+        self.states = {}  # {controller index: ControllerState} present in the tick being replayed
+
+    def set_frame(self, states):
+        """Load one recorded tick ({controller index: {'axes', 'buttons', 'hats'}})"""
+        self.states.clear()
+        for index, recorded in states.items():
+            axes = recorded['axes']
+            buttons = recorded['buttons']
+            hats = recorded['hats']
+            state = self.buffers.get(index)
+            if state is None or (state.axis_count, state.button_count, state.hat_count) != \
+                    (len(axes), len(buttons), len(hats)):
+                state = self.buffers[index] = ControllerState(len(axes), len(buttons), len(hats))
+            state.axes[:] = axes if isinstance(axes, array) else array('d', axes)
+            for i, pressed in enumerate(buttons):
+                state.buttons[i] = pressed
+            state.hats[:] = hats
+            self.states[index] = state
+
+    def refresh_controllers(self):
+        """Nothing to refresh - the controllers come from the recording"""
+        return 0
+
+    def get_controller_info(self, index):
+        """Get information about a recorded controller"""
+        state = self.states.get(index)
+        if state is None:
+            return None
+        return {
+            'name': f"Replay {index}",
+            'axes': state.axis_count,
+            'buttons': state.button_count,
+            'hats': state.hat_count
+        }
+
+    def get_controller_state(self, index):
+        """Get the recorded state of a controller for the current tick"""
+        return self.states.get(index)
+
+
+def replay(app, reader, speed=1.0, start_seconds=0.0):
+    """Replay a recording through app's mapping pipeline
+
+    speed: 1.0 = real time, 4.0 = four times faster, None or 0 = as fast as possible
+    start_seconds: skip this far into the recording first
+
+    Yields (timestamp_ns, recorded_commands, replayed_commands) per recorded tick,
+    where both command lists are [(servo_id, pulse width in µs), ...] in the order sent.
+    The app's controller manager is swapped out for the duration of the replay;
+    don't replay into an app whose polling thread is running.
+    """
+    original_manager = app.controller_manager
+    manager = ReplayControllerManager(original_manager.virtual_controller)
+    app.controller_manager = manager
+    clock = time.perf_counter
+    first_timestamp = None
+    first_clock = 0.0
+    start_record = reader.seek(start_seconds) if start_seconds > 0 else 0
+    start_time_ns = reader.record_time(0) + int(start_seconds * 1e9) if start_seconds > 0 else None
+    try:
+        for timestamp, states, recorded in reader.frames(start_record, start_time_ns):
+            if speed:
+                # Pace ticks by their recorded spacing
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                    first_clock = clock()
+                delay = first_clock + (timestamp - first_timestamp) / 1e9 / speed - clock()
+                if delay > 0:
+                    time.sleep(delay)
+
+            manager.set_frame(states)
+            mapping_start = clock()
+            values = app.process_mappings()
+            app.mapping_stats.add(clock() - mapping_start)
+
+            pulses = app.commanded_pulses
+            replayed = [(servo_id, pulses[servo_id]) for servo_id in values if servo_id in pulses]
+            yield timestamp, recorded, replayed
+    finally:
+        app.controller_manager = original_manager
+
+
+def diff_commands(recorded, replayed):
+    """Differences between two command lists: [(servo_id, recorded value, replayed value)]
+
+    A servo missing from one side shows up with None for that side.
+    """
+    if recorded == replayed:
+        return []
+    expected = dict(recorded)
+    actual = dict(replayed)
+    return [(servo_id, expected.get(servo_id), actual.get(servo_id))
+            for servo_id in sorted(expected.keys() | actual.keys())
+            if expected.get(servo_id) != actual.get(servo_id)]
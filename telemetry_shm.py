@@ -0,0 +1,289 @@
+"""
+Shared-memory telemetry ring for external tools
+
+The polling loop publishes every tick (controller axes, servo pulse widths, sequence
+number, timestamps) into a fixed-layout ring in multiprocessing.shared_memory.
+Dashboards and loggers in other processes map the same block and read it in
+place - no sockets, no copies of the ring, no locks, and the writer never
+waits for a reader.
+
+Each slot is protected by a seqlock: the writer makes the slot's sequence
+number odd, writes the fields, then makes it even again. A reader reads the
+sequence number, the fields, then the sequence number again, and retries if
+it was odd or changed in between (the writer lapped it).
+
+Layout (little endian, all offsets in bytes):
+
+    Header (64 bytes)
+        0   8s  magic "RCSHM001"
+        8   H   layout version (2; version 1 carried servo angles)
+        10  H   header size (64)
+        12  I   slot size (320)
+        16  I   slot count
+        20  H   max axes per slot (16)
+        22  H   max servos per slot (32)
+        24  q   ticks published; the newest slot is (published - 1) % slot count
+        32  I   writer process id
+        36  28x reserved
+
+    Slot n at 64 + n * slot size (320 bytes)
+        0   q   seqlock sequence (odd while the slot is being written)
+        8   q   tick number (same as the UI's publish sequence)
+        16  q   time.perf_counter_ns() of the tick (writer's monotonic clock)
+        24  q   time.time_ns() of the tick (wall clock)
+        32  b   controller index the axes come from (-1 = virtual, -128 = none)
+        33  B   axis count
+        34  H   servo count
+        36  I   reserved
+        40  16d axes (-1.0 to 1.0)
+        168 32H servo IDs
+        232 32H servo pulse widths (microseconds), same order as the IDs
+        296 24x reserved
+"""
+
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+MAGIC = b"RCSHM001"
+VERSION = 2
+DEFAULT_NAME = "rcservo_telemetry"
+
+HEADER = struct.Struct('<8sHHIIHHqI28x')
+HEADER_SIZE = 64
+SLOT_SIZE = 320
+MAX_AXES = 16
+MAX_SERVOS = 32
+
+# Field offsets inside a slot
+SEQ = 0
+TICK = 8
+PERF_NS = 16
+WALL_NS = 24
+CONTROLLER = 32
+AXIS_COUNT = 33
+SERVO_COUNT = 34
+AXES = 40
+SERVO_IDS = 168
+SERVO_PULSES = 232
+PUBLISHED = 24  # Header offset of the published tick count
+NO_CONTROLLER = -128
+
+assert HEADER.size == HEADER_SIZE
+assert SERVO_PULSES + MAX_SERVOS * 2 <= SLOT_SIZE
+
+
+def writer_alive(pid):
+    """Whether the process that created an existing ring is still running"""
+    if os.name == 'nt':
+        # Windows frees the block when its last handle closes, so if it
+        # still exists another process has it open
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def untrack(shm):
+    """Stop this process's resource tracker from unlinking a block it does not own at exit"""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def attach(name):
+    """Open an existing shared memory block without taking ownership of it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        untrack(shm)
+        return shm
+
+
+class SharedTelemetryWriter:
+    """Publishes one slot per polling tick (polling thread only)"""
+    def __init__(self, name=DEFAULT_NAME, slot_count=256):
+        self.name = name
+        self.slot_count = slot_count
+        self.size = HEADER_SIZE + slot_count * SLOT_SIZE
+        self.shm = None
+        self.published = 0
+
+    def open(self):
+        """Create (or take over a stale) shared memory block
+
+        Raises FileExistsError if another running app already publishes under this name.
+        """
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=self.size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=self.name)
+            pid = HEADER.unpack_from(stale.buf, 0)[8] if stale.size >= HEADER_SIZE else 0
+            if writer_alive(pid):
+                untrack(stale)
+                stale.close()
+                raise
+            # Left over from a run that did not shut down cleanly
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=self.size)
+        buf = self.shm.buf
+        buf[:self.size] = bytes(self.size)
+        HEADER.pack_into(buf, 0, MAGIC, VERSION, HEADER_SIZE, SLOT_SIZE, self.slot_count,
+                         MAX_AXES, MAX_SERVOS, 0, os.getpid())
+        # Typed views over the whole block so publish() only does element stores
+        self.bytes = buf
+        self.int16 = buf.cast('H')
+        self.int64 = buf.cast('q')
+        self.doubles = buf.cast('d')
+
+    def close(self):
+        """Release and remove the shared memory block"""
+        if self.shm is None:
+            return
+        for view in (self.int16, self.int64, self.doubles):
+            view.release()
+        self.bytes = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+
+    def publish(self, tick, controller, axes, servo_ids, pulses):
+        """Write one tick into the next slot
+
+        axes: sequence of floats (first MAX_AXES used)
+        servo_ids: servo IDs in send order; pulses: {servo_id: microseconds}
+        """
+        base = HEADER_SIZE + (self.published % self.slot_count) * SLOT_SIZE
+        int64 = self.int64
+        q = base >> 3
+        seq = int64[q] + 1
+        int64[q] = seq  # Odd: readers back off
+        int64[q + 1] = tick
+        int64[q + 2] = time.perf_counter_ns()
+        int64[q + 3] = time.time_ns()
+
+        axis_count = 0
+        if axes is not None:
+            doubles = self.doubles
+            d = (base + AXES) >> 3
+            for value in axes:
+                if axis_count == MAX_AXES:
+                    break
+                doubles[d + axis_count] = value
+                axis_count += 1
+        servo_count = 0
+        int16 = self.int16
+        h_ids = (base + SERVO_IDS) >> 1
+        h_pulses = (base + SERVO_PULSES) >> 1
+        for servo_id in servo_ids:
+            pulse = pulses.get(servo_id)
+            if pulse is None:
+                continue
+            if servo_count == MAX_SERVOS:
+                break
+            int16[h_ids + servo_count] = servo_id & 0xFFFF
+            int16[h_pulses + servo_count] = pulse
+            servo_count += 1
+
+        self.bytes[base + CONTROLLER] = (NO_CONTROLLER if controller is None else controller) & 0xFF
+        self.bytes[base + AXIS_COUNT] = axis_count
+        int16[(base + SERVO_COUNT) >> 1] = servo_count
+        int64[q] = seq + 1  # Even: slot is consistent
+        self.published += 1
+        int64[PUBLISHED >> 3] = self.published
+
+
+class SharedTelemetryReader:
+    """Reads the telemetry ring from another process"""
+    SLOT_HEAD = struct.Struct('<qqqqbBH')
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = attach(name)
+        magic, version, header_size, slot_size, slot_count, max_axes, max_servos, _, pid = \
+            HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"'{name}' is not an RC servo telemetry ring (version {version})")
+        self.header_size = header_size
+        self.slot_size = slot_size
+        self.slot_count = slot_count
+        self.writer_pid = pid
+        self.axes = struct.Struct(f'<{max_axes}d')
+        self.servos = struct.Struct(f'<{max_servos}H')
+
+    def close(self):
+        """Unmap the ring (never removes it - the app owns it)"""
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def published(self):
+        """Number of ticks the app has published so far"""
+        return struct.unpack_from('<q', self.shm.buf, PUBLISHED)[0]
+
+    def read(self, number, retries=100):
+        """Read tick number `number` (0-based count of published ticks)
+
+        Returns a dict, or None if that slot has already been overwritten or
+        could not be read consistently.
+        """
+        buf = self.shm.buf
+        base = self.header_size + (number % self.slot_count) * self.slot_size
+        for _ in range(retries):
+            seq, tick, perf_ns, wall_ns, controller, axis_count, servo_count = \
+                self.SLOT_HEAD.unpack_from(buf, base)
+            if seq & 1:
+                continue  # Being written right now
+            axes = self.axes.unpack_from(buf, base + AXES)[:axis_count]
+            ids = self.servos.unpack_from(buf, base + SERVO_IDS)[:servo_count]
+            pulses = self.servos.unpack_from(buf, base + SERVO_PULSES)[:servo_count]
+            if struct.unpack_from('<q', buf, base)[0] != seq:
+                continue  # Overwritten while reading
+            if self.published() - number > self.slot_count:
+                return None  # Lapped by the writer
+            return {
+                'tick': tick,
+                'perf_ns': perf_ns,
+                'wall_ns': wall_ns,
+                'controller': None if controller == NO_CONTROLLER else controller,
+                'axes': axes,
+                'servos': dict(zip(ids, pulses))
+            }
+        return None
+
+    def latest(self):
+        """The most recently published tick, or None if nothing was published yet"""
+        published = self.published()
+        if published == 0:
+            return None
+        return self.read(published - 1)
+
+    def follow(self, poll_interval=0.001):
+        """Yield every tick as it is published (skips ticks if the reader falls a whole ring behind)"""
+        next_number = self.published()
+        while True:
+            published = self.published()
+            if published - next_number > self.slot_count:
+                next_number = published - self.slot_count  # Fell behind - jump forward
+            while next_number < published:
+                sample = self.read(next_number)
+                next_number += 1
+                if sample is not None:
+                    yield sample
+            time.sleep(poll_interval)